@@ -1,19 +1,14 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from typing import Dict, Any, List
 
-from app.config import settings
+from app.services.llm_gateway import llm_gateway
+from app.services.prompt_budget import PromptBudget, add_chat_history
 from app.agents.state import GraphState
 
 class CareerPathAgent:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            api_key=settings.openrouter_api_key,
-            base_url="https://openrouter.ai/api/v1",
-            model="openai/gpt-4o-mini",
-            temperature=0.3
-        )
+        self.llm = llm_gateway.get_chat_model("career_path", temperature=0.3)
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are CareerPath-GPT, a pragmatic and experienced career counselor. You provide realistic, actionable career guidance based on a user's current profile and goals.
@@ -58,15 +53,14 @@ Please provide comprehensive career guidance.""")
             recent_history = state["chat_history"][-4:]
         
         try:
-            # Format profile data for analysis
-            formatted_profile = self._format_profile_for_guidance(profile_data)
-            
+            # Fit query, profile and history into the agent's token budget
+            budget = PromptBudget("career_path", variables=["profile_data", "user_query", "chat_history"])
+            budget.add("user_query", user_query, priority=100, max_tokens=1000)
+            self._format_profile_for_guidance(profile_data, budget)
+            add_chat_history(budget, recent_history, priority=45)
+
             # Generate career guidance
-            guidance = self.chain.invoke({
-                "profile_data": formatted_profile,
-                "user_query": user_query,
-                "chat_history": "\n".join([f"{msg.type}: {msg.content}" for msg in recent_history])
-            })
+            guidance = self.chain.invoke(budget.render())
             
             # Store response
             state["final_response"] = guidance
@@ -86,52 +80,50 @@ Please provide comprehensive career guidance.""")
         
         return state
     
-    def _format_profile_for_guidance(self, profile_data: Dict[str, Any]) -> str:
-        """Format profile data for career guidance analysis"""
-        formatted = []
+    def _format_profile_for_guidance(self, profile_data: Dict[str, Any], budget: PromptBudget) -> None:
+        """Add profile sections for career guidance; lower priorities are dropped first"""
         
         # Basic info
         if profile_data.get("name"):
-            formatted.append(f"Name: {profile_data['name']}")
+            budget.add("profile_data", f"Name: {profile_data['name']}", priority=95)
         
         if profile_data.get("headline"):
-            formatted.append(f"Current Role/Headline: {profile_data['headline']}")
+            budget.add("profile_data", f"Current Role/Headline: {profile_data['headline']}", priority=90)
         
         # Professional summary
         if profile_data.get("about"):
-            formatted.append(f"Professional Summary: {profile_data['about'][:300]}...")
+            budget.add("profile_data", f"Professional Summary: {profile_data['about']}", priority=55, max_tokens=150)
         
         # Skills
         if profile_data.get("skills"):
             skills_str = ", ".join(profile_data["skills"][:15])  # Top 15 skills
-            formatted.append(f"Key Skills: {skills_str}")
+            budget.add("profile_data", f"Key Skills: {skills_str}", priority=85)
         
         # Experience analysis
         if profile_data.get("experience"):
-            formatted.append("Professional Experience:")
+            budget.add("profile_data", "Professional Experience:", priority=80, truncatable=False)
             
             # Calculate total experience
             total_years = self._estimate_experience_years(profile_data["experience"])
-            formatted.append(f"  Estimated Total Experience: ~{total_years} years")
+            budget.add("profile_data", f"  Estimated Total Experience: ~{total_years} years", priority=80)
             
-            # Recent positions
+            # Recent positions, most recent first
             for i, exp in enumerate(profile_data["experience"][:3]):
                 role_info = f"  {i+1}. {exp.get('title', 'N/A')} at {exp.get('company', 'N/A')}"
                 if exp.get("duration"):
                     role_info += f" ({exp['duration']})"
-                formatted.append(role_info)
+                budget.add("profile_data", role_info, priority=75 - i, truncatable=False)
                 
                 if exp.get("description"):
-                    formatted.append(f"     Key responsibilities: {exp['description'][:150]}...")
+                    budget.add("profile_data", f"     Key responsibilities: {exp['description']}",
+                               priority=50 - i, max_tokens=60)
         
         # Education
         if profile_data.get("education"):
-            formatted.append("Education:")
-            for edu in profile_data["education"][:2]:
+            budget.add("profile_data", "Education:", priority=35, truncatable=False)
+            for i, edu in enumerate(profile_data["education"][:2]):
                 edu_info = f"  - {edu.get('degree', 'N/A')} in {edu.get('field', 'N/A')} from {edu.get('institution', 'N/A')}"
-                formatted.append(edu_info)
-        
-        return "\n".join(formatted)
+                budget.add("profile_data", edu_info, priority=35 - i, truncatable=False)
     
     def _estimate_experience_years(self, experience_list: List[Dict[str, Any]]) -> int:
         """Estimate total years of experience from experience list"""
@@ -1,19 +1,14 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from typing import Dict, Any
 
-from app.config import settings
+from app.services.llm_gateway import llm_gateway
+from app.services.prompt_budget import PromptBudget
 from app.agents.state import GraphState
 
 class ContentEnhancementAgent:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            api_key=settings.openrouter_api_key,
-            base_url="https://openrouter.ai/api/v1",
-            model="openai/gpt-4o-mini",
-            temperature=0.4
-        )
+        self.llm = llm_gateway.get_chat_model("content_enhancement", temperature=0.4)
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a professional LinkedIn content strategist and copywriter. You help professionals optimize their LinkedIn profiles to attract recruiters and opportunities.
@@ -57,14 +52,13 @@ Please provide content enhancement suggestions based on their profile and specif
         user_query = state["current_user_query"]
         
         try:
-            # Format profile data for analysis
-            formatted_profile = self._format_profile_for_enhancement(profile_data)
+            # Fit query and profile into the agent's token budget
+            budget = PromptBudget("content_enhancement", variables=["profile_data", "user_query"])
+            budget.add("user_query", user_query, priority=100, max_tokens=1000)
+            self._format_profile_for_enhancement(profile_data, budget)
             
             # Generate content enhancement suggestions
-            enhancement = self.chain.invoke({
-                "profile_data": formatted_profile,
-                "user_query": user_query
-            })
+            enhancement = self.chain.invoke(budget.render())
             
             # Store response
             state["final_response"] = enhancement
@@ -78,47 +72,45 @@ Please provide content enhancement suggestions based on their profile and specif
         
         return state
     
-    def _format_profile_for_enhancement(self, profile_data: Dict[str, Any]) -> str:
-        """Format profile data for content enhancement analysis"""
-        formatted = []
+    def _format_profile_for_enhancement(self, profile_data: Dict[str, Any], budget: PromptBudget) -> None:
+        """Add profile sections for content enhancement; lower priorities are dropped first"""
         
         # Current headline
         if profile_data.get("headline"):
-            formatted.append(f"Current Headline: {profile_data['headline']}")
+            budget.add("profile_data", f"Current Headline: {profile_data['headline']}", priority=95)
         else:
-            formatted.append("Current Headline: [Not provided]")
+            budget.add("profile_data", "Current Headline: [Not provided]", priority=95)
         
-        # Current about section
+        # Current about section - the text being rewritten, so it gets most of the budget
         if profile_data.get("about"):
-            formatted.append(f"Current About Section:\n{profile_data['about']}")
+            budget.add("profile_data", f"Current About Section:\n{profile_data['about']}", priority=90, max_tokens=1200)
         else:
-            formatted.append("Current About Section: [Not provided]")
+            budget.add("profile_data", "Current About Section: [Not provided]", priority=90)
         
         # Skills
         if profile_data.get("skills"):
             skills_str = ", ".join(profile_data["skills"][:10])
-            formatted.append(f"Key Skills: {skills_str}")
+            budget.add("profile_data", f"Key Skills: {skills_str}", priority=80)
         
         # Experience for context
         if profile_data.get("experience"):
-            formatted.append("Recent Experience:")
+            budget.add("profile_data", "Recent Experience:", priority=70, truncatable=False)
             for i, exp in enumerate(profile_data["experience"][:3]):
                 exp_info = f"  {i+1}. {exp.get('title', 'N/A')} at {exp.get('company', 'N/A')}"
                 if exp.get("duration"):
                     exp_info += f" ({exp['duration']})"
-                formatted.append(exp_info)
+                budget.add("profile_data", exp_info, priority=70 - i, truncatable=False)
                 
                 if exp.get("description"):
-                    formatted.append(f"     Description: {exp['description'][:200]}...")
+                    budget.add("profile_data", f"     Description: {exp['description']}",
+                               priority=50 - i, max_tokens=80)
         
         # Education for context
         if profile_data.get("education"):
-            formatted.append("Education:")
-            for edu in profile_data["education"][:2]:
+            budget.add("profile_data", "Education:", priority=30, truncatable=False)
+            for i, edu in enumerate(profile_data["education"][:2]):
                 edu_info = f"  - {edu.get('degree', '')} {edu.get('field', '')} from {edu.get('institution', '')}"
-                formatted.append(edu_info)
-        
-        return "\n".join(formatted)
+                budget.add("profile_data", edu_info, priority=30 - i, truncatable=False)
     
     def _get_fallback_enhancement_response(self, user_query: str) -> str:
         """Provide fallback content enhancement suggestions"""
@@ -0,0 +1,132 @@
+import re
+import threading
+from typing import Dict, Any, Optional, List
+
+from app.config import settings
+from app.agents.job_fit_analyst import JOB_DESCRIPTION_INDICATORS
+
+# "I know X", "I just learned X", "I'm proficient in X", "add X to my skills"
+PROFILE_UPDATE_PATTERN = re.compile(
+    r"^(?:i\s+(?:also\s+|just\s+|now\s+|recently\s+|have\s+)*"
+    r"(?:know|learned|learnt|use|can use|am learning|have experience (?:with|in)|"
+    r"am proficient (?:in|with)|am certified in|got certified in|completed|worked (?:at|as))\b|"
+    r"i'm\s+(?:also\s+)?(?:learning|proficient (?:in|with)|certified in)\b|"
+    r"(?:please\s+)?add\s+.+\s+to\s+my\s+(?:skills|profile)\b)"
+)
+
+# Follow-up asks that need another agent after the profile update
+FOLLOWUP_PATTERN = re.compile(r"\b(?:what|which|how|should|jobs?|roles?|qualify|recommend|suggest)\b|\?")
+
+CONTENT_ACTION_PATTERN = re.compile(r"\b(?:improve|rewrite|re-write|optimi[sz]e|polish|enhance|strengthen|review|stand out)\b")
+CONTENT_TARGET_PATTERN = re.compile(r"\b(?:linkedin|headline|about section|summary|profile)\b")
+
+CAREER_PATTERN = re.compile(
+    r"\b(?:career (?:paths?|trajectory|move|switch|change|transition|goals?|advice)|"
+    r"transition (?:to|into)|switch (?:to|into)|move into|become an? |should i pursue|what career)\b"
+)
+
+# References to the user's own material - a pasted JD mentioning these is a multi-intent query
+PERSONAL_MATERIAL_PATTERN = re.compile(r"\bmy (?:linkedin|headline|about|summary|profile|resume|cv)\b|\bcareer path")
+
+class FastRouter:
+    """Deterministic pre-router that resolves obvious intents without an LLM call.
+
+    Each rule returns a confidence; the router only trusts decisions at or above
+    ``min_confidence`` and falls back to the LLM for everything else.
+    """
+
+    def __init__(self, min_confidence: float):
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self._total = 0
+        self._hits = 0
+        self._hits_by_agent: Dict[str, int] = {}
+
+    def classify(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return the best rule-based decision for a query, whatever its confidence"""
+        text = " ".join(query.lower().split())
+        if not text:
+            return None
+
+        candidates = [
+            self._job_description_rule(text),
+            self._profile_update_rule(text),
+            self._content_enhancement_rule(text),
+            self._career_path_rule(text),
+        ]
+        candidates = [c for c in candidates if c]
+        if not candidates:
+            return None
+
+        best = max(candidates, key=lambda c: c["confidence"])
+        # Two strong rules firing at once means a multi-intent query
+        if sum(1 for c in candidates if c["confidence"] >= self.min_confidence) > 1:
+            best = {**best, "confidence": 0.5, "reason": "multiple intents matched"}
+        return best
+
+    def route(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return a high-confidence decision, or None to defer to the LLM router"""
+        decision = self.classify(query)
+        hit = decision is not None and decision["confidence"] >= self.min_confidence
+
+        with self._lock:
+            self._total += 1
+            if hit:
+                self._hits += 1
+                self._hits_by_agent[decision["agent"]] = self._hits_by_agent.get(decision["agent"], 0) + 1
+
+        return decision if hit else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate counters"""
+        with self._lock:
+            return {
+                "total": self._total,
+                "rule_hits": self._hits,
+                "llm_fallbacks": self._total - self._hits,
+                "hit_rate": round(self._hits / self._total, 4) if self._total else 0.0,
+                "hits_by_agent": dict(self._hits_by_agent),
+                "min_confidence": self.min_confidence
+            }
+
+    def _job_description_rule(self, text: str) -> Optional[Dict[str, Any]]:
+        words = len(text.split())
+        indicators = sum(1 for indicator in JOB_DESCRIPTION_INDICATORS if indicator in text)
+        if words < 40 or indicators < 2:
+            return None
+
+        if words >= 60 and indicators >= 3:
+            confidence = 0.97
+        elif words >= 60 or indicators >= 3:
+            confidence = 0.9
+        else:
+            confidence = 0.75
+
+        if PERSONAL_MATERIAL_PATTERN.search(text):
+            confidence = 0.6
+        return self._decision("job_fit_analyst", confidence, f"job posting ({indicators} indicators, {words} words)")
+
+    def _profile_update_rule(self, text: str) -> Optional[Dict[str, Any]]:
+        if not PROFILE_UPDATE_PATTERN.search(text):
+            return None
+        if len(text.split()) > 25 or FOLLOWUP_PATTERN.search(text):
+            return self._decision("profile_updater", 0.6, "profile update with follow-up request")
+        return self._decision("profile_updater", 0.92, "first-person skill/experience statement")
+
+    def _content_enhancement_rule(self, text: str) -> Optional[Dict[str, Any]]:
+        if not (CONTENT_ACTION_PATTERN.search(text) and CONTENT_TARGET_PATTERN.search(text)):
+            return None
+        confidence = 0.9 if len(text.split()) <= 30 else 0.7
+        return self._decision("content_enhancement", confidence, "profile content improvement request")
+
+    def _career_path_rule(self, text: str) -> Optional[Dict[str, Any]]:
+        if not CAREER_PATTERN.search(text):
+            return None
+        confidence = 0.88 if len(text.split()) <= 40 else 0.7
+        return self._decision("career_path", confidence, "career direction question")
+
+    def _decision(self, agent: str, confidence: float, reason: str) -> Dict[str, Any]:
+        return {"agent": agent, "confidence": confidence, "reason": reason}
+
+# Create a singleton instance
+fast_router = FastRouter(min_confidence=settings.fast_router_min_confidence)
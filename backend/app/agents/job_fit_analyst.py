@@ -1,4 +1,3 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
@@ -6,22 +5,32 @@ from typing import Dict, Any, List
 import json
 
 from app.config import settings
+from app.services.llm_gateway import llm_gateway
+from app.services.semantic_cache import job_fit_cache, fingerprint
+from app.services.prompt_budget import PromptBudget
+from app.services.skill_matcher import skill_matcher
 from app.agents.state import GraphState
 
+# Phrases that mark a message as (containing) a job posting
+JOB_DESCRIPTION_INDICATORS = [
+    "job description", "requirements", "responsibilities",
+    "qualifications", "skills required", "experience required",
+    "we are looking for", "position", "role", "hiring"
+]
+
 class JobFitAnalysis(BaseModel):
     score: int = Field(description="Job fit score as percentage (0-100)")
     summary: str = Field(description="2-sentence summary of fit")
     missing_skills: List[str] = Field(description="Up to 5 missing skills from job description")
     enhancements: List[str] = Field(description="Up to 3 profile enhancement suggestions")
 
+class JobFitNarrative(BaseModel):
+    summary: str = Field(description="2-sentence summary of fit")
+    enhancements: List[str] = Field(description="Up to 3 profile enhancement suggestions")
+
 class JobFitAnalyst:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            api_key=settings.openrouter_api_key,
-            base_url="https://openrouter.ai/api/v1",
-            model="openai/gpt-4o-mini",
-            temperature=0.1
-        )
+        self.llm = llm_gateway.get_chat_model("job_fit_analyst", temperature=0.1)
         
         self.parser = JsonOutputParser(pydantic_object=JobFitAnalysis)
         
@@ -53,6 +62,34 @@ Please analyze the job fit and provide your assessment.""")
         ])
         
         self.chain = self.prompt | self.llm | self.parser
+
+        # Hybrid mode: the score and gaps come from the local skill matcher and
+        # the LLM only writes the narrative around them
+        self.narrative_parser = JsonOutputParser(pydantic_object=JobFitNarrative)
+
+        self.narrative_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are JobFit-GPT, an expert tech recruiter and career coach. A user's profile has already been scored against a job description by skill overlap. Do NOT re-score it.
+
+Your task is to:
+1. Write a brief, 2-sentence summary of why they are or are not a good fit, consistent with the given score
+2. List up to 3 'Profile Enhancement Suggestions' to better align their experience with the job requirements, focusing on the missing skills
+
+{format_instructions}"""),
+            ("human", """User Profile:
+{profile_data}
+
+Job Description:
+{job_description}
+
+Fit score: {score}%
+Matched skills: {matched_skills}
+Skills shown only in experience (not listed as skills): {experience_only_skills}
+Missing skills: {missing_skills}
+
+Please write the summary and enhancement suggestions.""")
+        ])
+
+        self.narrative_chain = self.narrative_prompt | self.llm | self.narrative_parser
     
     def analyze_job_fit(self, state: GraphState) -> GraphState:
         """Analyze job fit between user profile and job description"""
@@ -82,15 +119,16 @@ Once you provide the job details, I'll give you:
             return state
         
         try:
-            # Format profile data for analysis
-            formatted_profile = self._format_profile_for_analysis(profile_data)
-            
-            # Analyze the job fit
-            analysis = self.chain.invoke({
-                "profile_data": formatted_profile,
-                "job_description": job_description,
-                "format_instructions": self.parser.get_format_instructions()
-            })
+            # Deterministic skill-overlap score; None if the posting names too
+            # few known skills, in which case the LLM scores it
+            local_score = None
+            if settings.job_fit_mode in ("hybrid", "fast"):
+                local_score = skill_matcher.score(job_description, profile_data)
+
+            if local_score and settings.job_fit_mode == "fast":
+                analysis = self.build_fast_analysis(local_score)
+            else:
+                analysis = self.analyze_with_llm(job_description, profile_data, local_score)
             
             # Store analysis in state
             state["job_fit_analysis"] = analysis
@@ -106,19 +144,99 @@ Once you provide the job details, I'll give you:
         
         return state
     
+    def analyze_with_llm(self, job_description: str, profile_data: Dict[str, Any],
+                          local_score: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Full LLM analysis, or only the narrative around a local score"""
+        # Fit the posting and profile into the agent's token budget
+        budget = PromptBudget("job_fit_analyst", variables=["profile_data", "job_description"])
+        budget.add("job_description", job_description, priority=100, max_tokens=2000)
+        self._format_profile_for_analysis(profile_data, budget)
+        prompt_vars = budget.render()
+
+        # Near-identical postings (whitespace, reordered boilerplate) against
+        # the same profile reuse an earlier analysis. Postings must name exactly
+        # the same skills with the same weights, so a changed requirement is a
+        # miss however similar the rest of the text is. With a local score only
+        # the narrative is reused, and only one written for the same score and
+        # skill lists; the score fields always come from this posting.
+        local_fields = self._local_fields(local_score) if local_score else None
+        job_skills = sorted(skill_matcher.extract_job_skills(job_description).items())
+        namespace = fingerprint(
+            settings.job_fit_mode,
+            prompt_vars["profile_data"],
+            json.dumps(job_skills),
+            json.dumps(local_fields, sort_keys=True) if local_fields else "llm"
+        )
+        if settings.semantic_cache_enabled:
+            cached = job_fit_cache.get(job_description, namespace)
+            if cached is not None:
+                return {**cached, **local_fields} if local_fields else dict(cached)
+
+        if local_score:
+            narrative = self.narrative_chain.invoke({
+                **prompt_vars,
+                "score": local_score["score"],
+                "matched_skills": ", ".join(local_score["matched_skills"]) or "None",
+                "experience_only_skills": ", ".join(local_score["experience_only_skills"]) or "None",
+                "missing_skills": ", ".join(local_score["missing_skills"]) or "None",
+                "format_instructions": self.narrative_parser.get_format_instructions()
+            })
+            analysis = {
+                **local_fields,
+                "summary": narrative.get("summary", ""),
+                "enhancements": narrative.get("enhancements", [])[:3]
+            }
+        else:
+            analysis = self.chain.invoke({
+                **prompt_vars,
+                "format_instructions": self.parser.get_format_instructions()
+            })
+
+        if settings.semantic_cache_enabled:
+            job_fit_cache.set(job_description, dict(analysis), namespace)
+        return analysis
+
+    def _local_fields(self, local_score: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "score": local_score["score"],
+            "missing_skills": local_score["missing_skills"][:5],
+            "matched_skills": local_score["matched_skills"],
+            "scoring": "local"
+        }
+
+    def build_fast_analysis(self, local_score: Dict[str, Any]) -> Dict[str, Any]:
+        """Templated analysis straight from the local score - no LLM call"""
+        matched = local_score["matched_skills"]
+        partial = local_score["experience_only_skills"]
+        required_missing = local_score["required_missing"]
+        total = len(local_score["job_skills"])
+
+        summary = f"You list {len(matched)} of the {total} skills this posting mentions"
+        summary += f" ({', '.join(matched[:3])})." if matched else "."
+        if required_missing:
+            summary += f" The main gaps are in required skills such as {', '.join(required_missing[:3])}."
+        elif local_score["missing_skills"]:
+            summary += " Your remaining gaps are in nice-to-have skills only."
+        else:
+            summary += " Your skills cover everything the posting asks for."
+
+        enhancements = []
+        for skill in partial[:2]:
+            enhancements.append(f"Add {skill} to your skills section - it only appears in your experience today.")
+        for skill in local_score["missing_skills"]:
+            if len(enhancements) >= 3:
+                break
+            enhancements.append(f"If you have worked with {skill}, add it to your profile with a concrete example; otherwise consider a short project to build it.")
+
+        return {**self._local_fields(local_score), "summary": summary, "enhancements": enhancements}
+
     def _extract_job_description(self, user_query: str) -> str:
         """Extract job description from user query"""
         # Simple extraction - look for common job posting patterns
         query_lower = user_query.lower()
         
         # Check if it looks like a job description
-        job_indicators = [
-            "job description", "requirements", "responsibilities", 
-            "qualifications", "skills required", "experience required",
-            "we are looking for", "position", "role", "hiring"
-        ]
-        
-        if any(indicator in query_lower for indicator in job_indicators):
+        if any(indicator in query_lower for indicator in JOB_DESCRIPTION_INDICATORS):
             return user_query
         
         # If it's a short query asking about job analysis, return empty
@@ -127,34 +245,32 @@ Once you provide the job details, I'll give you:
         
         return user_query
     
-    def _format_profile_for_analysis(self, profile_data: Dict[str, Any]) -> str:
-        """Format profile data for LLM analysis"""
-        formatted = []
+    def _format_profile_for_analysis(self, profile_data: Dict[str, Any], budget: PromptBudget) -> None:
+        """Add profile sections for job fit analysis; lower priorities are dropped first"""
         
         if profile_data.get("name"):
-            formatted.append(f"Name: {profile_data['name']}")
+            budget.add("profile_data", f"Name: {profile_data['name']}", priority=95)
         
         if profile_data.get("headline"):
-            formatted.append(f"Headline: {profile_data['headline']}")
+            budget.add("profile_data", f"Headline: {profile_data['headline']}", priority=90)
         
         if profile_data.get("about"):
-            formatted.append(f"About: {profile_data['about']}")
+            budget.add("profile_data", f"About: {profile_data['about']}", priority=50, max_tokens=250)
         
+        # Skills carry the score, so they outrank everything but the headline
         if profile_data.get("skills"):
             skills_str = ", ".join(profile_data["skills"])
-            formatted.append(f"Skills: {skills_str}")
+            budget.add("profile_data", f"Skills: {skills_str}", priority=85, max_tokens=600)
         
         if profile_data.get("experience"):
-            formatted.append("Experience:")
-            for exp in profile_data["experience"][:5]:  # Top 5 experiences
+            budget.add("profile_data", "Experience:", priority=75, truncatable=False)
+            for i, exp in enumerate(profile_data["experience"][:5]):  # Top 5 experiences
                 exp_str = f"  - {exp.get('title', 'N/A')} at {exp.get('company', 'N/A')}"
                 if exp.get("duration"):
                     exp_str += f" ({exp['duration']})"
+                budget.add("profile_data", exp_str, priority=75 - i, truncatable=False)
                 if exp.get("description"):
-                    exp_str += f"\n    {exp['description'][:200]}..."
-                formatted.append(exp_str)
-        
-        return "\n".join(formatted)
+                    budget.add("profile_data", f"    {exp['description']}", priority=45 - i, max_tokens=60)
     
     def _format_analysis_response(self, analysis: Dict[str, Any]) -> str:
         """Format the analysis into a user-friendly response"""
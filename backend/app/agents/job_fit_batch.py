@@ -0,0 +1,68 @@
+import asyncio
+from typing import Dict, Any, List, AsyncIterator
+
+from app.config import settings
+from app.models.schemas import JobFitAnalysis
+from app.services.executors import executors
+from app.services.skill_matcher import skill_matcher
+from app.agents.job_fit_analyst import job_fit_analyst
+
+async def rank_job_descriptions(profile_data: Dict[str, Any], postings: List[Dict[str, str]],
+                                top_k: int) -> AsyncIterator[Dict[str, Any]]:
+    """Rank one profile against many postings, yielding results as they are ready.
+
+    All postings are scored locally in one vectorized pass and yielded as
+    ``score`` results, best first (``unscored`` for postings naming too few
+    known skills). The ``top_k`` best then get an LLM narrative, at most
+    ``JOB_FIT_BATCH_CONCURRENCY`` at a time, each yielded as a ``narrative``
+    result as soon as it finishes.
+    """
+    texts = [posting["text"] for posting in postings]
+    local_scores = await executors.run("cpu", skill_matcher.score_many, texts, profile_data)
+
+    ranked = []
+    for posting, local_score in zip(postings, local_scores):
+        if local_score is None:
+            yield {"type": "unscored", "id": posting["id"], "reason": "too few recognized skills"}
+            continue
+        ranked.append((posting, local_score))
+    ranked.sort(key=lambda item: (-item[1]["score"], -len(item[1]["matched_skills"])))
+
+    for rank, (posting, local_score) in enumerate(ranked, 1):
+        analysis = job_fit_analyst.build_fast_analysis(local_score)
+        yield {
+            "type": "score",
+            "id": posting["id"],
+            "rank": rank,
+            "analysis": JobFitAnalysis(**analysis).model_dump()
+        }
+
+    semaphore = asyncio.Semaphore(max(1, settings.job_fit_batch_concurrency))
+
+    async def narrate(rank: int, posting: Dict[str, str], local_score: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                analysis = await executors.run(
+                    "llm", job_fit_analyst.analyze_with_llm, posting["text"], profile_data, local_score
+                )
+                return {
+                    "type": "narrative",
+                    "id": posting["id"],
+                    "rank": rank,
+                    "analysis": JobFitAnalysis(**analysis).model_dump()
+                }
+            except Exception as e:
+                print(f"Error writing job fit narrative for {posting['id']}: {e}")
+                return {"type": "error", "id": posting["id"], "rank": rank, "detail": "Narrative generation failed"}
+
+    tasks = [
+        asyncio.create_task(narrate(rank, posting, local_score))
+        for rank, (posting, local_score) in enumerate(ranked[:top_k], 1)
+    ]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # Client went away - don't keep spending LLM calls on its narratives
+        for task in tasks:
+            task.cancel()
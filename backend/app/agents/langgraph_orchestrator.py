@@ -1,8 +1,8 @@
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import HumanMessage, AIMessage
-from typing import Dict, Any, List, Optional # Keep Optional
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple, Union # Keep Optional
 import json
+import time
 
 from app.agents.state import GraphState
 from app.agents.router_agent import router_agent
@@ -11,10 +11,39 @@ from app.agents.career_path_agent import career_path_agent
 from app.agents.profile_updater import profile_updater
 from app.agents.content_enhancement_agent import content_enhancement_agent
 from app.services.firebase_service import firebase_service
+from app.services.checkpointer import create_checkpointer
+from app.services.metrics import metrics
+from app.services.tracing import tracer
+
+# Agent nodes whose LLM tokens are forwarded to streaming clients
+TOKEN_STREAMING_NODES = ("career_path", "content_enhancement", "job_fit_analyst")
+
+# Past exchanges loaded as conversation context for a new turn
+CHAT_HISTORY_CONTEXT = 6
+
+NODE_SECONDS = metrics.histogram("langgraph_node_seconds", "LangGraph node execution time", ["node", "outcome"])
+
+def _timed_node(name: str, node: Callable[[GraphState], GraphState]) -> Callable[[GraphState], GraphState]:
+    """Wrap a node so each run is observed in ``NODE_SECONDS`` and traced as a span"""
+    ok = NODE_SECONDS.labels(name, "ok")
+    error = NODE_SECONDS.labels(name, "error")
+    span_name = f"node.{name}"
+
+    def timed(state: GraphState) -> GraphState:
+        start = time.perf_counter()
+        try:
+            with tracer.span(span_name, {"node": name}):
+                result = node(state)
+        except Exception:
+            error.observe(time.perf_counter() - start)
+            raise
+        ok.observe(time.perf_counter() - start)
+        return result
+    return timed
 
 class LangGraphOrchestrator:
     def __init__(self):
-        self.memory = MemorySaver()
+        self.checkpointer = create_checkpointer()
         self.graph = self._build_graph()
 
     def _build_graph(self) -> StateGraph:
@@ -24,20 +53,21 @@ class LangGraphOrchestrator:
         workflow = StateGraph(GraphState)
 
         # Add nodes (agents) - Keep all nodes from HEAD
-        workflow.add_node("router", self._router_node)
-        workflow.add_node("profile_updater", self._profile_updater_node)
-        workflow.add_node("job_fit_analyst", self._job_fit_analyst_node)
-        workflow.add_node("career_path", self._career_path_node)
-        workflow.add_node("content_enhancement", self._content_enhancement_node)
-        workflow.add_node("human_interaction", self._human_interaction_node)
-        workflow.add_node("resume_after_human", self._resume_after_human_node)
-        workflow.add_node("router_confirmation", self._router_confirmation_node)
-        workflow.add_node("finalize_response", self._finalize_response_node)
+        workflow.add_node("router", _timed_node("router", self._router_node))
+        workflow.add_node("profile_updater", _timed_node("profile_updater", self._profile_updater_node))
+        workflow.add_node("job_fit_analyst", _timed_node("job_fit_analyst", self._job_fit_analyst_node))
+        workflow.add_node("career_path", _timed_node("career_path", self._career_path_node))
+        workflow.add_node("content_enhancement", _timed_node("content_enhancement", self._content_enhancement_node))
+        workflow.add_node("human_interaction", _timed_node("human_interaction", self._human_interaction_node))
+        workflow.add_node("resume_after_human", _timed_node("resume_after_human", self._resume_after_human_node))
+        workflow.add_node("router_confirmation", _timed_node("router_confirmation", self._router_confirmation_node))
+        workflow.add_node("finalize_response", _timed_node("finalize_response", self._finalize_response_node))
 
         # Set entry point - always start with router
         workflow.set_entry_point("router")
 
-        # Router routes to agents or human interaction
+        # Router routes to agents or human interaction. Independent agents are
+        # fanned out as parallel branches and join again at router_confirmation.
         workflow.add_conditional_edges(
             "router",
             self._route_from_router, # Keep this route function
@@ -84,7 +114,7 @@ class LangGraphOrchestrator:
 
         # Compile with interrupt support
         return workflow.compile(
-            checkpointer=self.memory,
+            checkpointer=self.checkpointer,
             interrupt_before=["human_interaction"]  # Interrupt before human node
         )
 
@@ -120,6 +150,15 @@ class LangGraphOrchestrator:
             state["workflow_stage"] = "awaiting_confirmation"
             return state
 
+        # A parallel fan-out already covers every intent of the query
+        parallel_agents = state.get("parallel_agents") or []
+        if len(parallel_agents) > 1:
+            if "completed_agents" not in state.get("agent_scratchpad", {}):
+                state["agent_scratchpad"]["completed_agents"] = []
+            state["agent_scratchpad"]["completed_agents"].extend(parallel_agents)
+            state["workflow_stage"] = "confirmed"
+            return state
+
         # Check if we've processed enough agents
         completed_agents = state.get("agent_scratchpad", {}).get("completed_agents", [])
         if len(completed_agents) >= 2:  # If multiple agents used, might need confirmation
@@ -177,6 +216,17 @@ class LangGraphOrchestrator:
 
     def _finalize_response_node(self, state: GraphState) -> GraphState:
         """Compile all agent outputs into final response"""
+        # Merge the outputs of parallel branches in the order the router chose them
+        parallel_agents = state.get("parallel_agents") or []
+        agent_responses = state.get("agent_responses") or {}
+        if len(parallel_agents) > 1 and agent_responses:
+            state["final_response"] = "\n\n---\n\n".join(
+                agent_responses[agent] for agent in parallel_agents if agent_responses.get(agent)
+            )
+            state["agent_type"] = "+".join(parallel_agents)
+            state["workflow_stage"] = "completed"
+            return state
+
         responses = []
 
         # Gather all agent outputs
@@ -209,7 +259,7 @@ class LangGraphOrchestrator:
         state["workflow_stage"] = "completed"
         return state
 
-    def _route_from_router(self, state: GraphState) -> str:
+    def _route_from_router(self, state: GraphState) -> Union[str, List[str]]:
         """Routing logic from router node"""
         decision = state.get("router_decision", "")
 
@@ -221,6 +271,11 @@ class LangGraphOrchestrator:
         if decision == "end" or state.get("workflow_stage") == "cancelled":
             return "finalize"
 
+        # Fan out independent agents as parallel branches
+        parallel_agents = state.get("parallel_agents") or []
+        if len(parallel_agents) > 1:
+            return parallel_agents
+
         # Route to appropriate agent
         if decision in ["profile_updater", "job_fit_analyst", "career_path", "content_enhancement"]:
             return decision
@@ -266,150 +321,251 @@ class LangGraphOrchestrator:
 
     def _job_fit_analyst_node(self, state: GraphState) -> GraphState:
         """Job fit analyst agent node"""
-        result = job_fit_analyst.analyze_job_fit(state)
-
-        # Track completion
-        if "completed_agents" not in state.get("agent_scratchpad", {}):
-            state["agent_scratchpad"]["completed_agents"] = []
-        state["agent_scratchpad"]["completed_agents"].append("job_fit_analyst")
-
-        return result
+        return self._run_agent(
+            state, "job_fit_analyst", job_fit_analyst.analyze_job_fit, ["job_fit_analysis"]
+        )
 
     def _career_path_node(self, state: GraphState) -> GraphState:
         """Career path agent node"""
-        result = career_path_agent.provide_career_guidance(state)
-
-        # Track completion
-        if "completed_agents" not in state.get("agent_scratchpad", {}):
-            state["agent_scratchpad"]["completed_agents"] = []
-        state["agent_scratchpad"]["completed_agents"].append("career_path")
-
-        return result
+        return self._run_agent(
+            state, "career_path", career_path_agent.provide_career_guidance, ["career_path_response"]
+        )
 
     def _content_enhancement_node(self, state: GraphState) -> GraphState:
         """Content enhancement agent node"""
-        result = content_enhancement_agent.enhance_content(state)
+        return self._run_agent(
+            state, "content_enhancement", content_enhancement_agent.enhance_content,
+            ["content_enhancement_result"]
+        )
+
+    def _run_agent(self, state: GraphState, agent_name: str,
+                   agent_fn: Callable[[GraphState], GraphState],
+                   output_keys: List[str]) -> Dict[str, Any]:
+        """Run an agent node, as a parallel branch when the router fanned out.
+
+        Parallel branches write in the same superstep, so each one returns only
+        the keys it owns plus its response text; the shared fields
+        (final_response, agent_type, ...) are merged by finalize_response.
+        """
+        if len(state.get("parallel_agents") or []) > 1:
+            result = agent_fn(dict(state))
+            update = {key: result.get(key) for key in output_keys}
+            update["agent_responses"] = {agent_name: result.get("final_response", "")}
+            return update
+
+        result = agent_fn(state)
 
         # Track completion
         if "completed_agents" not in state.get("agent_scratchpad", {}):
             state["agent_scratchpad"]["completed_agents"] = []
-        state["agent_scratchpad"]["completed_agents"].append("content_enhancement")
+        state["agent_scratchpad"]["completed_agents"].append(agent_name)
 
         return result
 
+    def _prepare_run(self, session_id: str, user_message: str,
+                     user_profile: Dict[str, Any],
+                     resume_from_interrupt: bool,
+                     chat_history: Optional[List[Dict[str, Any]]] = None) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Build the graph input and thread config for a turn.
+
+        Returns ``None`` as graph input when resuming an interrupted thread.
+        ``chat_history`` (newest first, as ``get_chat_history`` returns it) lets
+        the caller prefetch history; it is read from Firestore otherwise.
+        """
+        # Get thread configuration
+        config = {
+            "configurable": {
+                "thread_id": session_id,
+            }
+        }
+
+        if resume_from_interrupt:
+            # Resume from interrupted state
+            # Get the current state from checkpoint
+            current_state = self.graph.get_state(config)
+            if current_state and current_state.values.get("requires_human_input"):
+                # Add human input to state
+                current_state.values["human_input_received"] = user_message
+
+                # Update the state
+                self.graph.update_state(config, current_state.values)
+
+                # Continue execution from where it was interrupted
+                return None, config
+
+        # New message (or no interrupt state found) - create initial state
+        if chat_history is None:
+            chat_history = firebase_service.get_recent_chat_history(session_id, limit=CHAT_HISTORY_CONTEXT)
+        messages = []
+        for chat in reversed(chat_history):
+            messages.append(HumanMessage(content=chat.get("message", "")))
+            messages.append(AIMessage(content=chat.get("response", "")))
+        messages.append(HumanMessage(content=user_message))
+
+        initial_state = {
+            "session_id": session_id,
+            "user_profile_data": user_profile,
+            "current_user_query": user_message,
+            "chat_history": messages,
+            "agent_type": "",
+            "next_agent": None,
+            "agent_scratchpad": {},
+            "router_decision": "",
+            "parallel_agents": [],
+            "job_fit_analysis": None,
+            "career_path_response": None,
+            "profile_updates": None,
+            "content_enhancement_result": None,
+            "agent_responses": None,
+            "final_response": "",
+            "profile_updated": False,
+            "requires_human_input": False,
+            "human_input_type": None,
+            "human_input_prompt": None,
+            "human_input_received": None,
+            "pending_confirmation": None,
+            "workflow_stage": "processing"
+        }
+        return initial_state, config
+
+    def _build_result(self, session_id: str, user_message: str, config: Dict[str, Any],
+                      resumed: bool = False) -> Dict[str, Any]:
+        """Turn the final checkpointed state into the API response payload.
+
+        ``resumed`` is True when the turn continued an interrupted thread rather
+        than starting fresh (e.g. because its checkpoint was missing).
+        """
+        # Get final state
+        final_state = self.graph.get_state(config).values
+
+        # Check if we're interrupted and waiting for human input
+        if final_state.get("requires_human_input"):
+            return {
+                "message": final_state.get("human_input_prompt", "Please provide input to continue."),
+                "agent_type": "human_interaction",
+                "session_id": session_id,
+                "requires_input": True,
+                "input_type": final_state.get("human_input_type", "general"),
+                "workflow_stage": "awaiting_input",
+                "resumed": resumed
+            }
+
+        # Save conversation if completed
+        if final_state.get("workflow_stage") == "completed":
+            firebase_service.add_chat_history(
+                session_id=session_id,
+                message=user_message,
+                response=final_state.get("final_response", ""),
+                agent_type=final_state.get("agent_type", "unknown")
+            )
+
+        return {
+            "message": final_state.get("final_response", "Processing complete."),
+            "agent_type": final_state.get("agent_type", "unknown"),
+            "session_id": session_id,
+            "profile_updated": final_state.get("profile_updated", False),
+            "job_fit_analysis": final_state.get("job_fit_analysis"),
+            "career_path": final_state.get("career_path_response"),
+            "profile_updates": final_state.get("profile_updates"),
+            "workflow_stage": final_state.get("workflow_stage", "completed"),
+            "resumed": resumed
+        }
+
+    def _error_result(self, session_id: str) -> Dict[str, Any]:
+        """Response payload used when the workflow fails"""
+        return {
+            "message": "I encountered an error processing your request. Please try again.",
+            "agent_type": "error",
+            "session_id": session_id,
+            "workflow_stage": "error"
+        }
+
     def process_message(self, session_id: str, user_message: str,
                         user_profile: Dict[str, Any],
-                        resume_from_interrupt: bool = False) -> Dict[str, Any]:
+                        resume_from_interrupt: bool = False,
+                        chat_history: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Process a message through the graph with interrupt handling"""
 
         try:
-            # Get thread configuration
-            config = {
-                "configurable": {
-                    "thread_id": session_id,
-                }
-            }
-
-            if resume_from_interrupt:
-                # Resume from interrupted state
-                # Get the current state from checkpoint
-                current_state = self.graph.get_state(config)
-                if current_state and current_state.values.get("requires_human_input"):
-                    # Add human input to state
-                    current_state.values["human_input_received"] = user_message
-
-                    # Update the state
-                    self.graph.update_state(config, current_state.values)
-
-                    # Continue execution from where it was interrupted
-                    result = None
-                    for event in self.graph.stream(None, config=config):
-                        result = event
-                else:
-                    # No interrupt state found, treat as new message
-                    resume_from_interrupt = False
-
-            if not resume_from_interrupt:
-                # New message - create initial state
-                chat_history = firebase_service.get_chat_history(session_id, limit=6)
-                messages = []
-                for chat in reversed(chat_history):
-                    messages.append(HumanMessage(content=chat.get("message", "")))
-                    messages.append(AIMessage(content=chat.get("response", "")))
-                messages.append(HumanMessage(content=user_message))
-
-                initial_state = {
-                    "session_id": session_id,
-                    "user_profile_data": user_profile,
-                    "current_user_query": user_message,
-                    "chat_history": messages,
-                    "agent_type": "",
-                    "next_agent": None,
-                    "agent_scratchpad": {},
-                    "router_decision": "",
-                    "job_fit_analysis": None,
-                    "career_path_response": None,
-                    "profile_updates": None,
-                    "content_enhancement_result": None,
-                    "final_response": "",
-                    "profile_updated": False,
-                    "requires_human_input": False,
-                    "human_input_type": None,
-                    "human_input_prompt": None,
-                    "human_input_received": None,
-                    "pending_confirmation": None,
-                    "workflow_stage": "processing"
-                }
+            with tracer.span("graph.run", {"session_id": session_id, "resume": resume_from_interrupt}) as span:
+                graph_input, config = self._prepare_run(
+                    session_id, user_message, user_profile, resume_from_interrupt, chat_history
+                )
 
                 # Process through graph
-                result = None
-                for event in self.graph.stream(initial_state, config=config):
-                    result = event
-
-            # Get final state
-            final_state = self.graph.get_state(config).values
-
-            # Check if we're interrupted and waiting for human input
-            if final_state.get("requires_human_input"):
-                return {
-                    "message": final_state.get("human_input_prompt", "Please provide input to continue."),
-                    "agent_type": "human_interaction",
-                    "session_id": session_id,
-                    "requires_input": True,
-                    "input_type": final_state.get("human_input_type", "general"),
-                    "workflow_stage": "awaiting_input"
-                }
-
-            # Save conversation if completed
-            if final_state.get("workflow_stage") == "completed":
-                firebase_service.add_chat_history(
-                    session_id=session_id,
-                    message=user_message,
-                    response=final_state.get("final_response", ""),
-                    agent_type=final_state.get("agent_type", "unknown")
-                )
+                for _ in self.graph.stream(graph_input, config=config):
+                    pass
 
-            return {
-                "message": final_state.get("final_response", "Processing complete."),
-                "agent_type": final_state.get("agent_type", "unknown"),
-                "session_id": session_id,
-                "profile_updated": final_state.get("profile_updated", False),
-                "job_fit_analysis": final_state.get("job_fit_analysis"),
-                "career_path": final_state.get("career_path_response"),
-                "profile_updates": final_state.get("profile_updates"),
-                "workflow_stage": final_state.get("workflow_stage", "completed")
-            }
+                result = self._build_result(session_id, user_message, config, resumed=graph_input is None)
+                span.set_attribute("agent_type", result.get("agent_type"))
+                return result
 
         except Exception as e:
             print(f"Error in process_message: {e}")
             import traceback
             traceback.print_exc()
-            return {
-                "message": "I encountered an error processing your request. Please try again.",
-                "agent_type": "error",
-                "session_id": session_id,
-                "workflow_stage": "error"
-            }
+            return self._error_result(session_id)
+
+    def stream_message(self, session_id: str, user_message: str,
+                       user_profile: Dict[str, Any],
+                       resume_from_interrupt: bool = False,
+                       chat_history: Optional[List[Dict[str, Any]]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Process a message, yielding ``(event, data)`` pairs as the graph runs.
+
+        Events: ``router_decision``, ``agent_start``, ``node``, ``token``,
+        ``interrupt``, ``done`` and ``error``. The ``done`` event carries the same
+        payload ``process_message`` returns.
+        """
+
+        try:
+            with tracer.span("graph.stream", {"session_id": session_id, "resume": resume_from_interrupt}) as span:
+                graph_input, config = self._prepare_run(
+                    session_id, user_message, user_profile, resume_from_interrupt, chat_history
+                )
+
+                for mode, chunk in self.graph.stream(graph_input, config=config,
+                                                     stream_mode=["updates", "messages"]):
+                    if mode == "messages":
+                        message_chunk, metadata = chunk
+                        node = metadata.get("langgraph_node")
+                        if node in TOKEN_STREAMING_NODES and message_chunk.content:
+                            yield "token", {"agent": node, "content": message_chunk.content}
+                        continue
+
+                    for node, update in chunk.items():
+                        if node.startswith("__"):
+                            continue
+                        update = update or {}
+                        if node == "router":
+                            decision = update.get("router_decision", "")
+                            yield "router_decision", {
+                                "agent": decision,
+                                "parallel_agents": update.get("parallel_agents") or [],
+                                "next_agent": update.get("next_agent")
+                            }
+                            for agent in update.get("parallel_agents") or [decision]:
+                                if agent in TOKEN_STREAMING_NODES or agent == "profile_updater":
+                                    yield "agent_start", {"agent": agent}
+                        else:
+                            yield "node", {
+                                "node": node,
+                                "workflow_stage": update.get("workflow_stage")
+                            }
+
+                result = self._build_result(session_id, user_message, config, resumed=graph_input is None)
+                span.set_attribute("agent_type", result.get("agent_type"))
+                if result.get("requires_input"):
+                    yield "interrupt", {
+                        "message": result["message"],
+                        "input_type": result.get("input_type")
+                    }
+                yield "done", result
+
+        except Exception as e:
+            print(f"Error in stream_message: {e}")
+            import traceback
+            traceback.print_exc()
+            yield "error", self._error_result(session_id)
 
 # Create the orchestrator instance
 orchestrator = LangGraphOrchestrator()
@@ -1,13 +1,13 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List
 import json
 
-from app.config import settings
+from app.services.llm_gateway import llm_gateway
 from app.agents.state import GraphState
 from app.services.firebase_service import firebase_service
+from app.services.prompt_budget import PromptBudget, compact_profile, PROFILE_UPDATER_FIELDS
 
 class ProfileUpdate(BaseModel):
     updates: Dict[str, Any] = Field(description="Profile fields to update")
@@ -15,12 +15,7 @@ class ProfileUpdate(BaseModel):
 
 class ProfileUpdater:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            api_key=settings.openrouter_api_key,
-            base_url="https://openrouter.ai/api/v1",
-            model="openai/gpt-4o-mini",
-            temperature=0.1
-        )
+        self.llm = llm_gateway.get_chat_model("profile_updater", temperature=0.1)
 
         self.parser = JsonOutputParser(pydantic_object=ProfileUpdate)
 
@@ -61,9 +56,11 @@ Extract any profile updates:""")
 
         try:
             # Check for profile updates
+            budget = PromptBudget("profile_updater", variables=["current_profile", "user_message"])
+            budget.add("user_message", user_message, priority=100, max_tokens=800)
+            self._format_current_profile(current_profile, budget)
             result = self.chain.invoke({
-                "current_profile": json.dumps(current_profile, default=str),
-                "user_message": user_message,
+                **budget.render(),
                 "format_instructions": self.parser.get_format_instructions()
             })
 
@@ -107,6 +104,22 @@ Extract any profile updates:""")
         state["agent_type"] = "profile_updater"
         return state
 
+    def _format_current_profile(self, current_profile: Dict[str, Any], budget: PromptBudget) -> None:
+        """Add the updatable profile fields as compact JSON lines (no timestamps or scrape metadata)"""
+        profile = compact_profile(current_profile, PROFILE_UPDATER_FIELDS)
+
+        # Skills are what "only add NEW information" is mostly checked against
+        if "skills" in profile:
+            budget.add("current_profile", f"skills: {json.dumps(profile['skills'])}", priority=90, truncatable=False)
+        if "headline" in profile:
+            budget.add("current_profile", f"headline: {json.dumps(profile['headline'])}", priority=85)
+        if "experience" in profile:
+            for i, exp in enumerate(profile["experience"]):
+                role = {key: exp[key] for key in ("title", "company", "duration") if exp.get(key)}
+                budget.add("current_profile", f"experience: {json.dumps(role)}", priority=70 - i, truncatable=False)
+        if "about" in profile:
+            budget.add("current_profile", f"about: {json.dumps(profile['about'])}", priority=40, max_tokens=300)
+
     def _apply_updates(self, session_id: str, current_profile: Dict[str, Any], updates: Dict[str, Any]) -> bool:
         """Apply updates to the user profile"""
         try:
@@ -130,7 +143,7 @@ Extract any profile updates:""")
                 else:
                     final_updates[field] = value
 
-            return firebase_service.update_user_profile(session_id, final_updates)
+            return firebase_service.update_user_profile(session_id, final_updates, defer=True)
 
         except Exception as e:
             print(f"Error applying updates: {e}")
@@ -1,20 +1,28 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 import json
 
 from app.config import settings
+from app.services.llm_gateway import llm_gateway
 from app.agents.state import GraphState
+from app.services.semantic_cache import router_cache, fingerprint
+from app.services.prompt_budget import PromptBudget, add_chat_history
+from app.agents.fast_router import fast_router
+
+# Agents that don't depend on each other's output and can run as parallel branches
+PARALLEL_SAFE_AGENTS = ["job_fit_analyst", "content_enhancement", "career_path"]
+
+# Chat history messages the LLM router sees
+ROUTER_HISTORY_MESSAGES = 4
+
+# Queries shorter than this ("yes", "tell me more") are never cached - their
+# meaning comes from the conversation, not the words
+ROUTER_CACHE_MIN_WORDS = 4
 
 class RouterAgent:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            api_key=settings.openrouter_api_key,
-            base_url="https://openrouter.ai/api/v1",
-            model="openai/gpt-4o-mini",
-            temperature=0.1
-        )
+        self.llm = llm_gateway.get_chat_model("router", temperature=0.1)
 
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are the brain of a career coaching AI system. You orchestrate the flow between specialized agents to provide comprehensive assistance.
@@ -36,13 +44,17 @@ Complex query examples that might need multiple agents:
 - "Update my skills and suggest how to improve my LinkedIn" → profile_updater THEN content_enhancement
 - "I want to transition to data science, what should I do?" → career_path (might suggest profile_updater after)
 
+Independent intents can run at the same time. If the query needs two or more of job_fit_analyst, content_enhancement and career_path, and none of them depends on another's output, list them all in "parallel_agents" (e.g. "How well do I fit this JD and how should I rewrite my headline?" → job_fit_analyst + content_enhancement). Never put profile_updater in "parallel_agents" - later agents depend on the updated profile, so it must run first on its own.
+
 Response format:
 Respond with a JSON object containing:
 - "agent": The next agent to route to (or "end" if done)
 - "reasoning": Brief explanation of your decision
 - "needs_followup": true/false - whether another agent might be needed after this one
+- "parallel_agents": (optional) list of independent agents to run concurrently; "agent" must be the first of them
 
-Example: {{"agent": "profile_updater", "reasoning": "User provided new skill information", "needs_followup": true}}"""),
+Example: {{"agent": "profile_updater", "reasoning": "User provided new skill information", "needs_followup": true}}
+Example: {{"agent": "job_fit_analyst", "reasoning": "User wants a fit score and a better headline", "needs_followup": false, "parallel_agents": ["job_fit_analyst", "content_enhancement"]}}"""),
             ("human", """Current user query: {user_query}
 
 Chat history context: {chat_history}
@@ -57,38 +69,52 @@ Which agent should handle this next?""")
     def route_query(self, state: GraphState) -> GraphState:
         """Route the user query to the appropriate agent"""
 
-        # Get recent chat history for context
-        recent_history = []
-        if state.get("chat_history"):
-            recent_history = state["chat_history"][-4:] # Last 4 messages
-
-        # Get routing context (which agents have already been used)
-        routing_context = state.get("agent_scratchpad", {}).get("routing_context", "First routing - no agents used yet")
-
-        try:
-            # Get routing decision
-            response = self.chain.invoke({
-                "user_query": state["current_user_query"],
-                "chat_history": "\n".join([f"{msg.type}: {msg.content}" for msg in recent_history]),
-                "routing_context": routing_context
-            })
-
-            # Parse JSON response
-            decision_data = json.loads(response)
-            agent_decision = decision_data.get("agent", "career_path").strip().lower()
-            needs_followup = decision_data.get("needs_followup", False)
-
-        except Exception as e:
-            # Fallback to simple parsing if JSON fails
-            print(f"Router parsing error: {e}")
-            agent_decision = "career_path"
+        # Obvious intents and near-duplicates of earlier queries are resolved
+        # locally. Only on the first routing of a turn - re-routing after an
+        # agent ran needs the LLM's judgement.
+        first_routing = not state.get("agent_scratchpad", {}).get("routing_history")
+        fast_decision = None
+        if settings.fast_router_enabled and first_routing:
+            fast_decision = fast_router.route(state["current_user_query"])
+
+        # The LLM decides with the recent history in view, so a cached decision
+        # is only reused under exactly the same history
+        cached_decision = None
+        use_cache = (settings.semantic_cache_enabled and first_routing
+                     and len(state["current_user_query"].split()) >= ROUTER_CACHE_MIN_WORDS)
+        namespace = self._history_namespace(state) if use_cache else ""
+        if not fast_decision and use_cache:
+            cached_decision = router_cache.get(state["current_user_query"], namespace)
+
+        if fast_decision:
+            agent_decision = fast_decision["agent"]
             needs_followup = False
+            parallel_agents = []
+            confidence = fast_decision["confidence"]
+            source = "rules"
+        elif cached_decision:
+            agent_decision, needs_followup, parallel_agents = cached_decision
+            parallel_agents = list(parallel_agents)
+            confidence = None
+            source = "semantic_cache"
+        else:
+            agent_decision, needs_followup, parallel_agents = self._llm_route(
+                state, cache_namespace=namespace if use_cache else None
+            )
+            confidence = None
+            source = "llm"
 
         # Validate the decision
         valid_agents = ["profile_updater", "job_fit_analyst", "content_enhancement", "career_path", "end"]
         if agent_decision not in valid_agents:
             agent_decision = "career_path" # Default fallback
 
+        # A fan-out covers every intent in the query, so nothing follows it
+        if parallel_agents:
+            agent_decision = parallel_agents[0]
+            needs_followup = False
+        state["parallel_agents"] = parallel_agents
+
         # Update state
         state["router_decision"] = agent_decision
         state["agent_type"] = agent_decision if agent_decision != "end" else state.get("agent_type", "router")
@@ -107,10 +133,83 @@ Which agent should handle this next?""")
         state["agent_scratchpad"]["routing_decisions"].append({
             "query": state["current_user_query"],
             "decision": agent_decision,
-            "needs_followup": needs_followup
+            "needs_followup": needs_followup,
+            "parallel_agents": parallel_agents,
+            "source": source,
+            "confidence": confidence
         })
         return state # Ensure state is returned
 
+    def _recent_history(self, state: GraphState) -> List[Dict[str, Any]]:
+        """The turns before the current query, which ends ``chat_history``.
+
+        The query itself is passed separately and must stay out of the cache
+        namespace, or no two queries would ever share an entry.
+        """
+        return (state.get("chat_history") or [])[:-1][-ROUTER_HISTORY_MESSAGES:]
+
+    def _history_namespace(self, state: GraphState) -> str:
+        return fingerprint(*(json.dumps(message, sort_keys=True, default=str)
+                             for message in self._recent_history(state)))
+
+    def _llm_route(self, state: GraphState, cache_namespace: Optional[str] = None) -> Tuple[str, bool, List[str]]:
+        """Ask the LLM for the next agent, whether a follow-up is needed and any fan-out.
+
+        With ``cache_namespace`` set, a successfully parsed decision is stored
+        in the semantic cache for near-duplicate queries under that history.
+        """
+
+        # Get recent chat history for context
+        recent_history = self._recent_history(state)
+
+        # Get routing context (which agents have already been used)
+        routing_context = state.get("agent_scratchpad", {}).get("routing_context", "First routing - no agents used yet")
+
+        try:
+            # Fit query and history into the router's token budget
+            budget = PromptBudget("router", variables=["user_query", "chat_history"])
+            budget.add("user_query", state["current_user_query"], priority=100, max_tokens=600)
+            add_chat_history(budget, recent_history, priority=50)
+
+            # Get routing decision
+            response = self.chain.invoke({
+                **budget.render(),
+                "routing_context": routing_context
+            })
+
+            # Parse JSON response
+            decision_data = json.loads(response)
+            agent_decision = decision_data.get("agent", "career_path").strip().lower()
+            needs_followup = decision_data.get("needs_followup", False)
+            parallel_agents = self._validate_parallel_agents(decision_data.get("parallel_agents"))
+
+            if cache_namespace is not None:
+                router_cache.set(
+                    state["current_user_query"],
+                    (agent_decision, needs_followup, tuple(parallel_agents)),
+                    cache_namespace
+                )
+
+        except Exception as e:
+            # Fallback to simple parsing if JSON fails
+            print(f"Router parsing error: {e}")
+            agent_decision = "career_path"
+            needs_followup = False
+            parallel_agents = []
+
+        return agent_decision, needs_followup, parallel_agents
+
+    def _validate_parallel_agents(self, agents: Any) -> List[str]:
+        """Keep only distinct parallel-safe agents; a fan-out needs at least two"""
+        if not isinstance(agents, list):
+            return []
+        validated = []
+        for agent in agents:
+            agent = str(agent).strip().lower()
+            if agent in PARALLEL_SAFE_AGENTS and agent not in validated:
+                validated.append(agent)
+        return validated if len(validated) > 1 else []
+
 
 # Instantiate the RouterAgent class to make it importable
 router_agent = RouterAgent()
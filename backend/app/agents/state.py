@@ -3,6 +3,13 @@ from langchain_core.messages import BaseMessage
 import operator
 from typing_extensions import Annotated
 
+def merge_agent_responses(left: Optional[Dict[str, str]],
+                          right: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Reducer for per-agent responses: parallel branches merge, ``None`` resets"""
+    if right is None:
+        return {}
+    return {**(left or {}), **right}
+
 class GraphState(TypedDict):
     """State object for the LangGraph multi-agent system"""
 
@@ -21,12 +28,14 @@ class GraphState(TypedDict):
     # Agent outputs and scratchpad
     agent_scratchpad: Dict[str, Any]
     router_decision: str
+    parallel_agents: List[str]  # Independent agents fanned out concurrently this turn
 
     # Specialized outputs
     job_fit_analysis: Optional[Dict[str, Any]]
     career_path_response: Optional[Dict[str, Any]]
     profile_updates: Optional[Dict[str, Any]]
     content_enhancement_result: Optional[str]
+    agent_responses: Annotated[Dict[str, str], merge_agent_responses]  # Response text per fanned-out agent
 
     # Final response
     final_response: str
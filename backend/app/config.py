@@ -10,6 +10,64 @@ class Settings(BaseSettings):
     openrouter_api_key: str = os.getenv("OPENROUTER_API_KEY", "")
     apify_api_token: str = os.getenv("APIFY_API_TOKEN", "")
     
+    # LLM gateway (one shared connection pool for all agents)
+    llm_base_url: str = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+    llm_model: str = os.getenv("LLM_MODEL", "openai/gpt-4o-mini")
+    llm_agent_overrides: str = os.getenv("LLM_AGENT_OVERRIDES", "")  # JSON, e.g. {"router": {"model": "...", "temperature": 0}}
+    llm_http2: bool = os.getenv("LLM_HTTP2", "True").lower() == "true"
+    llm_pool_max_connections: int = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "64"))
+    llm_pool_max_keepalive: int = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "32"))
+    llm_pool_keepalive_expiry: float = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60"))
+    llm_timeout_seconds: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "90"))
+
+    # Exact-match LLM response cache (memory LRU + on-disk tier)
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "True").lower() == "true"
+    llm_cache_ttl_seconds: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+    llm_cache_agent_ttls: str = os.getenv("LLM_CACHE_AGENT_TTLS", "")  # JSON, e.g. {"router": 86400, "profile_updater": 0}
+    llm_cache_memory_entries: int = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1000"))
+    llm_cache_path: str = os.getenv("LLM_CACHE_PATH", "cache/llm_cache.sqlite")
+    llm_cache_disk_max_bytes: int = int(os.getenv("LLM_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+
+    # Similarity-keyed cache for router decisions and job-fit analyses
+    semantic_cache_enabled: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "True").lower() == "true"
+    semantic_cache_router_threshold: float = float(os.getenv("SEMANTIC_CACHE_ROUTER_THRESHOLD", "0.9"))
+    semantic_cache_job_fit_threshold: float = float(os.getenv("SEMANTIC_CACHE_JOB_FIT_THRESHOLD", "0.98"))
+    semantic_cache_max_entries: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000"))  # Per cache
+    semantic_cache_ttl_seconds: int = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+
+    # Token budgets for profile/history/query in agent prompts
+    prompt_token_budget_default: int = int(os.getenv("PROMPT_TOKEN_BUDGET_DEFAULT", "3000"))
+    prompt_token_budgets: str = os.getenv("PROMPT_TOKEN_BUDGETS", "")  # JSON, e.g. {"router": 800, "job_fit_analyst": 4000}
+
+    # Job fit scoring: llm (LLM does everything), hybrid (local score, LLM narrative) or fast (no LLM)
+    job_fit_mode: str = os.getenv("JOB_FIT_MODE", "hybrid").lower()
+    job_fit_batch_max_postings: int = int(os.getenv("JOB_FIT_BATCH_MAX_POSTINGS", "500"))
+    job_fit_batch_concurrency: int = int(os.getenv("JOB_FIT_BATCH_CONCURRENCY", "4"))  # Narratives written at once
+
+    # Skill -> session index for matching sessions to a job description
+    profile_index_enabled: bool = os.getenv("PROFILE_INDEX_ENABLED", "False").lower() == "true"
+    profile_index_refresh_seconds: int = int(os.getenv("PROFILE_INDEX_REFRESH_SECONDS", "0"))  # 0 = build once, on first query
+
+    # Sent as X-Admin-Key to admin-only endpoints (/match/sessions); unset = those endpoints are off
+    admin_api_key: str = os.getenv("ADMIN_API_KEY", "")
+
+    # Read-through profile cache in FirebaseService
+    profile_cache_enabled: bool = os.getenv("PROFILE_CACHE_ENABLED", "True").lower() == "true"
+    profile_cache_ttl_seconds: int = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", "300"))
+    profile_cache_max_entries: int = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "5000"))
+    profile_cache_invalidation: str = os.getenv("PROFILE_CACHE_INVALIDATION", "none").lower()  # none or firestore
+
+    # Write-behind queue for chat history and profile updates
+    write_behind_enabled: bool = os.getenv("WRITE_BEHIND_ENABLED", "True").lower() == "true"
+    write_behind_max_pending: int = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000"))  # Buffered writes before callers write inline
+    write_behind_batch_size: int = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "200"))  # Firestore allows up to 500
+    write_behind_flush_interval: float = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "0.25"))  # Seconds
+    write_behind_max_retries: int = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "5"))
+    write_behind_shutdown_timeout: float = float(os.getenv("WRITE_BEHIND_SHUTDOWN_TIMEOUT", "10"))
+
+    # Rolling chat-history window document (one read per context load)
+    chat_window_size: int = int(os.getenv("CHAT_WINDOW_SIZE", "20"))  # Turns kept; 0 = query chat_history instead
+
     # Firebase Configuration
     firebase_project_id: str = os.getenv("FIREBASE_PROJECT_ID", "")
     firebase_credentials_path: str = os.getenv("FIREBASE_CREDENTIALS_PATH", "")
@@ -19,6 +77,50 @@ class Settings(BaseSettings):
     app_title: str = "AI Career Coach"
     app_version: str = "1.0.0"
     debug: bool = os.getenv("DEBUG", "False").lower() == "true"
+    web_concurrency: int = int(os.getenv("WEB_CONCURRENCY", "2"))  # Worker processes per instance
+
+    # Concurrency limits for blocking dependencies (threads per executor)
+    scraper_max_workers: int = int(os.getenv("SCRAPER_MAX_WORKERS", "4"))
+    llm_max_workers: int = int(os.getenv("LLM_MAX_WORKERS", "32"))
+    cpu_max_workers: int = int(os.getenv("CPU_MAX_WORKERS", "2"))  # Local scoring; holds the GIL, so keep it small
+    scrape_job_queue_size: int = int(os.getenv("SCRAPE_JOB_QUEUE_SIZE", "100"))
+    scrape_job_timeout_seconds: int = int(os.getenv("SCRAPE_JOB_TIMEOUT_SECONDS", "900"))  # Pending longer than this = failed
+    # Concurrent scrapes are coalesced into multi-profile actor runs (SCRAPER_MAX_WORKERS runs at a time)
+    scrape_batch_enabled: bool = os.getenv("SCRAPE_BATCH_ENABLED", "True").lower() == "true"
+    scrape_batch_window_seconds: float = float(os.getenv("SCRAPE_BATCH_WINDOW_SECONDS", "0.5"))  # Wait for more URLs
+    scrape_batch_max_urls: int = int(os.getenv("SCRAPE_BATCH_MAX_URLS", "10"))  # Profiles per actor run
+
+    # Scraped profile cache keyed by canonical LinkedIn URL
+    scrape_cache_enabled: bool = os.getenv("SCRAPE_CACHE_ENABLED", "True").lower() == "true"
+    scrape_cache_ttl_seconds: int = int(os.getenv("SCRAPE_CACHE_TTL_SECONDS", "86400"))  # Served without re-scraping
+    scrape_cache_stale_seconds: int = int(os.getenv("SCRAPE_CACHE_STALE_SECONDS", "604800"))  # Served stale while re-scraping; 0 = off
+    scrape_cache_max_entries: int = int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "10000"))
+    scrape_cache_path: str = os.getenv("SCRAPE_CACHE_PATH", "cache/scrape_cache.sqlite")
+
+    # Raw actor items, kept for re-running the profile mapping (scripts/reprocess_scrapes.py)
+    scrape_archive_enabled: bool = os.getenv("SCRAPE_ARCHIVE_ENABLED", "True").lower() == "true"
+    scrape_archive_path: str = os.getenv("SCRAPE_ARCHIVE_PATH", "data/scrape_archive")
+    scrape_archive_versions: int = int(os.getenv("SCRAPE_ARCHIVE_VERSIONS", "3"))  # Scrapes kept per profile
+
+    # Request tracing: spans for requests, graph nodes, chains, Firestore and scraper calls
+    tracing_enabled: bool = os.getenv("TRACING_ENABLED", "False").lower() == "true"
+    trace_sample_rate: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))  # Fraction of traces recorded, decided when a trace starts
+    trace_exporter: str = os.getenv("TRACE_EXPORTER", "file")  # file (JSON lines) or otlp (OTLP/HTTP collector)
+    trace_file_path: str = os.getenv("TRACE_FILE_PATH", "data/traces.jsonl")
+    trace_collector_url: str = os.getenv("TRACE_COLLECTOR_URL", "http://localhost:4318/v1/traces")
+    trace_queue_size: int = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))  # Spans buffered for export; extra spans are dropped
+    trace_export_interval: float = float(os.getenv("TRACE_EXPORT_INTERVAL", "1.0"))  # Seconds between exports when idle
+
+    # Rule-based fast-path router (skips the LLM router for obvious intents)
+    fast_router_enabled: bool = os.getenv("FAST_ROUTER_ENABLED", "True").lower() == "true"
+    fast_router_min_confidence: float = float(os.getenv("FAST_ROUTER_MIN_CONFIDENCE", "0.85"))
+
+    # LangGraph checkpointer: memory, sqlite or firestore
+    checkpointer_backend: str = os.getenv("CHECKPOINTER_BACKEND", "memory")
+    checkpoint_sqlite_path: str = os.getenv("CHECKPOINT_SQLITE_PATH", "checkpoints.sqlite")
+    checkpoint_ttl_seconds: int = int(os.getenv("CHECKPOINT_TTL_SECONDS", "86400"))  # Idle threads are evicted after this
+    checkpoint_history: int = int(os.getenv("CHECKPOINT_HISTORY", "4"))  # Checkpoints kept per thread
+    checkpoint_max_threads: int = int(os.getenv("CHECKPOINT_MAX_THREADS", "10000"))  # Threads held in process memory
     
     # CORS
     cors_origins: list = [
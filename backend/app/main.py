@@ -1,8 +1,15 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 import uvicorn
-from typing import Dict, Any
+import asyncio
+import hmac
+import json
+import os
+import socket
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
 
 from app.config import settings
 from app.models.schemas import (
@@ -10,11 +17,35 @@ from app.models.schemas import (
     ChatMessage,
     ChatResponse,
     SessionResponse,
-    UserProfile
+    SessionStatusResponse,
+    UserProfile,
+    JobDescriptionInput,
+    JobFitBatchRequest,
+    SessionMatchRequest,
+    SessionMatchResponse
 )
 from app.services.firebase_service import firebase_service
+from app.services.async_firebase_service import async_firebase_service
+from app.services.scrape_cache import scrape_cache
 from app.services.linkedin_scraper import linkedin_scraper
-from app.agents.langgraph_orchestrator import orchestrator # Ensure this import is correct
+from app.services.scrape_jobs import (
+    scrape_jobs,
+    ScrapeQueueFull,
+    pending_expired,
+    PROFILE_PENDING,
+    PROFILE_READY,
+    PROFILE_FAILED
+)
+from app.services.executors import executors
+from app.services.llm_gateway import llm_gateway
+from app.services.llm_cache import llm_cache
+from app.services.semantic_cache import semantic_cache_stats
+from app.services.profile_index import profile_index
+from app.services.metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from app.services.tracing import tracer, parse_traceparent, format_traceparent
+from app.agents.langgraph_orchestrator import orchestrator, CHAT_HISTORY_CONTEXT # Ensure this import is correct
+from app.agents.fast_router import fast_router
+from app.agents.job_fit_batch import rank_job_descriptions
 
 # Create FastAPI app
 app = FastAPI(
@@ -32,6 +63,149 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Identifies the process that served a request (useful behind multiple workers)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+@app.middleware("http")
+async def add_worker_header(request: Request, call_next):
+    response = await call_next(request)
+    response.headers["X-Worker-Id"] = WORKER_ID
+    return response
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_seconds",
+    "Time to response headers (first byte for streaming endpoints) by route template",
+    ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_FLIGHT = metrics.gauge("http_requests_in_flight", "Requests currently being handled")
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        # The matched route's template keeps session IDs out of the label values
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            request.method, route.path if route is not None else "unmatched", status
+        ).observe(time.perf_counter() - start)
+
+class TracedResponse:
+    """Sends the wrapped response, then ends the request span.
+
+    The span ends with the body, so streaming endpoints are timed to their last
+    event. It also ends when the client disconnects mid-stream or before the
+    body was started, which a wrapped body iterator would miss.
+    """
+
+    def __init__(self, response: Response, span):
+        self.response = response
+        self.span = span
+
+    def __getattr__(self, name: str):
+        return getattr(self.response, name)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.response(scope, receive, send)
+        finally:
+            self.span.end()
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    """Root span of the request's trace; continues the caller's trace when a ``traceparent`` is sent"""
+    span = tracer.start_span("http.request", {"http.method": request.method},
+                             parent=parse_traceparent(request.headers.get("traceparent")))
+    tokens = tracer.activate(span)
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        span.record_error(e)
+        span.end()
+        raise
+    finally:
+        tracer.deactivate(tokens)
+    if not span.sampled:
+        return response
+
+    route = request.scope.get("route")
+    span.name = f"{request.method} {route.path if route is not None else 'unmatched'}"
+    span.set_attribute("http.status_code", response.status_code)
+    span.set_attribute("session_id", request.scope.get("path_params", {}).get("session_id"))
+    response.headers["traceparent"] = format_traceparent(span)
+    return TracedResponse(response, span)
+
+def _component_metrics():
+    """Counters and gauges the components already track, read at scrape time"""
+    profile_cache = firebase_service.profile_cache_stats()
+    scrape_cache_stats = scrape_cache.stats() if scrape_cache else {}
+    llm_cache_stats = llm_cache.stats()
+    semantic = semantic_cache_stats()
+    router = fast_router.stats()
+    checkpoints = orchestrator.checkpointer.stats()
+    llm = llm_gateway.stats()
+    write_behind = firebase_service.write_behind_stats()
+    batching = linkedin_scraper.coordinator_stats()
+
+    lookups = [
+        ({"cache": "profile", "result": "hit"}, profile_cache.get("hits")),
+        ({"cache": "profile", "result": "miss"}, profile_cache.get("misses")),
+        ({"cache": "scrape", "result": "hit"}, scrape_cache_stats.get("hits")),
+        ({"cache": "scrape", "result": "stale_hit"}, scrape_cache_stats.get("stale_hits")),
+        ({"cache": "scrape", "result": "miss"}, scrape_cache_stats.get("misses"))
+    ]
+    for name in ("router", "job_fit"):
+        lookups.append(({"cache": f"semantic_{name}", "result": "hit"}, semantic[name]["hits"]))
+        lookups.append(({"cache": f"semantic_{name}", "result": "miss"}, semantic[name]["misses"]))
+    for agent, stats in llm_cache_stats["agents"].items():
+        for result, key in (("hit", "hits"), ("miss", "misses"), ("bypassed", "bypassed")):
+            lookups.append(({"cache": f"llm_{agent}", "result": result}, stats[key]))
+
+    return [
+        ("cache_lookups_total", "counter", "Cache lookups by cache and result", lookups),
+        ("fast_router_decisions_total", "counter", "Routing decisions by the rule fast path or the LLM router", [
+            ({"path": "rule"}, router["rule_hits"]),
+            ({"path": "llm"}, router["llm_fallbacks"])
+        ]),
+        ("checkpoint_threads", "gauge", "Conversation threads held by the checkpointer store",
+         [({"backend": checkpoints["backend"]}, checkpoints.get("threads"))]),
+        ("checkpoint_count", "gauge", "Checkpoints held by the checkpointer store",
+         [({"backend": checkpoints["backend"]}, checkpoints.get("checkpoints"))]),
+        ("checkpoint_bytes", "gauge", "Serialized size of the checkpointer store",
+         [({"backend": checkpoints["backend"]}, checkpoints.get("bytes"))]),
+        ("llm_requests_in_flight", "gauge", "LLM HTTP requests in flight", [({}, llm["in_flight"])]),
+        ("llm_pool_connections", "gauge", "Open connections in the LLM connection pool",
+         [({"state": "open"}, llm["pool"].get("connections")), ({"state": "idle"}, llm["pool"].get("idle"))]),
+        ("write_behind_pending", "gauge", "Buffered Firestore writes waiting for a batch commit",
+         [({}, write_behind.get("pending"))]),
+        ("write_behind_writes_total", "counter", "Buffered Firestore writes by result", [
+            ({"result": "committed"}, write_behind.get("committed")),
+            ({"result": "failed"}, write_behind.get("failed"))
+        ]),
+        ("scrape_batch_urls", "gauge", "Profile URLs waiting for or inside a shared Apify actor run", [
+            ({"state": "pending"}, batching.get("pending")),
+            ({"state": "in_flight"}, batching.get("in_flight"))
+        ]),
+        ("scrape_jobs_pending", "gauge", "Background profile scrapes waiting for a worker",
+         [({}, scrape_jobs.pending())])
+    ]
+
+metrics.register_collector(_component_metrics)
+
+@app.on_event("shutdown")
+async def shutdown_executors():
+    """Commit buffered Firestore writes and spans, then release the thread pools and the LLM connection pool"""
+    firebase_service.flush_writes(settings.write_behind_shutdown_timeout)
+    tracer.flush()
+    executors.shutdown(wait=False)
+    llm_gateway.close()
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -41,10 +215,67 @@ async def root():
         "status": "running"
     }
 
+@app.get("/stats")
+async def get_stats():
+    """Runtime counters of the performance components"""
+    return {
+        "router": fast_router.stats(),
+        "checkpointer": orchestrator.checkpointer.stats(),
+        "llm": llm_gateway.stats(),
+        "llm_cache": llm_cache.stats(),
+        "semantic_cache": semantic_cache_stats(),
+        "profile_index": profile_index.stats(),
+        "profile_cache": firebase_service.profile_cache_stats(),
+        "write_behind": firebase_service.write_behind_stats(),
+        "scrape_cache": scrape_cache.stats() if scrape_cache else {"enabled": False},
+        "scrape_batching": linkedin_scraper.coordinator_stats(),
+        "tracing": tracer.stats()
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint; every worker process reports its own metrics"""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+MANUAL_PROFILE_WELCOME = """Welcome to your AI Career Coach! 🚀
+
+I wasn't able to automatically scrape your LinkedIn profile, but that's okay! I can still help you with:
+
+✅ **Career guidance and planning**
+✅ **Job fit analysis (just paste job descriptions)**
+✅ **LinkedIn profile content improvement**
+✅ **Skills development recommendations**
+
+You can also manually share your background information with me, and I'll update your profile as we chat.
+
+**To get started, try asking:**
+- "Help me analyze this job description..." (paste the JD)
+- "I'm a software engineer with 3 years experience, what should I focus on?"
+- "How can I transition from X to Y role?"
+
+What would you like to work on today?"""
+
+PENDING_PROFILE_WELCOME = """Welcome to your AI Career Coach! 🚀
+
+I'm analyzing your LinkedIn profile in the background - this usually takes a minute or two. Your profile will appear in the sidebar as soon as it's ready.
+
+In the meantime, I can already help you with:
+
+✅ **Job Fit Analysis** - Paste any job description for detailed compatibility analysis
+✅ **Career Path Guidance** - Get personalized advice for your career goals
+✅ **Profile Enhancement** - Improve your LinkedIn content for better visibility
+✅ **Skills Development** - Identify key areas for growth
+
+What would you like to work on today?"""
+
 @app.post("/start_session", response_model=SessionResponse)
 async def start_session(request: LinkedInProfileRequest):
     """
-    Start a new career coaching session by scraping LinkedIn profile
+    Start a new career coaching session.
+
+    The session is created immediately with ``profile_status: pending`` and the
+    LinkedIn profile is scraped by a background job; poll
+    ``/session/{session_id}/status`` to learn when enrichment is done.
     """
     try:
         linkedin_url = request.linkedin_url.strip()
@@ -56,41 +287,95 @@ async def start_session(request: LinkedInProfileRequest):
                 detail="Please provide a valid LinkedIn profile URL"
             )
 
-        # Scrape LinkedIn profile
-        print(f"Scraping LinkedIn profile: {linkedin_url}")
-        profile_data = linkedin_scraper.scrape_profile(linkedin_url)
-
-        if not profile_data:
-            # Create session without scraped data - allow manual profile building
-            session_id = firebase_service.create_user_session(linkedin_url)
-
+        # Create the session first so the client can start chatting right away
+        session_id = await async_firebase_service.create_user_session(
+            linkedin_url,
+            {"profile_status": PROFILE_PENDING, "scrape_started_at": datetime.utcnow()}
+        )
+        tracer.set_attribute("session_id", session_id)
+
+        try:
+            scrape_jobs.submit(session_id, linkedin_url)
+        except ScrapeQueueFull as e:
+            print(f"Skipping profile scrape for session {session_id}: {e}")
+            await async_firebase_service.update_user_profile(
+                session_id,
+                {"profile_status": PROFILE_FAILED}
+            )
             return SessionResponse(
                 session_id=session_id,
-                message="""Welcome to your AI Career Coach! 🚀
+                message=MANUAL_PROFILE_WELCOME,
+                profile_data=None,
+                profile_status=PROFILE_FAILED
+            )
 
-I wasn't able to automatically scrape your LinkedIn profile, but that's okay! I can still help you with:
+        return SessionResponse(
+            session_id=session_id,
+            message=PENDING_PROFILE_WELCOME,
+            profile_data=None,
+            profile_status=PROFILE_PENDING
+        )
 
-✅ **Career guidance and planning**
-✅ **Job fit analysis (just paste job descriptions)**
-✅ **LinkedIn profile content improvement**
-✅ **Skills development recommendations**
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error starting session: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to start session. Please try again."
+        )
 
-You can also manually share your background information with me, and I'll update your profile as we chat.
+@app.get("/session/{session_id}/status", response_model=SessionStatusResponse)
+async def get_session_status(session_id: str):
+    """
+    Get the LinkedIn enrichment status of a session.
 
-**To get started, try asking:**
-- "Help me analyze this job description..." (paste the JD)
-- "I'm a software engineer with 3 years experience, what should I focus on?"
-- "How can I transition from X to Y role?"
+    Once the status is ``ready`` the response includes the scraped profile and
+    the personalised welcome message.
+    """
+    try:
+        profile = await async_firebase_service.get_user_profile(session_id)
+        if not profile:
+            raise HTTPException(
+                status_code=404,
+                detail="Session not found. Please start a new session."
+            )
+
+        # Sessions created before background scraping have no status field
+        profile_status = profile.get("profile_status", PROFILE_READY)
+        if profile_status == PROFILE_PENDING and pending_expired(profile, settings.scrape_job_timeout_seconds):
+            # The job was lost (e.g. in a restart) - let the user continue without the profile
+            profile_status = PROFILE_FAILED
 
-What would you like to work on today?""",
-                profile_data=None
+        if profile_status == PROFILE_READY:
+            return SessionStatusResponse(
+                session_id=session_id,
+                profile_status=profile_status,
+                message=_build_welcome_message(profile),
+                profile_data=_to_user_profile(session_id, profile.get("linkedin_url", ""), profile)
             )
 
-        # Create session with scraped profile data
-        session_id = firebase_service.create_user_session(linkedin_url, profile_data)
+        if profile_status == PROFILE_FAILED:
+            return SessionStatusResponse(
+                session_id=session_id,
+                profile_status=profile_status,
+                message=MANUAL_PROFILE_WELCOME
+            )
 
-        # Create welcome message based on profile
-        welcome_message = f"""Welcome to your AI Career Coach, {profile_data.get('name', 'there')}! 🚀
+        return SessionStatusResponse(session_id=session_id, profile_status=profile_status)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting session status: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to retrieve session status"
+        )
+
+def _build_welcome_message(profile_data: Dict[str, Any]) -> str:
+    """Create welcome message based on the scraped profile"""
+    return f"""Welcome to your AI Career Coach, {profile_data.get('name', 'there')}! 🚀
 
 I've analyzed your LinkedIn profile and I'm ready to help you with:
 
@@ -112,36 +397,22 @@ I've analyzed your LinkedIn profile and I'm ready to help you with:
 
 What would you like to work on today?"""
 
-        # Convert to UserProfile format for response
-        user_profile = UserProfile(
-            session_id=session_id,
-            linkedin_url=linkedin_url,
-            name=profile_data.get('name'),
-            about=profile_data.get('about'),
-            skills=profile_data.get('skills', []),
-            experience=[{
-                'title': exp.get('title', ''),
-                'company': exp.get('company', ''),
-                'duration': exp.get('duration'),
-                'description': exp.get('description')
-            } for exp in profile_data.get('experience', [])],
-            education=profile_data.get('education', [])
-        )
-
-        return SessionResponse(
-            session_id=session_id,
-            message=welcome_message,
-            profile_data=user_profile
-        )
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error starting session: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to start session. Please try again."
-        )
+def _to_user_profile(session_id: str, linkedin_url: str, profile_data: Dict[str, Any]) -> UserProfile:
+    """Convert stored profile data to UserProfile format for responses"""
+    return UserProfile(
+        session_id=session_id,
+        linkedin_url=linkedin_url,
+        name=profile_data.get('name'),
+        about=profile_data.get('about'),
+        skills=profile_data.get('skills', []),
+        experience=[{
+            'title': exp.get('title', ''),
+            'company': exp.get('company', ''),
+            'duration': exp.get('duration'),
+            'description': exp.get('description')
+        } for exp in profile_data.get('experience', [])],
+        education=profile_data.get('education', [])
+    )
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatMessage):
@@ -158,8 +429,10 @@ async def chat(request: ChatMessage):
                 detail="Session ID and message are required"
             )
 
-        # Get user profile
-        user_profile = firebase_service.get_user_profile(session_id)
+        tracer.set_attribute("session_id", session_id)
+
+        # Get user profile and conversation context in parallel
+        user_profile, chat_history = await _load_turn_context(session_id, request.resume_from_interrupt)
         if not user_profile:
             raise HTTPException(
                 status_code=404,
@@ -168,24 +441,18 @@ async def chat(request: ChatMessage):
 
         # **** IMPORTANT: Orchestrator invocation was missing. Adding it here. ****
         # This is where the LangGraph workflow is initiated and 'result' is populated.
-        result = orchestrator.process_message(
-            session_id=session_id,
-            user_message=message,
-            user_profile=user_profile,
-            resume_from_interrupt=request.dict().get("resume_from_interrupt", False)
-        )
+        with llm_cache.bypass(request.bypass_cache):
+            result = await executors.run(
+                "llm",
+                orchestrator.process_message,
+                session_id=session_id,
+                user_message=message,
+                user_profile=user_profile,
+                resume_from_interrupt=request.dict().get("resume_from_interrupt", False),
+                chat_history=chat_history
+            )
         
-        return ChatResponse(
-            message=result["message"],
-            agent_type=result["agent_type"],
-            session_id=session_id,
-            profile_updated=result.get("profile_updated", False),
-            job_fit_analysis=result.get("job_fit_analysis"),
-            career_path=result.get("career_path"),
-            requires_input=result.get("requires_input", False),
-            input_type=result.get("input_type"),
-            workflow_stage=result.get("workflow_stage", "completed")
-        )
+        return _to_chat_response(result, session_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -195,13 +462,214 @@ async def chat(request: ChatMessage):
             detail="Failed to process message. Please try again."
         )
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatMessage):
+    """
+    Process a chat message and stream the workflow as Server-Sent Events.
+
+    Emits ``router_decision``, ``agent_start``, ``node``, ``token`` and
+    ``interrupt`` events while the graph runs, then a final ``done`` event
+    carrying the same payload as ``/chat`` (or an ``error`` event).
+    """
+    session_id = request.session_id.strip()
+    message = request.message.strip()
+
+    if not session_id or not message:
+        raise HTTPException(
+            status_code=400,
+            detail="Session ID and message are required"
+        )
+
+    tracer.set_attribute("session_id", session_id)
+
+    # Get user profile before the stream starts so a bad session is a plain 404
+    user_profile, chat_history = await _load_turn_context(session_id, request.resume_from_interrupt)
+    if not user_profile:
+        raise HTTPException(
+            status_code=404,
+            detail="Session not found. Please start a new session."
+        )
+
+    async def event_source():
+        try:
+            with llm_cache.bypass(request.bypass_cache):
+                async for event, data in executors.iterate(
+                    "llm",
+                    orchestrator.stream_message,
+                    session_id=session_id,
+                    user_message=message,
+                    user_profile=user_profile,
+                    resume_from_interrupt=request.resume_from_interrupt,
+                    chat_history=chat_history
+                ):
+                    if event == "done":
+                        data = _to_chat_response(data, session_id).model_dump()
+                    yield _format_sse(event, data)
+        except Exception as e:
+            print(f"Error streaming chat: {e}")
+            yield _format_sse("error", {"detail": "Failed to process message. Please try again."})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _load_turn_context(session_id: str, resume_from_interrupt: bool):
+    """Fetch the profile and (for a new turn) recent chat history concurrently"""
+    if resume_from_interrupt:
+        # A resumed turn continues from the checkpoint and doesn't need history
+        return await async_firebase_service.get_user_profile(session_id), None
+    return await asyncio.gather(
+        async_firebase_service.get_user_profile(session_id),
+        async_firebase_service.get_recent_chat_history(session_id, CHAT_HISTORY_CONTEXT)
+    )
+
+def _to_chat_response(result: Dict[str, Any], session_id: str) -> ChatResponse:
+    """Convert an orchestrator result into the chat response model"""
+    return ChatResponse(
+        message=result["message"],
+        agent_type=result["agent_type"],
+        session_id=session_id,
+        profile_updated=result.get("profile_updated", False),
+        job_fit_analysis=result.get("job_fit_analysis"),
+        career_path=result.get("career_path"),
+        requires_input=result.get("requires_input", False),
+        input_type=result.get("input_type"),
+        workflow_stage=result.get("workflow_stage", "completed"),
+        resumed=result.get("resumed", False)
+    )
+
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a single Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post("/job_fit/batch")
+async def job_fit_batch(request: Request, session_id: str = None, top_k: int = 5):
+    """
+    Rank a session's profile against many job descriptions.
+
+    Accepts a ``JobFitBatchRequest`` JSON body, or ``application/x-ndjson``
+    with one ``{"id": ..., "text": ...}`` posting per line and ``session_id``
+    / ``top_k`` as query parameters. Streams NDJSON: ranked ``score`` results
+    for every posting first, then ``narrative`` results for the top-K as they
+    finish, then a final ``done`` line.
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in content_type or "jsonl" in content_type:
+            postings = await _read_ndjson_postings(request)
+        else:
+            batch = JobFitBatchRequest(**await request.json())
+            session_id, top_k = batch.session_id, batch.top_k
+            postings = batch.job_descriptions
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch request: {e}")
+
+    session_id = (session_id or "").strip()
+    if not session_id:
+        raise HTTPException(status_code=400, detail="Session ID is required")
+    if not postings:
+        raise HTTPException(status_code=400, detail="At least one job description is required")
+    if len(postings) > settings.job_fit_batch_max_postings:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.job_fit_batch_max_postings} job descriptions per batch"
+        )
+
+    user_profile = await async_firebase_service.get_user_profile(session_id)
+    if not user_profile:
+        raise HTTPException(
+            status_code=404,
+            detail="Session not found. Please start a new session."
+        )
+
+    items = [
+        {"id": posting.id or str(index), "text": posting.text}
+        for index, posting in enumerate(postings)
+    ]
+
+    async def result_lines():
+        try:
+            async for result in rank_job_descriptions(user_profile, items, max(0, top_k)):
+                yield json.dumps(result, default=str) + "\n"
+            yield json.dumps({"type": "done", "count": len(items)}) + "\n"
+        except Exception as e:
+            print(f"Error ranking job descriptions: {e}")
+            yield json.dumps({"type": "error", "detail": "Failed to rank job descriptions"}) + "\n"
+
+    return StreamingResponse(
+        result_lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _read_ndjson_postings(request: Request) -> list:
+    """Parse postings from an NDJSON body as it arrives; a line may also be a bare string"""
+    postings = []
+    buffer = b""
+
+    def parse(line: bytes) -> None:
+        line = line.strip()
+        if not line:
+            return
+        value = json.loads(line)
+        postings.append(JobDescriptionInput(text=value) if isinstance(value, str) else JobDescriptionInput(**value))
+        if len(postings) > settings.job_fit_batch_max_postings:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {settings.job_fit_batch_max_postings} job descriptions per batch"
+            )
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            parse(line)
+    parse(buffer)
+    return postings
+
+def _require_admin(admin_key: Optional[str]) -> None:
+    """Reject requests without the admin key; admin endpoints don't exist without one configured"""
+    if not settings.admin_api_key:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not admin_key or not hmac.compare_digest(admin_key.encode("utf-8"), settings.admin_api_key.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+
+@app.post("/match/sessions", response_model=SessionMatchResponse)
+async def match_sessions(request: SessionMatchRequest, x_admin_key: Optional[str] = Header(None)):
+    """
+    Find the sessions whose profiles best fit a job description (admin only).
+    The first call starts building the index; results fill in as it completes.
+    """
+    _require_admin(x_admin_key)
+    if not settings.profile_index_enabled:
+        raise HTTPException(status_code=404, detail="Session matching is disabled")
+    profile_index.start()
+    if not request.job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description is required")
+
+    try:
+        result = await executors.run(
+            "cpu", profile_index.query, request.job_description, max(1, min(request.top_k, 100))
+        )
+        return SessionMatchResponse(**result, index_status=profile_index.status)
+    except Exception as e:
+        print(f"Error matching sessions: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to match sessions"
+        )
+
 @app.get("/profile/{session_id}")
 async def get_profile(session_id: str):
     """
     Get user profile data for a session
     """
     try:
-        profile = firebase_service.get_user_profile(session_id)
+        profile = await async_firebase_service.get_user_profile(session_id)
         if not profile:
             raise HTTPException(
                 status_code=404,
@@ -220,14 +688,23 @@ async def get_profile(session_id: str):
         )
 
 @app.get("/chat_history/{session_id}")
-async def get_chat_history(session_id: str, limit: int = 10):
+async def get_chat_history(session_id: str, limit: int = 10, cursor: str = None, format: str = "json"):
     """
-    Get chat history for a session
+    Get chat history for a session.
+
+    Returns one page, newest first, with a ``next_cursor`` to pass back as
+    ``cursor`` for the following (older) page. ``format=ndjson`` streams the
+    whole history instead, oldest first, one turn per line.
     """
+    if format == "ndjson":
+        return _export_chat_history(session_id)
+
     try:
-        history = firebase_service.get_chat_history(session_id, limit)
-        return {"chat_history": history}
+        history, next_cursor = await async_firebase_service.get_chat_history_page(session_id, limit, cursor)
+        return {"chat_history": history, "next_cursor": next_cursor}
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error getting chat history: {e}")
         raise HTTPException(
@@ -235,6 +712,25 @@ async def get_chat_history(session_id: str, limit: int = 10):
             detail="Failed to retrieve chat history"
         )
 
+def _export_chat_history(session_id: str) -> StreamingResponse:
+    """Stream a session's full chat history as NDJSON"""
+    async def history_lines():
+        count = 0
+        try:
+            async for turn in async_firebase_service.iter_chat_history(session_id):
+                count += 1
+                yield json.dumps({"type": "turn", **turn}, default=str) + "\n"
+            yield json.dumps({"type": "done", "count": count}) + "\n"
+        except Exception as e:
+            print(f"Error exporting chat history: {e}")
+            yield json.dumps({"type": "error", "detail": "Failed to export chat history"}) + "\n"
+
+    return StreamingResponse(
+        history_lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Error handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
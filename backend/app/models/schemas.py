@@ -9,6 +9,7 @@ class ChatMessage(BaseModel):
     session_id: str
     message: str
     resume_from_interrupt: bool = False  # <--- Keep this line
+    bypass_cache: bool = False  # Regenerate instead of serving cached LLM answers
 
 class Experience(BaseModel):
     title: str
@@ -32,6 +33,35 @@ class JobFitAnalysis(BaseModel):
     summary: str
     missing_skills: List[str]
     enhancements: List[str]
+    matched_skills: List[str] = []
+    scoring: str = "llm"  # "local" when the score came from the skill matcher
+
+class JobDescriptionInput(BaseModel):
+    id: Optional[str] = None  # Defaults to the posting's position in the batch
+    text: str
+
+class JobFitBatchRequest(BaseModel):
+    session_id: str
+    job_descriptions: List[JobDescriptionInput]
+    top_k: int = 5  # Postings that get an LLM narrative
+
+class SessionMatchRequest(BaseModel):
+    job_description: str
+    top_k: int = 10
+
+class SessionMatch(BaseModel):
+    match_id: str  # Opaque and stable; never the session_id, which is the session's only credential
+    score: int
+    matched_skills: List[str]
+    experience_only_skills: List[str]
+    missing_skills: List[str]
+
+class SessionMatchResponse(BaseModel):
+    job_skills: List[str]
+    results: List[SessionMatch]
+    indexed_sessions: int
+    index_status: str
+    took_ms: float
 
 class CareerPathResponse(BaseModel):
     analysis: str
@@ -48,8 +78,16 @@ class ChatResponse(BaseModel):
     requires_input: bool = False  # <--- Keep this line
     input_type: Optional[str] = None  # <--- Keep this line
     workflow_stage: str = "completed" # <--- Keep this line
+    resumed: bool = False  # Turn continued an interrupted thread from its checkpoint
 
 class SessionResponse(BaseModel):
     session_id: str
     message: str
     profile_data: Optional[UserProfile] = None
+    profile_status: str = "ready"  # pending while the LinkedIn scrape runs in the background
+
+class SessionStatusResponse(BaseModel):
+    session_id: str
+    profile_status: str  # pending, ready or failed
+    message: Optional[str] = None
+    profile_data: Optional[UserProfile] = None
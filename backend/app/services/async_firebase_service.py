@@ -0,0 +1,261 @@
+import base64
+import json
+from firebase_admin import firestore, firestore_async
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
+import uuid
+from datetime import datetime
+
+from app.config import settings
+from app.services.tracing import tracer
+from app.services.firebase_service import (
+    FirebaseService,
+    firebase_service,
+    invalidation_document,
+    chat_window_document,
+    window_turns,
+    FIRESTORE_SECONDS
+)
+
+# Largest chat history page a client may request, and the page size of exports
+CHAT_HISTORY_PAGE_MAX = 100
+CHAT_HISTORY_EXPORT_PAGE = 500
+
+def encode_history_cursor(timestamp: datetime, doc_id: str) -> str:
+    """Opaque cursor pointing just after a chat history document"""
+    raw = json.dumps({"t": timestamp.isoformat(), "id": doc_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of ``encode_history_cursor``; raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["t"]), str(data["id"])
+    except Exception as e:
+        raise ValueError(f"Invalid chat history cursor: {e}")
+
+@firestore_async.async_transactional
+async def _append_to_chat_window(transaction, window_ref, history_ref, doc_ref, chat_data: Dict[str, Any],
+                                 size: int) -> None:
+    """Async counterpart of the sync service's window transaction"""
+    snapshot = await window_ref.get(transaction=transaction)
+    if snapshot.exists:
+        window = snapshot.to_dict() or {}
+        turns = window.get('turns') or []
+        complete = window.get('complete', False)
+    else:
+        # First append for a session that predates the window: seed it from the archive
+        query = history_ref.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(size)
+        turns = [{'id': doc.id, **doc.to_dict()} async for doc in query.stream(transaction=transaction)]
+        complete = len(turns) < size
+
+    transaction.set(window_ref, chat_window_document(turns, complete, doc_ref.id, chat_data, size))
+
+class AsyncFirebaseService:
+    """Async counterpart of ``FirebaseService`` on Firestore's ``AsyncClient``.
+
+    Same methods and return values, but awaitable, so endpoints can overlap
+    Firestore round trips (e.g. profile and chat history in one
+    ``asyncio.gather``) without tying up executor threads. It shares the sync
+    service's Firebase app, profile cache and profile listeners, so both views
+    stay consistent.
+    """
+
+    def __init__(self, sync_service: FirebaseService):
+        self._sync = sync_service
+        self._db = None
+
+    @property
+    def db(self):
+        # Created on first use so its gRPC channel binds to the running event loop
+        if self._db is None:
+            self._db = firestore_async.client()
+        return self._db
+
+    def _profile_ref(self, session_id: str):
+        return self.db.collection('users').document(session_id).collection('profile').document('data')
+
+    @tracer.traced("firestore_async.create_user_session")
+    @FIRESTORE_SECONDS.timed("async", "create_user_session")
+    async def create_user_session(self, linkedin_url: str, profile_data: Dict[str, Any] = None) -> str:
+        """Create a new user session and profile document"""
+        session_id = str(uuid.uuid4())
+
+        user_profile = {
+            'session_id': session_id,
+            'linkedin_url': linkedin_url,
+            'created_at': datetime.utcnow(),
+            'updated_at': datetime.utcnow(),
+        }
+
+        if profile_data:
+            user_profile.update(profile_data)
+
+        await self._profile_ref(session_id).set(user_profile)
+        if self._sync.profile_cache:
+            self._sync.profile_cache.set(session_id, user_profile)
+        self._sync.notify_profile_change(session_id, user_profile)
+
+        return session_id
+
+    @tracer.traced("firestore_async.get_user_profile", "session_id")
+    @FIRESTORE_SECONDS.timed("async", "get_user_profile")
+    async def get_user_profile(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get user profile data (served from the profile cache when possible)"""
+        cache = self._sync.profile_cache
+        if cache:
+            cached = cache.get(session_id)
+            tracer.set_attribute("profile_cache", "hit" if cached is not None else "miss")
+            if cached is not None:
+                return cached
+
+        try:
+            doc = await self._profile_ref(session_id).get()
+            if doc.exists:
+                profile = doc.to_dict()
+                if cache:
+                    cache.set(session_id, profile)
+                return profile
+            return None
+        except Exception as e:
+            print(f"Error getting user profile: {e}")
+            return None
+
+    @tracer.traced("firestore_async.update_user_profile", "session_id")
+    @FIRESTORE_SECONDS.timed("async", "update_user_profile")
+    async def update_user_profile(self, session_id: str, updates: Dict[str, Any]) -> bool:
+        """Update user profile with new data"""
+        try:
+            updates['updated_at'] = datetime.utcnow()
+
+            await self._profile_ref(session_id).update(updates)
+            if self._sync.profile_cache:
+                self._sync.profile_cache.apply_update(session_id, updates)
+                if self._sync.publishes_invalidations:
+                    await self.db.collection('cache_invalidations').add(invalidation_document(session_id))
+            self._sync.notify_profile_change(session_id, updates)
+
+            return True
+        except Exception as e:
+            print(f"Error updating user profile: {e}")
+            return False
+
+    @tracer.traced("firestore_async.add_chat_history", "session_id")
+    @FIRESTORE_SECONDS.timed("async", "add_chat_history")
+    async def add_chat_history(self, session_id: str, message: str, response: str, agent_type: str) -> bool:
+        """Add a chat message to history (and to the rolling window, when enabled).
+
+        As in the sync service, the archive document goes through the
+        write-behind queue when the window serves reads.
+        """
+        try:
+            chat_data = {
+                'message': message,
+                'response': response,
+                'agent_type': agent_type,
+                'timestamp': datetime.utcnow()
+            }
+
+            user_ref = self.db.collection('users').document(session_id)
+            history_ref = user_ref.collection('chat_history')
+            if settings.chat_window_size > 0:
+                doc_ref = history_ref.document()
+                await _append_to_chat_window(
+                    self.db.transaction(), user_ref.collection('chat_window').document('recent'),
+                    history_ref, doc_ref, chat_data, settings.chat_window_size
+                )
+                if not self._sync.defer_chat_archive(session_id, doc_ref.id, chat_data):
+                    await doc_ref.set(chat_data)
+            else:
+                await history_ref.add(chat_data)
+            return True
+        except Exception as e:
+            print(f"Error adding chat history: {e}")
+            return False
+
+    @tracer.traced("firestore_async.get_recent_chat_history", "session_id")
+    @FIRESTORE_SECONDS.timed("async", "get_recent_chat_history")
+    async def get_recent_chat_history(self, session_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Recent chat history from the rolling window document, falling back to the query"""
+        if settings.chat_window_size > 0:
+            try:
+                doc = await self.db.collection('users').document(session_id).collection('chat_window').document('recent').get()
+                turns = window_turns(doc.to_dict() if doc.exists else None, limit)
+                if turns is not None:
+                    return turns
+            except Exception as e:
+                print(f"Error reading chat window: {e}")
+        return await self.get_chat_history(session_id, limit)
+
+    @tracer.traced("firestore_async.get_chat_history", "session_id")
+    @FIRESTORE_SECONDS.timed("async", "get_chat_history")
+    async def get_chat_history(self, session_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get recent chat history"""
+        try:
+            query = (self.db.collection('users')
+                    .document(session_id)
+                    .collection('chat_history')
+                    .order_by('timestamp', direction=firestore.Query.DESCENDING)
+                    .limit(limit))
+
+            return [doc.to_dict() async for doc in query.stream()]
+        except Exception as e:
+            print(f"Error getting chat history: {e}")
+            return []
+
+    def _history_query(self, session_id: str, limit: int, cursor: Optional[str], descending: bool):
+        """Chat history ordered by (timestamp, document id), resumed after ``cursor``.
+
+        The document id breaks timestamp ties so pages never skip or repeat a
+        turn, and ``start_after`` lets Firestore seek straight to the cursor:
+        a page costs ``limit`` reads however deep it is.
+        """
+        history_ref = self.db.collection('users').document(session_id).collection('chat_history')
+        direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+        query = (history_ref
+                 .order_by('timestamp', direction=direction)
+                 .order_by(firestore.FieldPath.document_id(), direction=direction))
+        if cursor:
+            timestamp, doc_id = decode_history_cursor(cursor)
+            query = query.start_after({
+                'timestamp': timestamp,
+                firestore.FieldPath.document_id(): history_ref.document(doc_id)
+            })
+        return query.limit(limit)
+
+    @tracer.traced("firestore_async.get_chat_history_page", "session_id")
+    @FIRESTORE_SECONDS.timed("async", "get_chat_history_page")
+    async def get_chat_history_page(self, session_id: str, limit: int = 10, cursor: Optional[str] = None,
+                                    descending: bool = True) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of chat history and the cursor of the next page (None on the last page).
+
+        Raises ValueError for a malformed cursor.
+        """
+        limit = max(1, min(limit, CHAT_HISTORY_PAGE_MAX))
+        query = self._history_query(session_id, limit + 1, cursor, descending)
+        docs = [doc async for doc in query.stream()]
+
+        page = docs[:limit]
+        next_cursor = None
+        if len(docs) > limit:
+            last = page[-1]
+            next_cursor = encode_history_cursor(last.get('timestamp'), last.id)
+        return [doc.to_dict() for doc in page], next_cursor
+
+    async def iter_chat_history(self, session_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Every turn of a session, oldest first, fetched page by page"""
+        cursor = None
+        while True:
+            query = self._history_query(session_id, CHAT_HISTORY_EXPORT_PAGE, cursor, descending=False)
+            count = 0
+            last = None
+            async for doc in query.stream():
+                count += 1
+                last = doc
+                yield {'id': doc.id, **doc.to_dict()}
+            if count < CHAT_HISTORY_EXPORT_PAGE:
+                return
+            cursor = encode_history_cursor(last.get('timestamp'), last.id)
+
+# Create a singleton instance
+async_firebase_service = AsyncFirebaseService(firebase_service)
@@ -0,0 +1,696 @@
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.config import settings
+
+# A thread record holds everything LangGraph checkpointed for one session:
+#   {"checkpoints": {ns: {checkpoint_id: (checkpoint, metadata, parent_id)}},
+#    "writes": {(ns, checkpoint_id): {(task_id, idx): (task_id, channel, value)}},
+#    "last_seen": unix timestamp}
+# with checkpoint/metadata/value stored as serde-typed (type, bytes) pairs.
+# Persistent stores keep one row/document per checkpoint and per write, so a
+# superstep writes only what it added instead of the whole thread.
+
+# Firestore rejects documents over 1 MiB; leave room for the other fields
+FIRESTORE_MAX_VALUE_BYTES = 1_000_000
+
+def _new_record() -> Dict[str, Any]:
+    return {"checkpoints": {}, "writes": {}, "last_seen": time.time()}
+
+class MemoryThreadStore:
+    """In-process thread records, bounded by an LRU cap on the number of threads"""
+
+    name = "memory"
+
+    def __init__(self, max_threads: int):
+        self.max_threads = max(1, max_threads)
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get(thread_id)
+            if record is not None:
+                self._records.move_to_end(thread_id)
+            return record
+
+    def _record(self, thread_id: str, last_seen: float) -> Dict[str, Any]:
+        record = self._records.get(thread_id)
+        if record is None:
+            record = self._records[thread_id] = _new_record()
+        record["last_seen"] = last_seen
+        self._records.move_to_end(thread_id)
+        while len(self._records) > self.max_threads:
+            self._records.popitem(last=False)
+        return record
+
+    def put_checkpoint(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                       entry: Tuple, last_seen: float) -> None:
+        with self._lock:
+            record = self._record(thread_id, last_seen)
+            record["checkpoints"].setdefault(checkpoint_ns, {})[checkpoint_id] = entry
+
+    def put_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                   writes: Dict[Tuple[str, int], Tuple], last_seen: float) -> None:
+        with self._lock:
+            record = self._record(thread_id, last_seen)
+            record["writes"].setdefault((checkpoint_ns, checkpoint_id), {}).update(writes)
+
+    def delete_checkpoints(self, thread_id: str, checkpoint_ns: str, checkpoint_ids: List[str]) -> None:
+        with self._lock:
+            record = self._records.get(thread_id)
+            if record is None:
+                return
+            for checkpoint_id in checkpoint_ids:
+                record["checkpoints"].get(checkpoint_ns, {}).pop(checkpoint_id, None)
+                record["writes"].pop((checkpoint_ns, checkpoint_id), None)
+
+    def delete(self, thread_id: str) -> None:
+        with self._lock:
+            self._records.pop(thread_id, None)
+
+    def evict_idle(self, cutoff: float) -> int:
+        with self._lock:
+            idle = [tid for tid, record in self._records.items() if record["last_seen"] < cutoff]
+            for thread_id in idle:
+                del self._records[thread_id]
+            return len(idle)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            records = list(self._records.values())
+        return {
+            "threads": len(records),
+            "checkpoints": sum(_count_checkpoints(r) for r in records),
+            "bytes": sum(_record_size(r) for r in records)
+        }
+
+class SqliteThreadStore:
+    """Checkpoints and writes as rows of a local SQLite file; survives restarts"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            # WAL lets several worker processes on one host share the file
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoint_threads ("
+                "thread_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS checkpoint_threads_last_seen ON checkpoint_threads (last_seen)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+                "parent_checkpoint_id TEXT, type TEXT NOT NULL, checkpoint BLOB NOT NULL, "
+                "metadata_type TEXT NOT NULL, metadata BLOB NOT NULL, "
+                "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoint_writes ("
+                "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, checkpoint_id TEXT NOT NULL, "
+                "task_id TEXT NOT NULL, idx INTEGER NOT NULL, channel TEXT NOT NULL, "
+                "type TEXT NOT NULL, value BLOB NOT NULL, "
+                "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))"
+            )
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _touch(self, conn, thread_id: str, last_seen: float) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO checkpoint_threads (thread_id, last_seen) VALUES (?, ?)",
+            (thread_id, last_seen)
+        )
+
+    def load(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            thread = self._conn.execute(
+                "SELECT last_seen FROM checkpoint_threads WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+            if thread is None:
+                return None
+            checkpoints = self._conn.execute(
+                "SELECT checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                "metadata_type, metadata FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            ).fetchall()
+            writes = self._conn.execute(
+                "SELECT checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value "
+                "FROM checkpoint_writes WHERE thread_id = ?", (thread_id,)
+            ).fetchall()
+
+        record = {"checkpoints": {}, "writes": {}, "last_seen": thread[0]}
+        for ns, checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata in checkpoints:
+            record["checkpoints"].setdefault(ns, {})[checkpoint_id] = (
+                (type_, checkpoint), (metadata_type, metadata), parent_id
+            )
+        for ns, checkpoint_id, task_id, idx, channel, type_, value in writes:
+            record["writes"].setdefault((ns, checkpoint_id), {})[(task_id, idx)] = (
+                task_id, channel, (type_, value)
+            )
+        return record
+
+    def put_checkpoint(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                       entry: Tuple, last_seen: float) -> None:
+        (type_, checkpoint), (metadata_type, metadata), parent_id = entry
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, "
+                "parent_checkpoint_id, type, checkpoint, metadata_type, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata)
+            )
+            self._touch(conn, thread_id, last_seen)
+
+    def put_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                   writes: Dict[Tuple[str, int], Tuple], last_seen: float) -> None:
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO checkpoint_writes (thread_id, checkpoint_ns, checkpoint_id, "
+                "task_id, idx, channel, type, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, value[0], value[1])
+                 for (_, idx), (task_id, channel, value) in writes.items()]
+            )
+            self._touch(conn, thread_id, last_seen)
+
+    def delete_checkpoints(self, thread_id: str, checkpoint_ns: str, checkpoint_ids: List[str]) -> None:
+        keys = [(thread_id, checkpoint_ns, checkpoint_id) for checkpoint_id in checkpoint_ids]
+        with self._transaction() as conn:
+            conn.executemany(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", keys
+            )
+            conn.executemany(
+                "DELETE FROM checkpoint_writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", keys
+            )
+
+    def delete(self, thread_id: str) -> None:
+        with self._transaction() as conn:
+            for table in ("checkpoints", "checkpoint_writes", "checkpoint_threads"):
+                conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    def evict_idle(self, cutoff: float) -> int:
+        idle = "SELECT thread_id FROM checkpoint_threads WHERE last_seen < ?"
+        with self._transaction() as conn:
+            conn.execute(f"DELETE FROM checkpoints WHERE thread_id IN ({idle})", (cutoff,))
+            conn.execute(f"DELETE FROM checkpoint_writes WHERE thread_id IN ({idle})", (cutoff,))
+            cursor = conn.execute("DELETE FROM checkpoint_threads WHERE last_seen < ?", (cutoff,))
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            threads = self._conn.execute("SELECT COUNT(*) FROM checkpoint_threads").fetchone()[0]
+            checkpoints, checkpoint_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints"
+            ).fetchone()
+            write_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM checkpoint_writes"
+            ).fetchone()[0]
+        return {"threads": threads, "checkpoints": checkpoints, "bytes": checkpoint_bytes + write_bytes}
+
+def _document_id(*parts: str) -> str:
+    # Firestore document ids can't contain "/"
+    return quote("|".join(parts), safe="|:-_")
+
+def _check_document_size(thread_id: str, what: str, size: int) -> None:
+    if size > FIRESTORE_MAX_VALUE_BYTES:
+        raise ValueError(
+            f"{what} for thread {thread_id} is {size} bytes, over Firestore's "
+            f"{FIRESTORE_MAX_VALUE_BYTES} byte document limit. Use CHECKPOINTER_BACKEND=sqlite "
+            f"or keep less data in the graph state."
+        )
+
+class FirestoreThreadStore:
+    """Checkpoints and writes as documents under ``users/{session_id}``.
+
+    Each checkpoint is one document in ``langgraph_checkpoints`` and each write
+    one document in ``langgraph_writes``; ``langgraph_memory/state`` records
+    when the thread was last used. Idle threads are swept with a collection
+    group query on ``last_seen``, a page per sweep; every document also carries
+    an ``expires_at`` field for a Firestore TTL policy as a backstop. A single
+    checkpoint or write over the 1 MiB document limit raises ValueError.
+
+    Thread and checkpoint counts come from count aggregations and the byte
+    total from sharded counters in ``checkpoint_stats``. They are refreshed in
+    the background at most every ``STATS_INTERVAL`` seconds, so ``stats``
+    never blocks on Firestore.
+    """
+
+    name = "firestore"
+
+    # Seconds between background refreshes of the store-level stats
+    STATS_INTERVAL = 60.0
+
+    # Counter shards for the byte total; each absorbs a share of the increments
+    STATS_SHARDS = 8
+
+    # Idle threads deleted per sweep
+    EVICT_BATCH = 200
+
+    def __init__(self, ttl_seconds: int):
+        # Imported lazily so the memory/sqlite backends don't need Firebase
+        from firebase_admin import firestore
+        from app.services.firebase_service import firebase_service
+        self.firestore = firestore
+        self.db = firebase_service.db
+        self.ttl_seconds = ttl_seconds
+        self._stats: Dict[str, Any] = {}
+        self._stats_at = 0.0
+        self._stats_lock = threading.Lock()
+
+    def _user(self, thread_id: str):
+        return self.db.collection('users').document(thread_id)
+
+    def _state_ref(self, thread_id: str):
+        return self._user(thread_id).collection('langgraph_memory').document('state')
+
+    def _touch(self, batch, thread_id: str, last_seen: float) -> datetime:
+        """Add the thread's last-used update to ``batch``; returns its ``expires_at``"""
+        seen_at = datetime.utcfromtimestamp(last_seen)
+        expires_at = seen_at + timedelta(seconds=self.ttl_seconds)
+        batch.set(self._state_ref(thread_id), {
+            "last_seen": seen_at,
+            "expires_at": expires_at,
+            # Whole-thread pickles written by earlier versions
+            "checkpoint": self.firestore.DELETE_FIELD
+        }, merge=True)
+        return expires_at
+
+    def _count_bytes(self, batch, size: int) -> None:
+        if size:
+            shard = self.db.collection('checkpoint_stats').document(f"bytes-{random.randrange(self.STATS_SHARDS)}")
+            batch.set(shard, {"bytes": self.firestore.Increment(size)}, merge=True)
+
+    def load(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        user = self._user(thread_id)
+        state = self._state_ref(thread_id).get()
+        last_seen = (state.to_dict() or {}).get("last_seen") if state.exists else None
+        if last_seen is None:
+            return None
+
+        record = {"checkpoints": {}, "writes": {}, "last_seen": last_seen.timestamp()}
+        for doc in user.collection('langgraph_checkpoints').stream():
+            data = doc.to_dict()
+            record["checkpoints"].setdefault(data["checkpoint_ns"], {})[data["checkpoint_id"]] = (
+                (data["type"], data["checkpoint"]),
+                (data["metadata_type"], data["metadata"]),
+                data.get("parent_checkpoint_id")
+            )
+        if not record["checkpoints"]:
+            return None
+        for doc in user.collection('langgraph_writes').stream():
+            data = doc.to_dict()
+            record["writes"].setdefault((data["checkpoint_ns"], data["checkpoint_id"]), {})[
+                (data["task_id"], data["idx"])
+            ] = (data["task_id"], data["channel"], (data["type"], data["value"]))
+        return record
+
+    def put_checkpoint(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                       entry: Tuple, last_seen: float) -> None:
+        (type_, checkpoint), (metadata_type, metadata), parent_id = entry
+        size = len(checkpoint) + len(metadata)
+        _check_document_size(thread_id, "Checkpoint", size)
+        batch = self.db.batch()
+        expires_at = self._touch(batch, thread_id, last_seen)
+        doc_ref = self._user(thread_id).collection('langgraph_checkpoints').document(
+            _document_id(checkpoint_ns, checkpoint_id)
+        )
+        batch.set(doc_ref, {
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint_id,
+            "parent_checkpoint_id": parent_id,
+            "type": type_,
+            "checkpoint": checkpoint,
+            "metadata_type": metadata_type,
+            "metadata": metadata,
+            "size": size,
+            "expires_at": expires_at
+        })
+        self._count_bytes(batch, size)
+        batch.commit()
+
+    def put_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                   writes: Dict[Tuple[str, int], Tuple], last_seen: float) -> None:
+        batch = self.db.batch()
+        expires_at = self._touch(batch, thread_id, last_seen)
+        collection = self._user(thread_id).collection('langgraph_writes')
+        total = 0
+        for (_, idx), (task_id, channel, (type_, value)) in writes.items():
+            _check_document_size(thread_id, f"Write to '{channel}'", len(value))
+            total += len(value)
+            batch.set(collection.document(_document_id(checkpoint_ns, checkpoint_id, task_id, str(idx))), {
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+                "task_id": task_id,
+                "idx": idx,
+                "channel": channel,
+                "type": type_,
+                "value": value,
+                "size": len(value),
+                "expires_at": expires_at
+            })
+        self._count_bytes(batch, total)
+        batch.commit()
+
+    def delete_checkpoints(self, thread_id: str, checkpoint_ns: str, checkpoint_ids: List[str]) -> None:
+        user = self._user(thread_id)
+        refs = [user.collection('langgraph_checkpoints').document(_document_id(checkpoint_ns, checkpoint_id))
+                for checkpoint_id in checkpoint_ids]
+        docs = [doc for doc in self.db.get_all(refs, field_paths=["size"]) if doc.exists]
+        for checkpoint_id in checkpoint_ids:
+            writes = (user.collection('langgraph_writes')
+                      .where('checkpoint_ns', '==', checkpoint_ns)
+                      .where('checkpoint_id', '==', checkpoint_id)
+                      .select(["size"]))
+            docs.extend(writes.stream())
+        self._delete_documents(docs)
+
+    def _delete_documents(self, docs: List[Any], extra_refs: Sequence[Any] = ()) -> None:
+        """Delete documents (and ``extra_refs``) in batches, taking their size off the byte total"""
+        refs = [doc.reference for doc in docs] + list(extra_refs)
+        size = sum((doc.to_dict() or {}).get("size", 0) for doc in docs)
+        batch = self.db.batch()
+        self._count_bytes(batch, -size)
+        writes = 1
+        for ref in refs:
+            if writes >= 500:
+                batch.commit()
+                batch, writes = self.db.batch(), 0
+            batch.delete(ref)
+            writes += 1
+        batch.commit()
+
+    def delete(self, thread_id: str) -> None:
+        user = self._user(thread_id)
+        docs = []
+        for collection in ('langgraph_checkpoints', 'langgraph_writes'):
+            docs.extend(user.collection(collection).select(["size"]).stream())
+        self._delete_documents(docs, [self._state_ref(thread_id)])
+
+    def evict_idle(self, cutoff: float) -> int:
+        """Delete up to ``EVICT_BATCH`` threads not used since ``cutoff``.
+
+        Needs a collection group index on ``langgraph_memory.last_seen``.
+        """
+        query = (self.db.collection_group('langgraph_memory')
+                 .where('last_seen', '<', datetime.utcfromtimestamp(cutoff))
+                 .limit(self.EVICT_BATCH))
+        evicted = 0
+        for doc in query.stream():
+            self.delete(doc.reference.parent.parent.id)
+            evicted += 1
+        return evicted
+
+    def _refresh_stats(self) -> None:
+        try:
+            threads = self.db.collection_group('langgraph_memory').count().get()[0][0].value
+            checkpoints = self.db.collection_group('langgraph_checkpoints').count().get()[0][0].value
+            size = sum((doc.to_dict() or {}).get("bytes", 0)
+                       for doc in self.db.collection('checkpoint_stats').stream())
+            with self._stats_lock:
+                self._stats = {"threads": threads, "checkpoints": checkpoints, "bytes": max(0, size)}
+        except Exception as e:
+            print(f"Error reading checkpoint stats: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stale = time.time() - self._stats_at >= self.STATS_INTERVAL
+            if stale:
+                self._stats_at = time.time()
+            stats = dict(self._stats)
+        if stale:
+            threading.Thread(target=self._refresh_stats, name="checkpoint-stats", daemon=True).start()
+        return stats
+
+class TTLCheckpointSaver(BaseCheckpointSaver):
+    """LangGraph checkpointer over a pluggable thread store.
+
+    Unlike ``MemorySaver`` it keeps only the last ``max_checkpoints`` checkpoints
+    per thread and drops threads idle for longer than ``ttl_seconds``, so memory
+    stays flat. With a persistent store, interrupted sessions survive restarts
+    and are visible to every worker: the latest checkpoint is always re-read from
+    the store at the start of a run, while the writes of a run go through a small
+    local cache.
+    """
+
+    def __init__(self, store, ttl_seconds: int, max_checkpoints: int,
+                 cache_size: int, sweep_interval: float = 300.0):
+        super().__init__(serde=JsonPlusSerializer())
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.max_checkpoints = max(1, max_checkpoints)
+        self.cache_size = max(1, cache_size)
+        self.sweep_interval = sweep_interval
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._last_sweep = time.time()
+
+    # Record management
+
+    def _load(self, thread_id: str, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = None if refresh else self._cache.get(thread_id)
+            if record is None:
+                record = self.store.load(thread_id)
+            if record is not None and time.time() - record["last_seen"] > self.ttl_seconds:
+                self.store.delete(thread_id)
+                record = None
+            if record is None:
+                self._cache.pop(thread_id, None)
+                return None
+            self._remember(thread_id, record)
+            return record
+
+
+    def _remember(self, thread_id: str, record: Dict[str, Any]) -> None:
+        self._cache[thread_id] = record
+        self._cache.move_to_end(thread_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _prune(self, record: Dict[str, Any], checkpoint_ns: str) -> List[str]:
+        """Keep only the newest checkpoints (ids sort chronologically) and their writes.
+
+        Returns the ids of the dropped checkpoints.
+        """
+        checkpoints = record["checkpoints"].get(checkpoint_ns, {})
+        dropped = sorted(checkpoints)[:-self.max_checkpoints]
+        for checkpoint_id in dropped:
+            del checkpoints[checkpoint_id]
+            record["writes"].pop((checkpoint_ns, checkpoint_id), None)
+        return dropped
+
+    def _maybe_sweep(self) -> None:
+        now = time.time()
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        cutoff = now - self.ttl_seconds
+        with self._lock:
+            evicted = self.store.evict_idle(cutoff)
+            for thread_id in [tid for tid, r in self._cache.items() if r["last_seen"] < cutoff]:
+                del self._cache[thread_id]
+        if evicted:
+            print(f"Evicted {evicted} idle checkpoint thread(s)")
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                  record: Dict[str, Any]) -> CheckpointTuple:
+        checkpoint, metadata, parent_checkpoint_id = record["checkpoints"][checkpoint_ns][checkpoint_id]
+        writes = record["writes"].get((checkpoint_ns, checkpoint_id), {}).values()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed(checkpoint),
+            metadata=self.serde.loads_typed(metadata),
+            pending_writes=[(task_id, channel, self.serde.loads_typed(value))
+                            for task_id, channel, value in writes],
+            parent_config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_checkpoint_id,
+                }
+            } if parent_checkpoint_id else None,
+        )
+
+    # BaseCheckpointSaver interface
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+
+        # Reading the latest checkpoint starts a run - always go to the store
+        record = self._load(thread_id, refresh=checkpoint_id is None)
+        if record is None:
+            return None
+
+        checkpoints = record["checkpoints"].get(checkpoint_ns) or {}
+        if checkpoint_id is None:
+            if not checkpoints:
+                return None
+            checkpoint_id = max(checkpoints)
+        elif checkpoint_id not in checkpoints:
+            return None
+
+        return self._to_tuple(thread_id, checkpoint_ns, checkpoint_id, record)
+
+    def list(self, config: Optional[RunnableConfig], *,
+             filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None,
+             limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        if not config:
+            return
+        thread_id = config["configurable"]["thread_id"]
+        record = self._load(thread_id, refresh=True)
+        if record is None:
+            return
+
+        namespaces = [config["configurable"]["checkpoint_ns"]] \
+            if "checkpoint_ns" in config["configurable"] else list(record["checkpoints"])
+        before_id = get_checkpoint_id(before) if before else None
+
+        for checkpoint_ns in namespaces:
+            for checkpoint_id in sorted(record["checkpoints"].get(checkpoint_ns, {}), reverse=True):
+                if before_id and checkpoint_id >= before_id:
+                    continue
+                item = self._to_tuple(thread_id, checkpoint_ns, checkpoint_id, record)
+                if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                if limit is not None and limit <= 0:
+                    return
+                if limit is not None:
+                    limit -= 1
+                yield item
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint,
+            metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+
+        entry = (
+            self.serde.dumps_typed(checkpoint),
+            self.serde.dumps_typed(metadata),
+            config["configurable"].get("checkpoint_id"),
+        )
+        with self._lock:
+            record = self._load(thread_id) or _new_record()
+            record["last_seen"] = time.time()
+            self.store.put_checkpoint(thread_id, checkpoint_ns, checkpoint["id"], entry, record["last_seen"])
+            record["checkpoints"].setdefault(checkpoint_ns, {})[checkpoint["id"]] = entry
+            dropped = self._prune(record, checkpoint_ns)
+            if dropped:
+                self.store.delete_checkpoints(thread_id, checkpoint_ns, dropped)
+            self._remember(thread_id, record)
+        self._maybe_sweep()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]],
+                   task_id: str, task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        with self._lock:
+            record = self._load(thread_id) or _new_record()
+            checkpoint_writes = record["writes"].get((checkpoint_ns, checkpoint_id), {})
+            new_writes = {}
+            for idx, (channel, value) in enumerate(writes):
+                key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+                # Regular writes are kept once stored; special writes (errors, interrupts...) replace them
+                if key[1] >= 0 and key in checkpoint_writes:
+                    continue
+                new_writes[key] = (task_id, channel, self.serde.dumps_typed(value))
+            if not new_writes:
+                return
+            record["last_seen"] = time.time()
+            self.store.put_writes(thread_id, checkpoint_ns, checkpoint_id, new_writes, record["last_seen"])
+            record["writes"].setdefault((checkpoint_ns, checkpoint_id), {}).update(new_writes)
+            self._remember(thread_id, record)
+        self._maybe_sweep()
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend name, cached threads and store-level counts"""
+        with self._lock:
+            cached = len(self._cache)
+        return {"backend": self.store.name, "cached_threads": cached, **self.store.stats()}
+
+def _count_checkpoints(record: Dict[str, Any]) -> int:
+    return sum(len(checkpoints) for checkpoints in record["checkpoints"].values())
+
+def _record_size(record: Dict[str, Any]) -> int:
+    size = 0
+    for checkpoints in record["checkpoints"].values():
+        for checkpoint, metadata, _ in checkpoints.values():
+            size += len(checkpoint[1]) + len(metadata[1])
+    for writes in record["writes"].values():
+        size += sum(len(value[1]) for _, _, value in writes.values())
+    return size
+
+def create_checkpointer() -> TTLCheckpointSaver:
+    """Build the checkpointer selected by ``settings.checkpointer_backend``"""
+    backend = settings.checkpointer_backend.lower()
+    if backend == "sqlite":
+        store = SqliteThreadStore(settings.checkpoint_sqlite_path)
+    elif backend == "firestore":
+        store = FirestoreThreadStore(settings.checkpoint_ttl_seconds)
+    else:
+        if backend != "memory":
+            print(f"Unknown checkpointer backend '{backend}', using memory")
+        store = MemoryThreadStore(settings.checkpoint_max_threads)
+        if settings.web_concurrency > 1:
+            print("WARNING: memory checkpointer with multiple workers - interrupted turns "
+                  "can only resume on the worker that handled them. "
+                  "Set CHECKPOINTER_BACKEND=firestore or sqlite.")
+
+    print(f"Using {store.name} checkpointer")
+    return TTLCheckpointSaver(
+        store,
+        ttl_seconds=settings.checkpoint_ttl_seconds,
+        max_checkpoints=settings.checkpoint_history,
+        cache_size=settings.checkpoint_max_threads
+    )
@@ -0,0 +1,112 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable
+
+from app.config import settings
+
+# Markers for items passed from a worker thread to the event loop
+_ITEM, _ERROR, _DONE = object(), object(), object()
+
+class DependencyExecutors:
+    """Bounded thread pools, one per blocking dependency.
+
+    FastAPI endpoints are async, but the LangGraph/LangChain agents are
+    synchronous. Running them directly on the event loop stalls every other
+    request, so each dependency gets its own pool with its own concurrency
+    limit. CPU-bound local work (skill matching, index queries) gets a small
+    ``cpu`` pool of its own, so it neither waits behind LLM calls nor takes
+    their threads. Firestore calls from endpoints go through
+    ``AsyncFirebaseService`` and need no pool, and LinkedIn scrapes run on
+    their own job workers (see ``scrape_jobs``).
+    """
+
+    def __init__(self, limits: Dict[str, int]):
+        self.limits = dict(limits)
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> ThreadPoolExecutor:
+        """Get (lazily creating) the executor for a dependency"""
+        executor = self._executors.get(name)
+        if executor is None:
+            with self._lock:
+                executor = self._executors.get(name)
+                if executor is None:
+                    if name not in self.limits:
+                        raise KeyError(f"Unknown dependency executor: {name}")
+                    executor = ThreadPoolExecutor(
+                        max_workers=max(1, self.limits[name]),
+                        thread_name_prefix=f"{name}-worker"
+                    )
+                    self._executors[name] = executor
+        return executor
+
+    async def run(self, name: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking call on the dependency's executor without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        # Carry context variables (request-scoped state) into the worker thread
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self.get(name), call)
+
+    async def iterate(self, name: str, func: Callable[..., Iterable[Any]],
+                      *args, **kwargs) -> AsyncIterator[Any]:
+        """Drive a blocking generator on the dependency's executor, yielding its items.
+
+        Items are handed to the event loop as soon as they are produced, so
+        consumers (e.g. streaming responses) see them without waiting for the
+        generator to finish. If the consumer stops early the generator is
+        closed at its next yield.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def publish(item: Any) -> None:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # Event loop already closed - nobody is listening any more
+                stopped.set()
+
+        def produce() -> None:
+            try:
+                for item in func(*args, **kwargs):
+                    if stopped.is_set():
+                        break
+                    publish((_ITEM, item))
+            except BaseException as exc:
+                publish((_ERROR, exc))
+            finally:
+                publish((_DONE, None))
+
+        ctx = contextvars.copy_context()
+        loop.run_in_executor(self.get(name), ctx.run, produce)
+
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind is _DONE:
+                    break
+                if kind is _ERROR:
+                    raise value
+                yield value
+        finally:
+            stopped.set()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down all executors"""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=wait)
+
+# Create a singleton instance
+executors = DependencyExecutors({
+    "llm": settings.llm_max_workers,
+    "cpu": settings.cpu_max_workers,
+})
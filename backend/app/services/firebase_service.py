@@ -1,15 +1,150 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Iterator, Tuple
+from collections import OrderedDict
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+import copy
 import json
 import os
 import base64
+import socket
+import threading
+import time
 
 from app.config import settings
+from app.services.write_behind import WriteBehindQueue
+from app.services.metrics import metrics
+from app.services.tracing import tracer
 from app.models.schemas import UserProfile, Experience
 
+# Identifies this process on the cross-worker invalidation channel
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Latency of FirebaseService/AsyncFirebaseService calls; profile reads include cache hits
+FIRESTORE_SECONDS = metrics.histogram(
+    "firestore_operation_seconds",
+    "Firestore operation latency by client and method",
+    ["client", "method"]
+)
+
+class ProfileCache:
+    """Bounded TTL/LRU cache of profile documents.
+
+    Values are deep-copied on the way in and out, so callers can mutate what
+    they get (agents do) without corrupting the cached document.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._entries[session_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def set(self, session_id: str, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[session_id] = (time.time() + self.ttl_seconds, copy.deepcopy(profile))
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def apply_update(self, session_id: str, updates: Dict[str, Any]) -> None:
+        """Write-through: merge top-level field updates into a cached profile"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return
+            # Dotted paths and sentinels (DELETE_FIELD, ArrayUnion, ...) can't be
+            # applied locally - drop the entry and let the next read refetch it
+            if any("." in key or type(value).__module__.startswith("google.") for key, value in updates.items()):
+                del self._entries[session_id]
+                self.invalidations += 1
+                return
+            entry[1].update(copy.deepcopy(updates))
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            if self._entries.pop(session_id, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+def invalidation_document(session_id: str) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    return {
+        'session_id': session_id,
+        'origin': WORKER_ID,
+        'created_at': now,
+        'expires_at': now + timedelta(hours=1)  # For a Firestore TTL policy
+    }
+
+def window_turns(window: Optional[Dict[str, Any]], limit: int) -> Optional[List[Dict[str, Any]]]:
+    """The ``limit`` newest turns from a chat window document (newest first, like
+    ``get_chat_history``), or None when the window can't answer the request"""
+    if not window or limit > settings.chat_window_size:
+        return None
+    turns = window.get('turns') or []
+    if len(turns) < limit and not window.get('complete'):
+        return None
+    return [{key: value for key, value in turn.items() if key != 'id'} for turn in turns[:limit]]
+
+def chat_window_document(turns: List[Dict[str, Any]], complete: bool, doc_id: str,
+                         chat_data: Dict[str, Any], size: int) -> Dict[str, Any]:
+    """The window document after prepending a turn to its current ``turns``"""
+    turns = [turn for turn in turns if turn.get('id') != doc_id]
+    turns.insert(0, {'id': doc_id, **chat_data})
+    return {
+        'turns': turns[:size],
+        # True while the window holds the whole history, so shorter reads are exact
+        'complete': complete and len(turns) <= size,
+        'updated_at': datetime.utcnow()
+    }
+
+@firestore.transactional
+def _append_to_chat_window(transaction, window_ref, history_ref, doc_ref, chat_data: Dict[str, Any],
+                           size: int) -> None:
+    """Prepend a turn to the rolling window; the archive document is written separately"""
+    snapshot = window_ref.get(transaction=transaction)
+    if snapshot.exists:
+        window = snapshot.to_dict() or {}
+        turns = window.get('turns') or []
+        complete = window.get('complete', False)
+    else:
+        # First append for a session that predates the window: seed it from the archive
+        query = history_ref.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(size)
+        turns = [{'id': doc.id, **doc.to_dict()} for doc in query.stream(transaction=transaction)]
+        complete = len(turns) < size
+
+    transaction.set(window_ref, chat_window_document(turns, complete, doc_ref.id, chat_data, size))
+
 class FirebaseService:
     def __init__(self):
         if not firebase_admin._apps:
@@ -35,7 +170,87 @@ class FirebaseService:
             })
         
         self.db = firestore.client()
+        self.write_behind = WriteBehindQueue(
+            self.db.batch,
+            max_pending=settings.write_behind_max_pending,
+            batch_size=settings.write_behind_batch_size,
+            flush_interval=settings.write_behind_flush_interval,
+            max_retries=settings.write_behind_max_retries
+        ) if settings.write_behind_enabled else None
+        self._profile_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+        self.profile_cache = ProfileCache(settings.profile_cache_max_entries, settings.profile_cache_ttl_seconds) \
+            if settings.profile_cache_enabled else None
+        self._invalidation_watch = None
+        if self.profile_cache and settings.profile_cache_invalidation == "firestore":
+            self._watch_invalidations()
+        elif self.profile_cache and settings.web_concurrency > 1:
+            print("WARNING: profile cache with multiple workers and no invalidation channel - "
+                  f"other workers may serve profiles up to {settings.profile_cache_ttl_seconds}s stale. "
+                  "Set PROFILE_CACHE_INVALIDATION=firestore.")
+
+    def _watch_invalidations(self) -> None:
+        """Drop cached profiles that other workers have written"""
+        def on_snapshot(docs, changes, read_time):
+            for change in changes:
+                if change.type.name != 'ADDED':
+                    continue
+                data = change.document.to_dict() or {}
+                if data.get('origin') != WORKER_ID and data.get('session_id'):
+                    self.profile_cache.invalidate(data['session_id'])
+
+        try:
+            query = self.db.collection('cache_invalidations').where('created_at', '>=', datetime.utcnow())
+            self._invalidation_watch = query.on_snapshot(on_snapshot)
+            print("Profile cache invalidation channel: firestore")
+        except Exception as e:
+            print(f"Could not start profile cache invalidation channel: {e}")
+
+    def flush_writes(self, timeout: float = 10.0) -> bool:
+        """Commit everything buffered in the write-behind queue (call on shutdown)"""
+        if self.write_behind is None:
+            return True
+        return self.write_behind.flush(timeout)
+
+    def write_behind_stats(self) -> Dict[str, Any]:
+        if self.write_behind is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.write_behind.stats()}
+
+    @property
+    def publishes_invalidations(self) -> bool:
+        return self._invalidation_watch is not None
+
+    def _publish_invalidation(self, session_id: str) -> None:
+        if not self.publishes_invalidations:
+            return
+        try:
+            self.db.collection('cache_invalidations').add(invalidation_document(session_id))
+        except Exception as e:
+            print(f"Error publishing profile invalidation: {e}")
+
+    def profile_cache_stats(self) -> Dict[str, Any]:
+        if self.profile_cache is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "invalidation": "firestore" if self._invalidation_watch is not None else "none",
+            **self.profile_cache.stats()
+        }
+
+    def add_profile_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Call ``listener(session_id, fields)`` after a profile is created or updated"""
+        self._profile_listeners.append(listener)
+
+    def notify_profile_change(self, session_id: str, fields: Dict[str, Any]) -> None:
+        for listener in self._profile_listeners:
+            try:
+                listener(session_id, fields)
+            except Exception as e:
+                print(f"Profile listener error: {e}")
     
+    @tracer.traced("firestore.create_user_session")
+    @FIRESTORE_SECONDS.timed("sync", "create_user_session")
     def create_user_session(self, linkedin_url: str, profile_data: Dict[str, Any] = None) -> str:
         """Create a new user session and profile document"""
         session_id = str(uuid.uuid4())
@@ -52,56 +267,91 @@ class FirebaseService:
         
         # Create the profile document
         self.db.collection('users').document(session_id).collection('profile').document('data').set(user_profile)
+        if self.profile_cache:
+            self.profile_cache.set(session_id, user_profile)
+        self.notify_profile_change(session_id, user_profile)
         
         return session_id
     
+    @tracer.traced("firestore.get_user_profile", "session_id")
+    @FIRESTORE_SECONDS.timed("sync", "get_user_profile")
     def get_user_profile(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Get user profile data"""
+        """Get user profile data (served from the profile cache when possible)"""
+        if self.profile_cache:
+            cached = self.profile_cache.get(session_id)
+            tracer.set_attribute("profile_cache", "hit" if cached is not None else "miss")
+            if cached is not None:
+                return cached
+
         try:
             doc = self.db.collection('users').document(session_id).collection('profile').document('data').get()
             if doc.exists:
-                return doc.to_dict()
+                profile = doc.to_dict()
+                if self.profile_cache:
+                    self.profile_cache.set(session_id, profile)
+                return profile
             return None
         except Exception as e:
             print(f"Error getting user profile: {e}")
             return None
     
-    def update_user_profile(self, session_id: str, updates: Dict[str, Any]) -> bool:
-        """Update user profile with new data"""
+    @tracer.traced("firestore.update_user_profile", "session_id")
+    @FIRESTORE_SECONDS.timed("sync", "update_user_profile")
+    def update_user_profile(self, session_id: str, updates: Dict[str, Any], defer: bool = False) -> bool:
+        """Update user profile with new data.
+
+        With ``defer`` the Firestore write goes through the write-behind queue
+        when the profile is cached - reads are served the updated copy from the
+        cache until the write lands. Otherwise it is written immediately.
+        """
         try:
             updates['updated_at'] = datetime.utcnow()
             
             profile_ref = self.db.collection('users').document(session_id).collection('profile').document('data')
-            profile_ref.update(updates)
+            if defer and self.write_behind and self.profile_cache and self.profile_cache.get(session_id) is not None:
+                self.profile_cache.apply_update(session_id, updates)
+                tracer.set_attribute("deferred", True)
+                # Other workers may only refetch once the write has landed
+                self.write_behind.submit(
+                    lambda batch: batch.update(profile_ref, updates),
+                    on_commit=lambda: self._publish_invalidation(session_id)
+                )
+            else:
+                profile_ref.update(updates)
+                if self.profile_cache:
+                    self.profile_cache.apply_update(session_id, updates)
+                    self._publish_invalidation(session_id)
+            self.notify_profile_change(session_id, updates)
             
             return True
         except Exception as e:
             print(f"Error updating user profile: {e}")
             return False
     
-    def save_conversation_state(self, session_id: str, state_data: Dict[str, Any]) -> bool:
-        """Save LangGraph conversation state"""
-        try:
-            state_ref = self.db.collection('users').document(session_id).collection('langgraph_memory').document('state')
-            state_ref.set(state_data, merge=True)
-            return True
-        except Exception as e:
-            print(f"Error saving conversation state: {e}")
-            return False
-    
-    def get_conversation_state(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Get LangGraph conversation state"""
-        try:
-            doc = self.db.collection('users').document(session_id).collection('langgraph_memory').document('state').get()
-            if doc.exists:
-                return doc.to_dict()
-            return None
-        except Exception as e:
-            print(f"Error getting conversation state: {e}")
-            return None
-    
+    def iter_user_profiles(self, fields: List[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream ``(session_id, profile)`` for every session, reading only ``fields``"""
+        query = self.db.collection_group('profile').select(fields + ['session_id'])
+        for doc in query.stream():
+            if doc.id != 'data':
+                continue
+            data = doc.to_dict() or {}
+            yield data.get('session_id') or doc.reference.parent.parent.id, data
+
+    def _chat_window_ref(self, session_id: str):
+        return self.db.collection('users').document(session_id).collection('chat_window').document('recent')
+
+    @tracer.traced("firestore.add_chat_history", "session_id")
+    @FIRESTORE_SECONDS.timed("sync", "add_chat_history")
     def add_chat_history(self, session_id: str, message: str, response: str, agent_type: str) -> bool:
-        """Add a chat message to history"""
+        """Add a chat message to history.
+
+        When the window is enabled, the turn is added to the session's rolling
+        ``chat_window`` document right away, because the next turn reads it back
+        (possibly on another worker). The ``chat_history`` archive document is
+        only read for paging and exports, so it goes through the write-behind
+        queue. Without the window, reads query the archive, so it is written
+        immediately.
+        """
         try:
             chat_data = {
                 'message': message,
@@ -110,12 +360,54 @@ class FirebaseService:
                 'timestamp': datetime.utcnow()
             }
             
-            self.db.collection('users').document(session_id).collection('chat_history').add(chat_data)
+            history_ref = self.db.collection('users').document(session_id).collection('chat_history')
+            doc_ref = history_ref.document()
+            window_size = settings.chat_window_size
+            if window_size > 0:
+                self._append_to_window(session_id, history_ref, doc_ref, chat_data)
+                if not self.defer_chat_archive(session_id, doc_ref.id, chat_data):
+                    doc_ref.set(chat_data)
+            else:
+                doc_ref.set(chat_data)
             return True
         except Exception as e:
             print(f"Error adding chat history: {e}")
             return False
     
+    def defer_chat_archive(self, session_id: str, doc_id: str, chat_data: Dict[str, Any]) -> bool:
+        """Queue a turn's ``chat_history`` archive write; False if the write-behind queue is off"""
+        if self.write_behind is None:
+            return False
+        doc_ref = self.db.collection('users').document(session_id).collection('chat_history').document(doc_id)
+        self.write_behind.submit(lambda batch: batch.set(doc_ref, chat_data))
+        return True
+
+    def _append_to_window(self, session_id: str, history_ref, doc_ref, chat_data: Dict[str, Any]) -> None:
+        _append_to_chat_window(
+            self.db.transaction(), self._chat_window_ref(session_id), history_ref, doc_ref,
+            chat_data, settings.chat_window_size
+        )
+
+    @tracer.traced("firestore.get_recent_chat_history", "session_id")
+    @FIRESTORE_SECONDS.timed("sync", "get_recent_chat_history")
+    def get_recent_chat_history(self, session_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Recent chat history from the rolling window document - a single read.
+
+        Falls back to the ``chat_history`` query when the window is disabled,
+        not written yet, or smaller than ``limit``.
+        """
+        if settings.chat_window_size > 0:
+            try:
+                doc = self._chat_window_ref(session_id).get()
+                turns = window_turns(doc.to_dict() if doc.exists else None, limit)
+                if turns is not None:
+                    return turns
+            except Exception as e:
+                print(f"Error reading chat window: {e}")
+        return self.get_chat_history(session_id, limit)
+
+    @tracer.traced("firestore.get_chat_history", "session_id")
+    @FIRESTORE_SECONDS.timed("sync", "get_chat_history")
     def get_chat_history(self, session_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent chat history"""
         try:
@@ -4,45 +4,112 @@ import time
 import json
 
 from app.config import settings
+from app.services.scrape_cache import scrape_cache
+from app.services.scrape_coordinator import ScrapeCoordinator
+from app.services.scrape_archive import scrape_archive
+from app.services.metrics import metrics
+from app.services.tracing import tracer
+
+APIFY_RUN_SECONDS = metrics.histogram(
+    "apify_run_seconds",
+    "Apify actor run duration, including fetching the dataset",
+    ["outcome"],
+    buckets=(1, 2.5, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300)
+)
+APIFY_RUN_PROFILES = metrics.counter("apify_run_profiles_total", "Profile URLs submitted to Apify actor runs")
 
 class LinkedInScraper:
     def __init__(self):
         # Initialize the ApifyClient with API token
         self.client = ApifyClient(settings.apify_api_token)
         self.actor_id = "2SyF0bVxmgGr8IVCZ"  # New LinkedIn Profile Scraper Actor
+        self.coordinator = ScrapeCoordinator(
+            self._run_actor,
+            window_seconds=settings.scrape_batch_window_seconds,
+            max_batch=settings.scrape_batch_max_urls,
+            max_concurrent_runs=settings.scraper_max_workers,
+            on_item=self._archive
+        ) if settings.scrape_batch_enabled else None
     
+    @tracer.traced("linkedin.scrape_profile", "linkedin_url")
     def scrape_profile(self, linkedin_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get LinkedIn profile data, from the scrape cache when the URL was scraped recently
+        Returns structured profile data or None if failed
+        """
+        if scrape_cache is None:
+            return self._scrape(linkedin_url)
+        return scrape_cache.fetch(linkedin_url, self._scrape)
+
+    def _scrape(self, linkedin_url: str) -> Optional[Dict[str, Any]]:
         """
         Scrape LinkedIn profile data using Apify
         Returns structured profile data or None if failed
         """
         try:
-            # Prepare Actor input - using the new format
-            run_input = {
-                "profileUrls": [linkedin_url]
-            }
-            
-            print(f"Starting Apify actor run for: {linkedin_url}")
-            
-            # Run the Actor and wait for it to finish
-            run = self.client.actor(self.actor_id).call(run_input=run_input)
-            
-            # Fetch and process Actor results from the run's dataset
-            print(f"Fetching results from dataset: {run['defaultDatasetId']}")
-            items = list(self.client.dataset(run["defaultDatasetId"]).iterate_items())
-            
-            if items:
-                print(f"Found {len(items)} profile(s)")
-                profile_data = items[0]  # Get the first (and usually only) profile
-                return self._process_profile_data(profile_data)
+            if self.coordinator:
+                # Shares an actor run with other profiles requested at the same time;
+                # the coordinator archives each item once
+                profile_data = self.coordinator.scrape(linkedin_url)
             else:
-                print("No profile data found in the dataset")
-            
+                items = self._run_actor([linkedin_url])
+                profile_data = items[0] if items else None  # Get the first (and usually only) profile
+                if profile_data:
+                    self._archive(linkedin_url, profile_data)
+
+            if profile_data:
+                return self._process_profile_data(profile_data)
+            print(f"No profile data found for: {linkedin_url}")
             return None
             
         except Exception as e:
             print(f"Error scraping LinkedIn profile: {e}")
             return None
+
+    @tracer.traced("apify.run")
+    def _run_actor(self, linkedin_urls: List[str]) -> List[Dict[str, Any]]:
+        """Run the Apify actor for one or more profile URLs and return the raw dataset items"""
+        # Prepare Actor input - using the new format
+        run_input = {
+            "profileUrls": linkedin_urls
+        }
+
+        print(f"Starting Apify actor run for {len(linkedin_urls)} profile(s): {', '.join(linkedin_urls)}")
+
+        APIFY_RUN_PROFILES.inc(len(linkedin_urls))
+        tracer.set_attribute("profiles", len(linkedin_urls))
+        start = time.perf_counter()
+        try:
+            # Run the Actor and wait for it to finish
+            run = self.client.actor(self.actor_id).call(run_input=run_input)
+
+            # Fetch Actor results from the run's dataset
+            print(f"Fetching results from dataset: {run['defaultDatasetId']}")
+            items = list(self.client.dataset(run["defaultDatasetId"]).iterate_items())
+        except Exception:
+            APIFY_RUN_SECONDS.labels("error").observe(time.perf_counter() - start)
+            raise
+        APIFY_RUN_SECONDS.labels("ok").observe(time.perf_counter() - start)
+        print(f"Found {len(items)} profile(s)")
+        return items
+
+    def _archive(self, linkedin_url: str, raw_data: Dict[str, Any]) -> None:
+        """Keep the raw actor item so the mapping can be re-run without re-scraping"""
+        if scrape_archive is None:
+            return
+        try:
+            scrape_archive.store(linkedin_url, raw_data)
+        except Exception as e:
+            print(f"Error archiving raw profile for {linkedin_url}: {e}")
+
+    def process_raw_profile(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a raw actor item to our profile fields (used to re-process archived items)"""
+        return self._process_profile_data(raw_data)
+
+    def coordinator_stats(self) -> Dict[str, Any]:
+        if self.coordinator is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.coordinator.stats()}
     
     def _process_profile_data(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -0,0 +1,281 @@
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from app.config import settings
+from app.services.tracing import tracer
+
+# Set for the duration of a request that must not be served from cache
+_bypass = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+class MemoryTier:
+    """In-process LRU of serialized generations"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class DiskTier:
+    """SQLite-backed cache with size-based LRU eviction, shared by workers on one host.
+
+    The size cap is checked against the pages the database actually uses, so
+    writes from every worker count towards it.
+    """
+
+    # Rows dropped per eviction step before the size is measured again
+    EVICT_CHUNK = 100
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, agent TEXT, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+
+    def _db_bytes(self) -> int:
+        """Bytes in use by the database: ``page_count * page_size`` less free pages"""
+        page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def get(self, key: str) -> Optional[tuple]:
+        """Return ``(value, expires_at)`` or None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            return value, expires_at
+
+    def set(self, key: str, agent: str, value: str, expires_at: float) -> None:
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, agent, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, agent, value, size, expires_at, time.time())
+            )
+            if self._db_bytes() > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones down to 90% of the cap"""
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+        target = int(self.max_bytes * 0.9)
+        while self._db_bytes() > target:
+            deleted = self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_access LIMIT ?)", (self.EVICT_CHUNK,)
+            ).rowcount
+            if not deleted:
+                break
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            size = self._db_bytes()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+class AgentLLMCache(BaseCache):
+    """LangChain cache for one agent's chat model.
+
+    LangChain calls ``lookup``/``update`` around every model call with the
+    serialized prompt messages and an ``llm_string`` describing the model
+    parameters (model name, temperature, ...), so the key covers the rendered
+    prompt, model and temperature. Entries expire after the agent's TTL.
+    """
+
+    def __init__(self, agent: str, ttl_seconds: int, registry: "LLMCacheRegistry"):
+        self.agent = agent
+        self.ttl_seconds = ttl_seconds
+        self.registry = registry
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+
+    def _count(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        if _bypass.get():
+            self._count(bypassed=1)
+            return None
+
+        key = self._key(prompt, llm_string)
+        value = self.registry.memory.get(key)
+        if value is not None:
+            self._count(hits=1, memory_hits=1)
+            tracer.set_attribute("llm_cache", "hit")
+            return loads(value)
+
+        disk = self.registry.disk
+        entry = disk.get(key) if disk else None
+        if entry is not None:
+            self._count(hits=1)
+            value, expires_at = entry
+            # Promote to the memory tier
+            self.registry.memory.set(key, value, expires_at)
+            tracer.set_attribute("llm_cache", "hit")
+            return loads(value)
+
+        self._count(misses=1)
+        tracer.set_attribute("llm_cache", "miss")
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        try:
+            value = dumps(list(return_val))
+        except Exception as e:
+            print(f"LLM cache serialization error ({self.agent}): {e}")
+            return
+
+        key = self._key(prompt, llm_string)
+        expires_at = time.time() + self.ttl_seconds
+        self.registry.memory.set(key, value, expires_at)
+        if self.registry.disk:
+            self.registry.disk.set(key, self.agent, value, expires_at)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.registry.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, memory_hits, misses, bypassed = self.hits, self.memory_hits, self.misses, self.bypassed
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "memory_hits": memory_hits,
+            "misses": misses,
+            "bypassed": bypassed,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+class LLMCacheRegistry:
+    """Shared memory/disk tiers plus one ``AgentLLMCache`` per agent"""
+
+    def __init__(self):
+        self.memory = MemoryTier(settings.llm_cache_memory_entries)
+        self.disk = DiskTier(settings.llm_cache_path, settings.llm_cache_disk_max_bytes) \
+            if settings.llm_cache_disk_max_bytes > 0 else None
+        self._ttls = self._load_ttls(settings.llm_cache_agent_ttls)
+        self._caches: Dict[str, AgentLLMCache] = {}
+        self._lock = threading.Lock()
+
+    def _load_ttls(self, raw: str) -> Dict[str, int]:
+        if not raw:
+            return {}
+        try:
+            return {agent: int(ttl) for agent, ttl in json.loads(raw).items()}
+        except (ValueError, AttributeError) as e:
+            print(f"Ignoring invalid LLM_CACHE_AGENT_TTLS: {e}")
+            return {}
+
+    def for_agent(self, agent: str) -> Optional[AgentLLMCache]:
+        """Get the cache for an agent, or None if caching is off for it"""
+        ttl = self._ttls.get(agent, settings.llm_cache_ttl_seconds)
+        if not settings.llm_cache_enabled or ttl <= 0:
+            return None
+        with self._lock:
+            if agent not in self._caches:
+                self._caches[agent] = AgentLLMCache(agent, ttl, self)
+            return self._caches[agent]
+
+    @contextmanager
+    def bypass(self, enabled: bool = True):
+        """Skip cache reads (fresh results are still stored) within this context"""
+        token = _bypass.set(enabled)
+        try:
+            yield
+        finally:
+            _bypass.reset(token)
+
+    def is_bypassed(self) -> bool:
+        """Whether the current request asked for fresh (uncached) results"""
+        return _bypass.get()
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            caches = dict(self._caches)
+        return {
+            "enabled": settings.llm_cache_enabled,
+            "memory_entries": len(self.memory),
+            "disk": self.disk.stats() if self.disk else None,
+            "agents": {agent: cache.stats() for agent, cache in caches.items()}
+        }
+
+# Create a singleton instance
+llm_cache = LLMCacheRegistry()
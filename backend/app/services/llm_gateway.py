@@ -0,0 +1,238 @@
+import json
+import threading
+import time
+from typing import Dict, Any, Optional
+from uuid import UUID
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_openai import ChatOpenAI
+
+from app.config import settings
+from app.services.llm_cache import llm_cache
+from app.services.metrics import metrics
+
+LLM_CALL_SECONDS = metrics.histogram(
+    "llm_call_seconds",
+    "Chat model call latency per agent; cache hits are included",
+    ["agent", "outcome"]
+)
+LLM_TOKENS = metrics.counter(
+    "llm_tokens_total",
+    "Tokens reported in chat model responses per agent (prompt or completion)",
+    ["agent", "type"]
+)
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Records latency and token usage of one agent's chat model calls"""
+
+    # Cheap and thread-safe, so async runs call it inline instead of in an executor
+    run_inline = True
+
+    def __init__(self, agent: str):
+        self._starts: Dict[UUID, float] = {}
+        self._ok = LLM_CALL_SECONDS.labels(agent, "ok")
+        self._error = LLM_CALL_SECONDS.labels(agent, "error")
+        self._prompt_tokens = LLM_TOKENS.labels(agent, "prompt")
+        self._completion_tokens = LLM_TOKENS.labels(agent, "completion")
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._starts[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        start = self._starts.pop(run_id, None)
+        if start is not None:
+            self._ok.observe(time.perf_counter() - start)
+        prompt, completion = token_usage(response)
+        if prompt:
+            self._prompt_tokens.inc(prompt)
+        if completion:
+            self._completion_tokens.inc(completion)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        start = self._starts.pop(run_id, None)
+        if start is not None:
+            self._error.observe(time.perf_counter() - start)
+
+def token_usage(response: LLMResult) -> tuple:
+    """``(prompt, completion)`` tokens from message usage metadata, else the provider's token_usage"""
+    prompt = completion = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                prompt += usage.get("input_tokens", 0)
+                completion += usage.get("output_tokens", 0)
+    if prompt or completion:
+        return prompt, completion
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+class _MeteredStream(httpx.SyncByteStream):
+    """Response body wrapper that marks the request finished when the body is closed"""
+
+    def __init__(self, stream: httpx.SyncByteStream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if self._on_close:
+                self._on_close()
+                self._on_close = None
+
+class _MeteredTransport(httpx.HTTPTransport):
+    """HTTP transport that reports request start/finish to the gateway"""
+
+    def __init__(self, gateway: "LLMGateway", **kwargs):
+        super().__init__(**kwargs)
+        self._gateway = gateway
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._gateway._request_started()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            self._gateway._request_finished(error=True)
+            raise
+        response.stream = _MeteredStream(response.stream, self._gateway._request_finished)
+        return response
+
+class LLMGateway:
+    """Single source of chat models for all agents.
+
+    Every agent's ``ChatOpenAI`` shares one keep-alive (HTTP/2 when ``h2`` is
+    installed) connection pool to OpenRouter, so warm connections are reused
+    across agents instead of each agent paying its own TCP/TLS setup. Models and
+    temperatures can be overridden per agent with ``LLM_AGENT_OVERRIDES``, and
+    each model is wired to its agent's response cache (``llm_cache``) and to a
+    metrics callback (latency and tokens per agent).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._transport: Optional[_MeteredTransport] = None
+        self._models: Dict[str, ChatOpenAI] = {}
+        self._overrides = self._load_overrides(settings.llm_agent_overrides)
+
+        # Pool utilization counters
+        self._requests = 0
+        self._errors = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    def _load_overrides(self, raw: str) -> Dict[str, Dict[str, Any]]:
+        if not raw:
+            return {}
+        try:
+            overrides = json.loads(raw)
+            return overrides if isinstance(overrides, dict) else {}
+        except json.JSONDecodeError as e:
+            print(f"Ignoring invalid LLM_AGENT_OVERRIDES: {e}")
+            return {}
+
+    def _get_http_client(self) -> httpx.Client:
+        if self._http_client is None:
+            http2 = settings.llm_http2 and _h2_available()
+            self._transport = _MeteredTransport(
+                self,
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings.llm_pool_max_connections,
+                    max_keepalive_connections=settings.llm_pool_max_keepalive,
+                    keepalive_expiry=settings.llm_pool_keepalive_expiry
+                )
+            )
+            self._http_client = httpx.Client(
+                transport=self._transport,
+                timeout=httpx.Timeout(settings.llm_timeout_seconds, connect=10.0)
+            )
+            print(f"LLM connection pool ready (http2={http2}, max_connections={settings.llm_pool_max_connections})")
+        return self._http_client
+
+    def get_chat_model(self, agent: str, temperature: float, model: Optional[str] = None) -> ChatOpenAI:
+        """Get the chat model for an agent; agent overrides win over the passed defaults"""
+        with self._lock:
+            if agent in self._models:
+                return self._models[agent]
+
+            override = self._overrides.get(agent, {})
+            llm = ChatOpenAI(
+                api_key=settings.openrouter_api_key,
+                base_url=settings.llm_base_url,
+                model=override.get("model", model or settings.llm_model),
+                temperature=override.get("temperature", temperature),
+                http_client=self._get_http_client(),
+                cache=llm_cache.for_agent(agent),
+                callbacks=[LLMMetricsCallback(agent)],
+                metadata={"agent": agent}  # Lets tracing name the agent of each model run
+            )
+            self._models[agent] = llm
+            return llm
+
+    def _request_started(self) -> None:
+        with self._lock:
+            self._requests += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def _request_finished(self, error: bool = False) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if error:
+                self._errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counters and connection pool utilization"""
+        with self._lock:
+            stats = {
+                "requests": self._requests,
+                "errors": self._errors,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "max_connections": settings.llm_pool_max_connections,
+                "models": {
+                    agent: {"model": llm.model_name, "temperature": llm.temperature}
+                    for agent, llm in self._models.items()
+                }
+            }
+        stats["pool"] = self._pool_stats()
+        return stats
+
+    def _pool_stats(self) -> Dict[str, Any]:
+        """Open/idle connection counts from the underlying httpcore pool (best effort)"""
+        pool = getattr(self._transport, "_pool", None)
+        if pool is None:
+            return {"connections": 0, "idle": 0, "http2": 0}
+        try:
+            connections = list(pool.connections)
+            return {
+                "connections": len(connections),
+                "idle": sum(1 for c in connections if c.is_idle()),
+                "http2": sum(1 for c in connections if "HTTP/2" in repr(c))
+            }
+        except Exception:
+            return {}
+
+    def close(self) -> None:
+        """Close the shared connection pool"""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+# Create a singleton instance
+llm_gateway = LLMGateway()
@@ -0,0 +1,277 @@
+import asyncio
+import functools
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterable, List, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits (sub-millisecond) to slow LLM calls and actor runs
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# (name, type, help, [(labels, value), ...]) as returned by collectors
+MetricFamily = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return str(value)
+    if value.is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+class _CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+class _Metric(ABC):
+    """A metric family; ``labels(...)`` returns the child for one label combination.
+
+    Children are created once per label combination and cached, so the hot path
+    is a dict lookup plus a short locked update. Callers on very hot paths can
+    hold on to the child instead of calling ``labels`` each time.
+    """
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    @abstractmethod
+    def _new_child(self):
+        """A fresh child holding one label combination's value"""
+
+    def labels(self, *values) -> Any:
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _items(self) -> List[Tuple[Dict[str, str], Any]]:
+        with self._lock:
+            children = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in children]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for labels, child in self._items():
+            lines.extend(self._render_child(labels, child))
+        return lines
+
+    def _render_child(self, labels: Dict[str, str], child) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(child.value)}"]
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._children[()].dec(amount)
+
+    def set(self, value: float) -> None:
+        self._children[()].set(value)
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(float(b) for b in buckets if b != math.inf))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def time(self):
+        return self._children[()].time()
+
+    def timed(self, *values):
+        """Decorator observing the duration of each call (sync or async) under ``values``"""
+        def decorator(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    child = self.labels(*values)
+                    start = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        child.observe(time.perf_counter() - start)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                child = self.labels(*values)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    child.observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def _render_child(self, labels: Dict[str, str], child: _HistogramChild) -> List[str]:
+        with child._lock:
+            counts = list(child.counts)
+            total = child.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (math.inf,), counts):
+            cumulative += count
+            bucket_labels = {**labels, "le": _format_value(bound)}
+            lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """In-process metrics in the Prometheus text exposition format (0.0.4).
+
+    Instrumented code updates counters, gauges and histograms directly. Values
+    that components already track (cache hit counters, checkpoint sizes, queue
+    depths) are read at scrape time by collectors registered with
+    ``register_collector``, so they cost nothing between scrapes. Every worker
+    process has its own registry; scrape each worker (or aggregate them in
+    Prometheus) rather than expecting totals from one.
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> Any:
+        name = self.prefix + name
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """Call ``collector()`` on every scrape; it returns ``(name, type, help, samples)`` families"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+                continue
+            for name, metric_type, documentation, samples in families:
+                name = self.prefix + name
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+# Content type of the text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Create a singleton instance
+metrics = MetricsRegistry(prefix="careercoach_")
@@ -0,0 +1,230 @@
+import hashlib
+import hmac
+import threading
+import time
+from typing import Dict, Any, List, Optional, Set
+
+import numpy as np
+
+from app.config import settings
+from app.services.firebase_service import firebase_service
+from app.services.skill_matcher import skill_matcher, EXPERIENCE_CREDIT
+
+# Profile fields that carry skills: listed ones get full credit, the rest
+# count as evidence (EXPERIENCE_CREDIT) like in the job-fit scorer
+LISTED_FIELD = "skills"
+EVIDENCE_FIELDS = ["headline", "about", "experience"]
+
+def match_id(session_id: str) -> str:
+    """Opaque id for a matched session, the same on every worker.
+
+    Session ids grant access to the session, so results only carry an HMAC of
+    the id under ``ADMIN_API_KEY``.
+    """
+    digest = hmac.new(settings.admin_api_key.encode("utf-8"), session_id.encode("utf-8"), hashlib.sha256)
+    return digest.hexdigest()[:24]
+
+class _Posting:
+    """Sessions holding one skill, with a lazily rebuilt array view for scoring"""
+
+    __slots__ = ("credits", "_slots", "_values")
+
+    def __init__(self):
+        self.credits: Dict[int, float] = {}
+        self._slots: Optional[np.ndarray] = None
+        self._values: Optional[np.ndarray] = None
+
+    def set(self, slot: int, credit: float) -> None:
+        self.credits[slot] = credit
+        self._slots = None
+
+    def remove(self, slot: int) -> None:
+        if self.credits.pop(slot, None) is not None:
+            self._slots = None
+
+    def arrays(self):
+        if self._slots is None:
+            self._slots = np.fromiter(self.credits.keys(), dtype=np.int64, count=len(self.credits))
+            self._values = np.fromiter(self.credits.values(), dtype=np.float32, count=len(self.credits))
+        return self._slots, self._values
+
+class ProfileIndex:
+    """Inverted index from canonical skill to the sessions that have it.
+
+    Answers "which sessions fit this job description best" without touching
+    Firestore or an LLM: the JD's skills are extracted with the skill matcher,
+    each skill's posting adds ``weight x credit`` into a per-session score
+    array, and the top-K are picked with ``argpartition``. The index is built
+    from Firestore in the background on the first query rather than at
+    startup, so workers that never serve a match (and workers recycled by
+    gunicorn's ``max_requests``) don't scan every profile. It is rebuilt every
+    ``PROFILE_INDEX_REFRESH_SECONDS`` if set, to pick up writes from other
+    workers, and kept current through FirebaseService profile listeners.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, _Posting] = {}
+        self._slots: Dict[str, int] = {}
+        self._session_ids: List[Optional[str]] = []
+        self._free_slots: List[int] = []
+        # session -> field -> canonical skills, so partial updates can be merged
+        self._fields: Dict[str, Dict[str, Set[str]]] = {}
+
+        self.status = "empty"
+        self.last_build_seconds: Optional[float] = None
+        self._queries = 0
+        self._started = False
+
+    def start(self) -> None:
+        """Hook into profile writes and build the index in the background (once)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        firebase_service.add_profile_listener(self.update_session)
+        threading.Thread(target=self._build_loop, name="profile-index", daemon=True).start()
+
+    def _build_loop(self) -> None:
+        while True:
+            self.rebuild()
+            if settings.profile_index_refresh_seconds <= 0:
+                return
+            time.sleep(settings.profile_index_refresh_seconds)
+
+    def rebuild(self) -> None:
+        """Re-read every profile from Firestore"""
+        started = time.perf_counter()
+        self.status = "building" if self.status == "empty" else self.status
+        try:
+            count = 0
+            for session_id, profile in firebase_service.iter_user_profiles([LISTED_FIELD] + EVIDENCE_FIELDS):
+                self.update_session(session_id, profile)
+                count += 1
+            self.last_build_seconds = round(time.perf_counter() - started, 2)
+            self.status = "ready"
+            print(f"Profile index built: {count} sessions in {self.last_build_seconds}s")
+        except Exception as e:
+            print(f"Error building profile index: {e}")
+            if self.status == "building":
+                self.status = "failed"
+
+    def update_session(self, session_id: str, fields: Dict[str, Any]) -> None:
+        """Merge (partially) updated profile fields into the index"""
+        changed = {}
+        for field in [LISTED_FIELD] + EVIDENCE_FIELDS:
+            if field in fields:
+                changed[field] = set(skill_matcher.extract(self._field_text(fields[field])))
+        if not changed:
+            return
+
+        with self._lock:
+            session_fields = self._fields.setdefault(session_id, {})
+            session_fields.update(changed)
+
+            listed = session_fields.get(LISTED_FIELD, set())
+            credits = {skill: 1.0 for skill in listed}
+            for field in EVIDENCE_FIELDS:
+                for skill in session_fields.get(field, set()):
+                    credits.setdefault(skill, EXPERIENCE_CREDIT)
+
+            slot = self._slot_for(session_id)
+            for skill, posting in list(self._postings.items()):
+                if slot in posting.credits and skill not in credits:
+                    posting.remove(slot)
+                    if not posting.credits:
+                        del self._postings[skill]
+            for skill, credit in credits.items():
+                self._postings.setdefault(skill, _Posting()).set(slot, credit)
+
+    def remove_session(self, session_id: str) -> None:
+        with self._lock:
+            slot = self._slots.pop(session_id, None)
+            self._fields.pop(session_id, None)
+            if slot is None:
+                return
+            for skill, posting in list(self._postings.items()):
+                posting.remove(slot)
+                if not posting.credits:
+                    del self._postings[skill]
+            self._session_ids[slot] = None
+            self._free_slots.append(slot)
+
+    def _slot_for(self, session_id: str) -> int:
+        slot = self._slots.get(session_id)
+        if slot is None:
+            if self._free_slots:
+                slot = self._free_slots.pop()
+                self._session_ids[slot] = session_id
+            else:
+                slot = len(self._session_ids)
+                self._session_ids.append(session_id)
+            self._slots[session_id] = slot
+        return slot
+
+    def _field_text(self, value: Any) -> str:
+        if isinstance(value, list):
+            parts = []
+            for item in value:
+                if isinstance(item, dict):
+                    parts.extend(str(item.get(key) or "") for key in ("title", "description"))
+                else:
+                    parts.append(str(item))
+            return "\n".join(parts)
+        return str(value or "")
+
+    def query(self, job_description: str, top_k: int = 10) -> Dict[str, Any]:
+        """Top-K sessions for a job description, scored like the job-fit pre-scorer"""
+        started = time.perf_counter()
+        job_skills = skill_matcher.extract_job_skills(job_description)
+        total = sum(job_skills.values())
+        results = []
+
+        with self._lock:
+            self._queries += 1
+            if total and self._slots:
+                scores = np.zeros(len(self._session_ids), dtype=np.float32)
+                for skill, weight in job_skills.items():
+                    posting = self._postings.get(skill)
+                    if posting is not None:
+                        slots, values = posting.arrays()
+                        scores[slots] += weight * values
+
+                k = min(top_k, int(np.count_nonzero(scores)))
+                if k > 0:
+                    top = np.argpartition(-scores, k - 1)[:k]
+                    for slot in top[np.argsort(-scores[top], kind="stable")]:
+                        results.append(self._describe(int(slot), float(scores[slot]), job_skills, total))
+
+        return {
+            "job_skills": list(job_skills),
+            "results": results,
+            "indexed_sessions": len(self._slots),
+            "took_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    def _describe(self, slot: int, score: float, job_skills: Dict[str, float], total: float) -> Dict[str, Any]:
+        session_id = self._session_ids[slot]
+        session_fields = self._fields.get(session_id, {})
+        listed = session_fields.get(LISTED_FIELD, set())
+        evidenced = set().union(*(session_fields.get(field, set()) for field in EVIDENCE_FIELDS)) - listed
+        return {
+            "match_id": match_id(session_id),
+            "score": int(round(100 * score / total)),
+            "matched_skills": [skill for skill in job_skills if skill in listed],
+            "experience_only_skills": [skill for skill in job_skills if skill in evidenced],
+            "missing_skills": [skill for skill in job_skills if skill not in listed and skill not in evidenced]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "status": self.status,
+                "sessions": len(self._slots),
+                "skills": len(self._postings),
+                "queries": self._queries,
+                "last_build_seconds": self.last_build_seconds
+            }
+
+# Create a singleton instance
+profile_index = ProfileIndex()
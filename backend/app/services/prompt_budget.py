@@ -0,0 +1,164 @@
+import json
+import threading
+from typing import Dict, Any, List, Optional, Sequence
+
+from app.config import settings
+
+# Token budget for the variable parts of each agent's prompt (profile, history,
+# query). The fixed system prompt is not counted. Override with PROMPT_TOKEN_BUDGETS.
+DEFAULT_TOKEN_BUDGETS = {
+    "router": 1200,
+    "profile_updater": 2000,
+    "job_fit_analyst": 3500,
+    "career_path": 3000,
+    "content_enhancement": 3000,
+}
+
+# Sections squeezed below this many tokens are dropped instead of truncated
+MIN_SECTION_TOKENS = 12
+
+# Profile fields the profile updater may change - the only ones it needs to see
+PROFILE_UPDATER_FIELDS = ["headline", "skills", "about", "experience"]
+
+class TokenCounter:
+    """Counts tokens with tiktoken, or ~4 characters per token if it can't load.
+
+    tiktoken downloads its BPE files on first use, so the encoding is loaded
+    lazily and a missing package or offline host falls back to the estimate.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self._encoding = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _get_encoding(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._encoding = self._load_encoding()
+                    self._loaded = True
+        return self._encoding
+
+    def _load_encoding(self):
+        try:
+            import tiktoken
+        except ImportError:
+            print("tiktoken not installed - estimating prompt tokens from length")
+            return None
+        try:
+            # OpenRouter model ids are prefixed with the provider ("openai/gpt-4o-mini")
+            return tiktoken.encoding_for_model(self.model.split("/")[-1])
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            print(f"Could not load tiktoken encoding ({e}) - estimating prompt tokens from length")
+            return None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = self._get_encoding()
+        if encoding is None:
+            return (len(text) + 3) // 4
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text down to ``max_tokens``, marking the cut with an ellipsis"""
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+        encoding = self._get_encoding()
+        if encoding is None:
+            return text[:max(0, max_tokens * 4 - 3)].rstrip() + "..."
+        tokens = encoding.encode(text, disallowed_special=())
+        return encoding.decode(tokens[:max(0, max_tokens - 1)]).rstrip() + "..."
+
+class PromptBudget:
+    """Fits prioritized prompt sections into an agent's token budget.
+
+    Sections are added with a priority and an optional per-section cap. When
+    rendering, sections are admitted highest priority first; a section that no
+    longer fits is truncated to the remaining budget, or dropped when less than
+    ``MIN_SECTION_TOKENS`` remain. ``render`` returns each prompt variable's
+    surviving sections, joined in the order they were added; ``variables``
+    are always present, empty if nothing was added for them.
+    """
+
+    def __init__(self, agent: str, variables: Sequence[str] = (), max_tokens: Optional[int] = None):
+        self.agent = agent
+        self.variables = list(variables)
+        self.max_tokens = max_tokens if max_tokens is not None else budget_for(agent)
+        self._sections: List[Dict[str, Any]] = []
+
+    def add(self, variable: str, text: str, priority: int,
+            max_tokens: Optional[int] = None, truncatable: bool = True) -> None:
+        self._sections.append({
+            "variable": variable,
+            "text": text or "",
+            "priority": priority,
+            "max_tokens": max_tokens,
+            "truncatable": truncatable
+        })
+
+    def render(self) -> Dict[str, str]:
+        remaining = self.max_tokens
+        kept: Dict[int, str] = {}
+        dropped = 0
+
+        order = sorted(range(len(self._sections)), key=lambda i: -self._sections[i]["priority"])
+        for i in order:
+            section = self._sections[i]
+            text = section["text"]
+            if section["max_tokens"] is not None:
+                text = token_counter.truncate(text, section["max_tokens"])
+
+            tokens = token_counter.count(text)
+            if tokens > remaining:
+                if not section["truncatable"] or remaining < MIN_SECTION_TOKENS:
+                    dropped += 1
+                    continue
+                text = token_counter.truncate(text, remaining)
+                tokens = token_counter.count(text)
+
+            kept[i] = text
+            remaining -= tokens
+
+        if dropped:
+            print(f"Prompt budget ({self.agent}): dropped {dropped} low-priority sections to fit {self.max_tokens} tokens")
+
+        rendered: Dict[str, List[str]] = {variable: [] for variable in self.variables}
+        for i, section in enumerate(self._sections):
+            rendered.setdefault(section["variable"], [])
+            if i in kept:
+                rendered[section["variable"]].append(kept[i])
+        return {variable: "\n".join(parts) for variable, parts in rendered.items()}
+
+def _load_budgets(raw: str) -> Dict[str, int]:
+    budgets = dict(DEFAULT_TOKEN_BUDGETS)
+    if raw:
+        try:
+            budgets.update({agent: int(tokens) for agent, tokens in json.loads(raw).items()})
+        except (ValueError, AttributeError) as e:
+            print(f"Ignoring invalid PROMPT_TOKEN_BUDGETS: {e}")
+    return budgets
+
+def budget_for(agent: str) -> int:
+    return _budgets.get(agent, settings.prompt_token_budget_default)
+
+def add_chat_history(budget: PromptBudget, messages: List[Any], priority: int, variable: str = "chat_history") -> None:
+    """Add chat messages as sections whose priority drops with age, so the oldest go first"""
+    for index, msg in enumerate(messages):
+        age = len(messages) - 1 - index
+        budget.add(variable, f"{msg.type}: {msg.content}", priority - age, max_tokens=400)
+
+def compact_profile(profile_data: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Only the listed, non-empty fields - no timestamps or scrape metadata"""
+    return {field: profile_data[field] for field in fields if profile_data.get(field)}
+
+_budgets = _load_budgets(settings.prompt_token_budgets)
+
+# Shared counter for the configured model
+token_counter = TokenCounter(settings.llm_model)
@@ -0,0 +1,94 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Any, Optional, Iterator
+
+from app.config import settings
+from app.services.scrape_cache import canonical_profile_url
+
+class ScrapeArchive:
+    """Gzipped raw Apify items, addressed by profile URL and scrape time.
+
+    Each profile gets a directory named after the SHA-256 of its canonical
+    URL (fanned out by the first two hex digits), holding one
+    ``<scraped_at_ms>.json.gz`` file per scrape. The newest
+    ``keep_versions`` are kept. The raw items let
+    ``scripts/reprocess_scrapes.py`` re-run the field mapping without paying
+    for new actor runs.
+    """
+
+    def __init__(self, root: str, keep_versions: int):
+        self.root = root
+        self.keep_versions = max(1, keep_versions)
+        self.stored = 0
+
+    def _profile_dir(self, canonical_url: str) -> str:
+        digest = hashlib.sha256(canonical_url.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, digest[:2], digest)
+
+    def store(self, linkedin_url: str, raw_item: Dict[str, Any], scraped_at: Optional[float] = None) -> str:
+        """Write one raw item and prune old versions; returns the file path"""
+        canonical_url = canonical_profile_url(linkedin_url)
+        scraped_at = scraped_at or time.time()
+        directory = self._profile_dir(canonical_url)
+        os.makedirs(directory, exist_ok=True)
+
+        path = os.path.join(directory, f"{int(scraped_at * 1000)}.json.gz")
+        payload = {
+            "url": linkedin_url,
+            "canonical_url": canonical_url,
+            "scraped_at": scraped_at,
+            "item": raw_item
+        }
+        # Write then rename, so readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, default=str)
+        os.replace(tmp_path, path)
+        self.stored += 1
+
+        for old in self._versions(directory)[self.keep_versions:]:
+            try:
+                os.remove(os.path.join(directory, old))
+            except OSError:
+                pass
+        return path
+
+    def _versions(self, directory: str) -> list:
+        """Archived file names in a profile directory, newest first"""
+        names = [name for name in os.listdir(directory) if name.endswith(".json.gz")]
+        return sorted(names, key=lambda name: int(name.split(".", 1)[0]), reverse=True)
+
+    def latest(self, linkedin_url: str) -> Optional[Dict[str, Any]]:
+        directory = self._profile_dir(canonical_profile_url(linkedin_url))
+        if not os.path.isdir(directory):
+            return None
+        versions = self._versions(directory)
+        return self.load(os.path.join(directory, versions[0])) if versions else None
+
+    def iter_latest_paths(self) -> Iterator[str]:
+        """Path of the newest payload of every archived profile"""
+        if not os.path.isdir(self.root):
+            return
+        for fan_out in sorted(os.listdir(self.root)):
+            fan_out_dir = os.path.join(self.root, fan_out)
+            if not os.path.isdir(fan_out_dir):
+                continue
+            for digest in sorted(os.listdir(fan_out_dir)):
+                directory = os.path.join(fan_out_dir, digest)
+                versions = self._versions(directory)
+                if versions:
+                    yield os.path.join(directory, versions[0])
+
+    @staticmethod
+    def load(path: str) -> Dict[str, Any]:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+# Create a singleton instance
+scrape_archive = ScrapeArchive(
+    settings.scrape_archive_path,
+    keep_versions=settings.scrape_archive_versions
+) if settings.scrape_archive_enabled else None
@@ -0,0 +1,166 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, Tuple
+from urllib.parse import urlsplit, unquote
+
+from app.config import settings
+from app.services.tracing import tracer
+
+def canonical_profile_url(linkedin_url: str) -> str:
+    """Normalize a LinkedIn profile URL to one cache key.
+
+    Drops the scheme, query string, fragment, trailing slash, ``www.`` and
+    locale subdomains (``de.linkedin.com``), and lowercases the rest, so
+    ``https://DE.linkedin.com/in/Jane-Doe/?trk=x`` and
+    ``linkedin.com/in/jane-doe`` share an entry. Sub-pages of a profile
+    (``/in/jane-doe/details/skills``) map to the profile itself. Legacy
+    ``/pub/<name>/<a>/<b>/<c>`` URLs keep their full path, since the name
+    alone is shared by different people.
+    """
+    url = linkedin_url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+
+    host = (parts.hostname or "").lower()
+    if host == "linkedin.com" or host.endswith(".linkedin.com"):
+        host = "linkedin.com"
+
+    segments = [segment for segment in unquote(parts.path).lower().split("/") if segment]
+    if len(segments) >= 2 and segments[0] == "in":
+        segments = segments[:2]
+    return "/".join([host] + segments)
+
+class ScrapeCache:
+    """SQLite store of processed LinkedIn profiles keyed by canonical URL.
+
+    A profile younger than ``ttl_seconds`` is served as is. Up to
+    ``stale_seconds`` past that it is still served (so the session starts
+    instantly) while a background scrape refreshes the entry for the next
+    session. Older entries count as misses. Only successful scrapes are
+    stored, and the file is shared by all workers on a host.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int, stale_seconds: int, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = max(0, stale_seconds)
+        self.max_entries = max(1, max_entries)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS scrape_cache ("
+                "key TEXT PRIMARY KEY, profile TEXT NOT NULL, scraped_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS scrape_cache_scraped_at ON scrape_cache (scraped_at)")
+
+        self._revalidating = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return ``(profile, age_seconds)`` for a usable entry, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT profile, scraped_at FROM scrape_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        age = time.time() - row[1]
+        if age > self.ttl_seconds + self.stale_seconds:
+            return None
+        return json.loads(row[0]), age
+
+    def set(self, key: str, profile: Dict[str, Any]) -> None:
+        value = json.dumps(profile, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrape_cache (key, profile, scraped_at) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM scrape_cache").fetchone()[0]
+            if count > self.max_entries:
+                # Oldest scrapes go first, down to 90% of the cap
+                self._conn.execute(
+                    "DELETE FROM scrape_cache WHERE key IN "
+                    "(SELECT key FROM scrape_cache ORDER BY scraped_at LIMIT ?)",
+                    (count - int(self.max_entries * 0.9),)
+                )
+
+    def fetch(self, linkedin_url: str, scrape: Callable[[str], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Get a profile through the cache, calling ``scrape(linkedin_url)`` on a miss"""
+        key = canonical_profile_url(linkedin_url)
+        cached = self.get(key)
+        if cached is not None:
+            profile, age = cached
+            if age <= self.ttl_seconds:
+                self.hits += 1
+                tracer.set_attribute("scrape_cache", "hit")
+                return profile
+            self.stale_hits += 1
+            tracer.set_attribute("scrape_cache", "stale")
+            self._revalidate(key, linkedin_url, scrape)
+            return profile
+
+        self.misses += 1
+        tracer.set_attribute("scrape_cache", "miss")
+        profile = scrape(linkedin_url)
+        if profile:
+            self.set(key, profile)
+        return profile
+
+    def _revalidate(self, key: str, linkedin_url: str, scrape: Callable) -> None:
+        """Refresh a stale entry in the background (once per key at a time)"""
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+        self.revalidations += 1
+
+        def refresh():
+            try:
+                profile = scrape(linkedin_url)
+                if profile:
+                    self.set(key, profile)
+            except Exception as e:
+                print(f"Error revalidating scraped profile {key}: {e}")
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=refresh, name="scrape-revalidate", daemon=True).start()
+
+    def invalidate(self, linkedin_url: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM scrape_cache WHERE key = ?", (canonical_profile_url(linkedin_url),))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM scrape_cache").fetchone()[0]
+        return {
+            "enabled": True,
+            "entries": entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations
+        }
+
+# Create a singleton instance
+scrape_cache = ScrapeCache(
+    settings.scrape_cache_path,
+    ttl_seconds=settings.scrape_cache_ttl_seconds,
+    stale_seconds=settings.scrape_cache_stale_seconds,
+    max_entries=settings.scrape_cache_max_entries
+) if settings.scrape_cache_enabled else None
@@ -0,0 +1,144 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, List, Tuple
+
+from app.services.scrape_cache import canonical_profile_url
+
+# Dataset item fields the actor may echo the profile URL in
+ITEM_URL_FIELDS = ["linkedinUrl", "profileUrl", "inputUrl", "url", "publicProfileUrl"]
+
+def item_profile_key(item: Dict[str, Any]) -> Optional[str]:
+    """Canonical profile URL of a dataset item, if it names one"""
+    for field in ITEM_URL_FIELDS:
+        value = item.get(field)
+        if isinstance(value, str) and "linkedin.com" in value.lower():
+            return canonical_profile_url(value)
+    if item.get("publicIdentifier"):
+        return canonical_profile_url(f"linkedin.com/in/{item['publicIdentifier']}")
+    return None
+
+def match_items(keys: List[str], items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Assign dataset items to the requested profile keys.
+
+    Items are matched on the URL they echo back; if exactly one request and
+    one item are left over (actors don't always echo the URL), they are paired.
+    """
+    matched: Dict[str, Dict[str, Any]] = {}
+    leftover = []
+    for item in items:
+        key = item_profile_key(item)
+        if key in keys and key not in matched:
+            matched[key] = item
+        else:
+            leftover.append(item)
+
+    unmatched = [key for key in keys if key not in matched]
+    if len(unmatched) == 1 and len(leftover) == 1:
+        matched[unmatched[0]] = leftover[0]
+    return matched
+
+class ScrapeCoordinator:
+    """Coalesces concurrent profile scrapes into multi-URL actor runs.
+
+    Requests for the same profile (by canonical URL) that overlap share one
+    future. New URLs wait up to ``window_seconds`` for others to arrive and
+    go out together, up to ``max_batch`` per actor run, with at most
+    ``max_concurrent_runs`` runs at a time. Each caller gets its own raw
+    dataset item back, or None when the run failed or didn't return it.
+    ``on_item(url, item)`` is called once per item an actor run returned, however
+    many callers shared it.
+    """
+
+    def __init__(self, run_actor: Callable[[List[str]], List[Dict[str, Any]]], window_seconds: float,
+                 max_batch: int, max_concurrent_runs: int,
+                 on_item: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self._run_actor = run_actor
+        self._on_item = on_item
+        self.window_seconds = window_seconds
+        self.max_batch = max(1, max_batch)
+
+        self._lock = threading.Lock()
+        self._arrived = threading.Condition(self._lock)
+        self._in_flight: Dict[str, Future] = {}
+        self._pending: List[Tuple[str, str]] = []
+        self._runs = ThreadPoolExecutor(max_workers=max(1, max_concurrent_runs), thread_name_prefix="apify-run")
+        self._dispatcher: Optional[threading.Thread] = None
+
+        self.requests = 0
+        self.coalesced = 0
+        self.actor_runs = 0
+        self.batched_urls = 0
+
+    def scrape(self, linkedin_url: str) -> Optional[Dict[str, Any]]:
+        """Raw dataset item for a profile URL (blocks until its actor run finishes)"""
+        return self.submit(linkedin_url).result()
+
+    def submit(self, linkedin_url: str) -> Future:
+        key = canonical_profile_url(linkedin_url)
+        with self._lock:
+            self.requests += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+
+            future = Future()
+            self._in_flight[key] = future
+            self._pending.append((key, linkedin_url))
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name="scrape-coordinator", daemon=True)
+                self._dispatcher.start()
+            self._arrived.notify()
+        return future
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._arrived.wait()
+                deadline = time.monotonic() + self.window_seconds
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._arrived.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+            self._runs.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[str, str]]) -> None:
+        keys = [key for key, _ in batch]
+        matched: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            self.actor_runs += 1
+            self.batched_urls += len(batch)
+        try:
+            items = self._run_actor([url for _, url in batch])
+            matched = match_items(keys, items)
+        except Exception as e:
+            print(f"Error in batched actor run for {len(batch)} profile(s): {e}")
+
+        if self._on_item:
+            for key, url in batch:
+                if matched.get(key):
+                    try:
+                        self._on_item(url, matched[key])
+                    except Exception as e:
+                        print(f"Error handling scraped item for {url}: {e}")
+
+        for key in keys:
+            with self._lock:
+                future = self._in_flight.pop(key)
+            future.set_result(matched.get(key))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "actor_runs": self.actor_runs,
+                "avg_batch": round(self.batched_urls / self.actor_runs, 2) if self.actor_runs else 0,
+                "pending": len(self._pending),
+                "in_flight": len(self._in_flight)
+            }
@@ -0,0 +1,117 @@
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any
+
+from app.config import settings
+from app.services.firebase_service import firebase_service
+from app.services.linkedin_scraper import linkedin_scraper
+from app.services.tracing import tracer
+
+# Profile enrichment states stored on the profile document as ``profile_status``
+PROFILE_PENDING = "pending"
+PROFILE_READY = "ready"
+PROFILE_FAILED = "failed"
+
+class ScrapeQueueFull(Exception):
+    """Raised when the scrape backlog is at capacity"""
+
+def pending_expired(profile: Dict[str, Any], timeout_seconds: int) -> bool:
+    """True when a pending scrape was started too long ago to still be running.
+
+    The job queue is in-process, so jobs queued or running when a worker
+    restarts are lost and their sessions would otherwise stay pending forever.
+    """
+    started_at = profile.get("scrape_started_at")
+    if not isinstance(started_at, datetime):
+        return False
+    now = datetime.now(timezone.utc) if started_at.tzinfo else datetime.utcnow()
+    return (now - started_at).total_seconds() > timeout_seconds
+
+class ScrapeJobQueue:
+    """Background LinkedIn scrape worker with its own concurrency cap.
+
+    ``/start_session`` creates the session with ``profile_status: pending`` and
+    submits a job here; a worker runs the Apify actor and writes the profile to
+    Firestore when it completes. The status lives on the profile document, so
+    any API worker can answer status requests (see ``pending_expired`` for
+    jobs lost in a restart).
+    """
+
+    def __init__(self, concurrency: int, max_pending: int):
+        self.concurrency = max(1, concurrency)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending))
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def _ensure_workers(self) -> None:
+        """Start the worker threads on first use"""
+        if self._workers:
+            return
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.concurrency):
+                worker = threading.Thread(target=self._work, name=f"scrape-job-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(self, session_id: str, linkedin_url: str) -> None:
+        """Queue a scrape for a session; raises ScrapeQueueFull if the backlog is full"""
+        self._ensure_workers()
+        try:
+            # The job continues the submitting request's trace
+            self._queue.put_nowait((session_id, linkedin_url, tracer.current_context()))
+        except queue.Full:
+            raise ScrapeQueueFull(f"Scrape backlog full ({self._queue.maxsize} pending)")
+
+    def pending(self) -> int:
+        """Jobs queued and not yet picked up by a worker"""
+        return self._queue.qsize()
+
+    def _work(self) -> None:
+        while True:
+            session_id, linkedin_url, trace_parent = self._queue.get()
+            try:
+                with tracer.span("scrape_job", {"session_id": session_id}, parent=trace_parent):
+                    self._run_job(session_id, linkedin_url)
+            except Exception as e:
+                # Never let one job take the worker thread down with it
+                print(f"Scrape worker error for session {session_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, session_id: str, linkedin_url: str) -> None:
+        status = PROFILE_FAILED
+        try:
+            print(f"Scraping LinkedIn profile: {linkedin_url}")
+            profile_data = linkedin_scraper.scrape_profile(linkedin_url)
+
+            if profile_data:
+                status = PROFILE_READY
+                updates = dict(profile_data)
+            else:
+                updates = {}
+            updates["profile_status"] = status
+            firebase_service.update_user_profile(session_id, updates)
+            tracer.set_attribute("profile_status", status)
+
+        except Exception as e:
+            print(f"Error in scrape job for session {session_id}: {e}")
+            try:
+                firebase_service.update_user_profile(session_id, {"profile_status": PROFILE_FAILED})
+            except Exception as e:
+                # The session is reported failed once its scrape_started_at expires
+                print(f"Error marking scrape failed for session {session_id}: {e}")
+
+# With batching, job workers mostly wait on shared actor runs, so there are
+# enough of them to fill every concurrent run
+_job_workers = settings.scraper_max_workers
+if settings.scrape_batch_enabled:
+    _job_workers *= max(1, settings.scrape_batch_max_urls)
+
+# Create a singleton instance
+scrape_jobs = ScrapeJobQueue(
+    concurrency=_job_workers,
+    max_pending=settings.scrape_job_queue_size
+)
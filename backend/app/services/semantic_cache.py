@@ -0,0 +1,167 @@
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from app.config import settings
+from app.services.llm_cache import llm_cache
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+# 2^20 hashed features keeps collisions negligible for short texts
+NUM_FEATURES = 1 << 20
+
+def vectorize(text: str) -> Dict[int, float]:
+    """L2-normalized hashing vector of word unigrams and bigrams (sublinear tf).
+
+    CPU-only and stateless, so every worker maps the same text to the same
+    vector without a fitted vocabulary or a network embedding model.
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    counts: Dict[int, int] = {}
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        index = int.from_bytes(digest, "little") % NUM_FEATURES
+        counts[index] = counts.get(index, 0) + 1
+
+    vector = {index: 1.0 + math.log(count) for index, count in counts.items()}
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    if not norm:
+        return {}
+    return {index: weight / norm for index, weight in vector.items()}
+
+class SemanticCache:
+    """Similarity-keyed cache for LLM results on near-duplicate inputs.
+
+    Entries are looked up by cosine similarity between hashing vectors,
+    scored through an inverted index (feature -> entries) so only entries
+    sharing at least one feature with the query are touched. ``namespace``
+    scopes a lookup to entries that must match exactly on other inputs (e.g.
+    the user profile). The cache is bounded to ``max_entries`` with LRU
+    eviction and entries expire after ``ttl_seconds``.
+    """
+
+    def __init__(self, name: str, threshold: float, max_entries: int, ttl_seconds: int):
+        self.name = name
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[str, Dict[int, float], Any, float]]" = OrderedDict()
+        self._postings: Dict[int, Dict[int, float]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, text: str, namespace: str = "") -> Optional[Any]:
+        """Return the value of the most similar live entry at or above the threshold"""
+        if llm_cache.is_bypassed():
+            return None
+
+        vector = vectorize(text)
+        if not vector:
+            return None
+
+        now = time.time()
+        with self._lock:
+            scores: Dict[int, float] = {}
+            for index, weight in vector.items():
+                for entry_id, entry_weight in self._postings.get(index, {}).items():
+                    scores[entry_id] = scores.get(entry_id, 0.0) + weight * entry_weight
+
+            best_id, best_score = None, 0.0
+            for entry_id, score in scores.items():
+                if score < self.threshold or score <= best_score:
+                    continue
+                entry_namespace, _, _, expires_at = self._entries[entry_id]
+                if entry_namespace != namespace:
+                    continue
+                if expires_at < now:
+                    self._remove(entry_id)
+                    continue
+                best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(best_id)
+            return self._entries[best_id][2]
+
+    def set(self, text: str, value: Any, namespace: str = "") -> None:
+        vector = vectorize(text)
+        if not vector:
+            return
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (namespace, vector, value, time.time() + self.ttl_seconds)
+            for index, weight in vector.items():
+                self._postings.setdefault(index, {})[entry_id] = weight
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def _remove(self, entry_id: int) -> None:
+        _, vector, _, _ = self._entries.pop(entry_id)
+        for index in vector:
+            posting = self._postings.get(index)
+            if posting is None:
+                continue
+            posting.pop(entry_id, None)
+            if not posting:
+                del self._postings[index]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "features": len(self._postings),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "threshold": self.threshold
+            }
+
+def fingerprint(*parts: str) -> str:
+    """Exact-match namespace for the inputs a similarity lookup must not blur"""
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+def semantic_cache_stats() -> Dict[str, Any]:
+    return {
+        "enabled": settings.semantic_cache_enabled,
+        "router": router_cache.stats(),
+        "job_fit": job_fit_cache.stats()
+    }
+
+# Short routing queries tolerate looser matches than job descriptions,
+# where a changed requirement line should change the analysis
+router_cache = SemanticCache(
+    "router",
+    threshold=settings.semantic_cache_router_threshold,
+    max_entries=settings.semantic_cache_max_entries,
+    ttl_seconds=settings.semantic_cache_ttl_seconds
+)
+job_fit_cache = SemanticCache(
+    "job_fit",
+    threshold=settings.semantic_cache_job_fit_threshold,
+    max_entries=settings.semantic_cache_max_entries,
+    ttl_seconds=settings.semantic_cache_ttl_seconds
+)
@@ -0,0 +1,199 @@
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.skill_taxonomy import (
+    SKILL_TAXONOMY, UNMATCHED_CANONICALS, PREFERRED_SECTION_MARKERS, REQUIRED_SECTION_MARKERS
+)
+
+# Credit for a JD skill the profile only evidences in experience/headline/about
+EXPERIENCE_CREDIT = 0.6
+
+# Weight of a "nice to have" skill relative to a required one
+PREFERRED_WEIGHT = 0.5
+
+# Below this many JD skills the local score isn't meaningful
+MIN_JD_SKILLS = 3
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char in "+#"
+
+class SkillMatcher:
+    """Aho-Corasick matcher over the skill taxonomy.
+
+    All aliases are compiled into one automaton, so a posting is scanned once
+    regardless of taxonomy size. Matches must sit on word boundaries, and
+    overlapping matches resolve to the longest ("react native" over "react").
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+        # A profile skill entry that is exactly a canonical name counts, even
+        # for names too ambiguous to match in running text ("Go", "Excel")
+        self._canonical_names = {canonical.lower(): canonical for canonical in taxonomy}
+
+        for canonical, aliases in taxonomy.items():
+            patterns = set(alias.lower() for alias in aliases)
+            if canonical not in UNMATCHED_CANONICALS:
+                patterns.add(canonical.lower())
+            for pattern in patterns:
+                self._add_pattern(pattern, canonical)
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str, canonical: str) -> None:
+        state = 0
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].append((len(pattern), canonical))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """Non-overlapping ``(start, end, canonical)`` matches, longest first"""
+        text = text.lower()
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, canonical in self._output[state]:
+                start, end = index - length + 1, index + 1
+                if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                    continue
+                if end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+                    continue
+                matches.append((start, end, canonical))
+
+        matches.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        selected = []
+        last_end = -1
+        for start, end, canonical in matches:
+            if start >= last_end:
+                selected.append((start, end, canonical))
+                last_end = end
+        return selected
+
+    def extract(self, text: str) -> List[str]:
+        """Distinct canonical skills in order of first mention"""
+        seen = []
+        for _, _, canonical in self.find(text or ""):
+            if canonical not in seen:
+                seen.append(canonical)
+        return seen
+
+    def extract_job_skills(self, job_description: str) -> Dict[str, float]:
+        """Canonical JD skills with weights: required 1.0, "nice to have" PREFERRED_WEIGHT"""
+        weights: Dict[str, float] = {}
+        section_weight = 1.0
+        for line in job_description.splitlines():
+            lower = line.strip().lower()
+            weight = section_weight
+            if any(marker in lower for marker in PREFERRED_SECTION_MARKERS):
+                weight = PREFERRED_WEIGHT
+            elif any(marker in lower for marker in REQUIRED_SECTION_MARKERS):
+                weight = 1.0
+
+            # A heading ("Nice to have:") switches the section for the lines that
+            # follow; an inline "Kafka is a plus" only affects its own line
+            if lower.endswith(":") or len(lower.split()) <= 4:
+                section_weight = weight
+
+            for canonical in self.extract(line):
+                weights[canonical] = max(weights.get(canonical, 0.0), weight)
+        return weights
+
+    def profile_skills(self, profile_data: Dict[str, Any]) -> Tuple[set, set]:
+        """Canonical skills listed on the profile, and those only evidenced elsewhere"""
+        listed = set()
+        for skill in profile_data.get("skills") or []:
+            exact = self._canonical_names.get(str(skill).strip().lower())
+            if exact:
+                listed.add(exact)
+            listed.update(self.extract(str(skill)))
+
+        evidence = [profile_data.get("headline") or "", profile_data.get("about") or ""]
+        for exp in profile_data.get("experience") or []:
+            if isinstance(exp, dict):
+                evidence.extend([exp.get("title") or "", exp.get("description") or ""])
+        evidenced = set(self.extract("\n".join(evidence))) - listed
+        return listed, evidenced
+
+    def score(self, job_description: str, profile_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Deterministic fit score, or None when the JD names too few known skills"""
+        started = time.perf_counter()
+        result = self.score_many([job_description], profile_data)[0]
+        if result is not None:
+            result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return result
+
+    def score_many(self, job_descriptions: List[str], profile_data: Dict[str, Any]) -> List[Optional[Dict[str, Any]]]:
+        """Score one profile against many postings at once.
+
+        Postings become rows of a (posting x skill) weight matrix and the
+        profile a credit vector over the same skills (1.0 listed,
+        EXPERIENCE_CREDIT evidenced), so every score is one matrix-vector product.
+        """
+        job_skills = [self.extract_job_skills(jd) for jd in job_descriptions]
+        columns: Dict[str, int] = {}
+        for skills in job_skills:
+            for skill in skills:
+                columns.setdefault(skill, len(columns))
+
+        listed, evidenced = self.profile_skills(profile_data)
+        credit = np.zeros(len(columns), dtype=np.float64)
+        for skill, column in columns.items():
+            if skill in listed:
+                credit[column] = 1.0
+            elif skill in evidenced:
+                credit[column] = EXPERIENCE_CREDIT
+
+        weights = np.zeros((len(job_skills), len(columns)), dtype=np.float64)
+        for row, skills in enumerate(job_skills):
+            for skill, weight in skills.items():
+                weights[row, columns[skill]] = weight
+
+        totals = weights.sum(axis=1)
+        scores = np.rint(100 * (weights @ credit) / np.maximum(totals, 1e-9)).astype(int)
+
+        results: List[Optional[Dict[str, Any]]] = []
+        for row, skills in enumerate(job_skills):
+            if len(skills) < MIN_JD_SKILLS:
+                results.append(None)
+                continue
+            # Required gaps first, then "nice to have" ones, each in order of mention
+            missing = sorted(
+                ((skill, weight) for skill, weight in skills.items() if skill not in listed and skill not in evidenced),
+                key=lambda m: -m[1]
+            )
+            results.append({
+                "score": int(scores[row]),
+                "matched_skills": [skill for skill in skills if skill in listed],
+                "experience_only_skills": [skill for skill in skills if skill in evidenced],
+                "missing_skills": [skill for skill, _ in missing],
+                "required_missing": [skill for skill, weight in missing if weight == 1.0],
+                "job_skills": list(skills)
+            })
+        return results
+
+# Compiled once at import
+skill_matcher = SkillMatcher(SKILL_TAXONOMY)
@@ -0,0 +1,133 @@
+# Canonical skill -> aliases as they appear in postings and profiles (matched
+# case-insensitively on word boundaries). The canonical name is matched too,
+# except for UNMATCHED_CANONICALS. Avoid aliases that are common English words
+# or generic terms ("rest", "node", "containers", "monitoring", "analytics") -
+# they would turn prose into false skill hits.
+SKILL_TAXONOMY = {
+    # Languages
+    "Python": ["python3", "py"],
+    "Java": ["java 8", "java 11", "java 17", "core java"],
+    "JavaScript": ["js", "javascript es6", "es6", "ecmascript"],
+    "TypeScript": ["ts"],
+    "Go": ["golang", "go lang"],
+    "Rust": [],
+    "C++": ["cpp", "c plus plus"],
+    "C#": ["c sharp", "csharp"],
+    "Ruby": [],
+    "PHP": [],
+    "Kotlin": [],
+    "Swift": ["swiftui", "swift ui"],
+    "Scala": [],
+    "R": ["r programming", "r language", "rstudio"],
+    "SQL": ["t-sql", "tsql", "pl/sql", "plsql", "structured query language"],
+    "Bash": ["shell scripting", "shell script", "bash scripting"],
+
+    # Frontend
+    "React": ["react.js", "reactjs", "react js"],
+    "Angular": ["angularjs", "angular.js"],
+    "Vue.js": ["vue", "vuejs", "vue js"],
+    "Next.js": ["nextjs", "next js"],
+    "HTML": ["html5"],
+    "CSS": ["css3", "sass", "scss", "tailwind", "tailwindcss"],
+    "Redux": [],
+
+    # Backend
+    "Node.js": ["nodejs", "node js"],
+    "Express": ["express.js", "expressjs"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": ["fast api"],
+    "Spring": ["spring boot", "springboot", "spring framework"],
+    ".NET": ["dotnet", "asp.net", ".net core"],
+    "Ruby on Rails": ["ror"],
+    "GraphQL": [],
+    "REST APIs": ["restful", "rest api", "restful apis", "restful api"],
+    "gRPC": [],
+    "Microservices": ["microservice", "micro-services", "microservice architecture"],
+
+    # Data stores
+    "PostgreSQL": ["postgres", "postgresql", "psql"],
+    "MySQL": [],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search", "opensearch"],
+    "Cassandra": [],
+    "DynamoDB": ["dynamo db"],
+    "Firestore": ["firebase", "cloud firestore"],
+    "Snowflake": [],
+    "BigQuery": ["big query"],
+
+    # Cloud & infrastructure
+    "AWS": ["amazon web services", "ec2", "s3", "aws lambda"],
+    "GCP": ["google cloud", "google cloud platform"],
+    "Azure": ["microsoft azure"],
+    "Docker": ["dockerfile", "docker compose", "docker-compose"],
+    "Kubernetes": ["k8s", "eks", "gke", "aks"],
+    "Terraform": ["infrastructure as code", "iac"],
+    "Ansible": [],
+    "CI/CD": ["ci cd", "continuous integration", "continuous delivery", "continuous deployment",
+              "github actions", "jenkins", "gitlab ci", "circleci"],
+    "Linux": ["unix"],
+    "Git": ["github", "gitlab", "version control"],
+    "Kafka": ["apache kafka"],
+    "RabbitMQ": ["rabbit mq"],
+    "Observability": ["prometheus", "grafana", "datadog", "opentelemetry"],
+
+    # Data & ML
+    "Machine Learning": ["ml", "machine-learning"],
+    "Deep Learning": ["neural networks", "deep neural networks"],
+    "NLP": ["natural language processing"],
+    "Computer Vision": ["opencv", "image recognition"],
+    "LLMs": ["llm", "large language models", "large language model", "generative ai", "genai", "gen ai"],
+    "LangChain": ["langgraph"],
+    "PyTorch": ["torch"],
+    "TensorFlow": ["keras"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "Pandas": [],
+    "NumPy": ["numpy"],
+    "Spark": ["apache spark", "pyspark"],
+    "Airflow": ["apache airflow"],
+    "dbt": [],
+    "Data Analysis": ["data analytics"],
+    "Data Engineering": ["etl", "elt", "data pipelines", "data pipeline"],
+    "Statistics": ["statistical analysis", "statistical modeling", "a/b testing"],
+    "Tableau": [],
+    "Power BI": ["powerbi"],
+    "Excel": ["microsoft excel", "spreadsheets"],
+
+    # Mobile
+    "iOS": ["ios development"],
+    "Android": ["android development"],
+    "React Native": ["react-native"],
+    "Flutter": ["dart"],
+
+    # Practices & product
+    "Testing": ["unit testing", "test automation", "tdd", "pytest", "jest", "selenium", "cypress"],
+    "System Design": ["distributed systems", "scalable systems", "software architecture"],
+    "Security": ["cybersecurity", "application security", "oauth", "owasp"],
+    "Agile": ["scrum", "kanban", "agile methodologies"],
+    "Product Management": ["product manager", "product roadmap", "roadmapping"],
+    "Project Management": ["project manager", "pmp"],
+    "UX Design": ["ux", "ui/ux", "user experience", "figma", "user research"],
+
+    # Soft skills
+    "Leadership": ["team lead", "tech lead", "people management", "mentoring", "mentorship"],
+    "Communication": ["communication skills", "written communication", "verbal communication"],
+    "Stakeholder Management": ["stakeholder communication", "cross-functional collaboration", "cross-functional"],
+}
+
+# Canonical names too ambiguous to match on their own ("go", "spring 2025",
+# "express interest", "you will excel", "job security"); only their aliases are matched
+UNMATCHED_CANONICALS = {"Go", "R", "Swift", "Spring", "Express", "Excel", "Security"}
+
+# Lines starting a "nice to have" block; their skills count for less
+PREFERRED_SECTION_MARKERS = [
+    "preferred", "nice to have", "nice-to-have", "bonus", "a plus", "is a plus",
+    "would be great", "desirable", "good to have"
+]
+
+# Lines starting a "must have" block
+REQUIRED_SECTION_MARKERS = [
+    "required", "requirements", "must have", "must-have", "qualifications",
+    "what you'll need", "what you will need", "you have", "responsibilities"
+]
@@ -0,0 +1,489 @@
+import asyncio
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import socket
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, NamedTuple, Optional, Union
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+from app.config import settings
+
+# Identifies the process that produced a span
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# LangGraph tags its own plumbing runs (channel writes, branches) with this
+LANGGRAPH_HIDDEN_TAG = "langsmith:hidden"
+
+class SpanContext(NamedTuple):
+    """Identity of a span, as carried across threads, queues and ``traceparent`` headers"""
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+class Span:
+    """A timed operation within a trace; ended spans are handed to the exporter"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "_start",
+                 "duration_ns", "attributes", "error", "_tracer")
+
+    sampled = True
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Optional[Dict[str, Any]]):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = {k: v for k, v in attributes.items() if v is not None} if attributes else {}
+        self.error: Optional[str] = None
+        self.duration_ns: Optional[int] = None
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter_ns()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        if self.duration_ns is None:
+            self.duration_ns = time.perf_counter_ns() - self._start
+            self._tracer._export(self)
+
+    def context(self) -> SpanContext:
+        return SpanContext(self.trace_id, self.span_id, True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ns / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+            "worker": WORKER_ID
+        }
+
+class _NoopSpan:
+    """Stands in for every span of an unsampled trace; all operations are free"""
+
+    sampled = False
+    trace_id = span_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def context(self) -> SpanContext:
+        return SpanContext("", "", False)
+
+NOOP_SPAN = _NoopSpan()
+
+# Span the current code runs under; copied into worker threads by ``executors``
+_current_span: ContextVar[Optional[Union[Span, _NoopSpan]]] = ContextVar("trace_span", default=None)
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """Parse a W3C ``traceparent`` header (``00-<trace id>-<span id>-<flags>``)"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return SpanContext(parts[1], parts[2], bool(flags & 1))
+
+def format_traceparent(span: Span) -> str:
+    return f"00-{span.trace_id}-{span.span_id}-01"
+
+class JsonlSink:
+    """Appends spans as JSON lines to a local file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        # One append per batch, so lines from several workers don't interleave
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class OtlpHttpSink:
+    """Posts spans to an OpenTelemetry collector (OTLP/HTTP with JSON encoding)"""
+
+    def __init__(self, url: str, service_name: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self.resource = {"attributes": [
+            {"key": "service.name", "value": {"stringValue": service_name}},
+            {"key": "service.instance.id", "value": {"stringValue": WORKER_ID}}
+        ]}
+
+    def _encode(self, span: Span) -> Dict[str, Any]:
+        encoded = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.start_ns + span.duration_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+        }
+        if span.parent_id:
+            encoded["parentSpanId"] = span.parent_id
+        return encoded
+
+    def write(self, spans: List[Span]) -> None:
+        body = json.dumps({"resourceSpans": [{
+            "resource": self.resource,
+            "scopeSpans": [{"scope": {"name": "careercoach"}, "spans": [self._encode(s) for s in spans]}]
+        }]}).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+class SpanExporter:
+    """Buffers ended spans and writes them to the sink in batches from one thread.
+
+    Spans are dropped (and counted) when the buffer is full, so a slow or
+    unreachable sink never blocks request handling.
+    """
+
+    def __init__(self, sink, max_queue: int, batch_size: int = 512, interval: float = 1.0):
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max(1, max_queue))
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._idle = threading.Event()
+        self._idle.set()
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._worker.start()
+
+    def export(self, span: Span) -> None:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(span)
+            self._idle.clear()
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.interval)]
+            except queue.Empty:
+                self._idle.set()
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.sink.write(batch)
+                with self._lock:
+                    self.exported += len(batch)
+            except Exception as e:
+                with self._lock:
+                    self.failed += len(batch)
+                print(f"Trace export failed ({len(batch)} spans): {e}")
+            if self._queue.empty():
+                self._idle.set()
+
+    def flush(self, timeout: float) -> bool:
+        """Wait until buffered spans are written; False on timeout"""
+        if self._worker is None:
+            return True
+        return self._idle.wait(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "exported": self.exported,
+                "dropped": self.dropped,
+                "failed": self.failed
+            }
+
+class Tracer:
+    """Head-sampled spans with the current span carried in a context variable.
+
+    The sampling decision is made once, when a trace starts (a request, or a
+    background job without a parent), and inherited by every span below it.
+    Unsampled traces run under ``NOOP_SPAN``, so instrumented code pays only a
+    context variable lookup. Incoming ``traceparent`` headers continue the
+    caller's trace and keep its decision.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter], sample_rate: float):
+        self.exporter = exporter
+        self.sample_rate = sample_rate if exporter is not None else 0.0
+        self.started = 0
+        self.sampled = 0
+        self._lock = threading.Lock()
+
+    def _sample(self) -> bool:
+        sampled = self.sample_rate > 0 and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+        with self._lock:
+            self.started += 1
+            if sampled:
+                self.sampled += 1
+        return sampled
+
+    def current_span(self) -> Optional[Union[Span, _NoopSpan]]:
+        return _current_span.get()
+
+    def current_context(self) -> Optional[SpanContext]:
+        """Context to hand to work that continues on another thread or queue"""
+        span = _current_span.get()
+        return span.context() if span is not None else None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute on the current span, if any"""
+        span = _current_span.get()
+        if span is not None:
+            span.set_attribute(key, value)
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   parent: Optional[Union[Span, _NoopSpan, SpanContext]] = None) -> Union[Span, _NoopSpan]:
+        """Start a span under ``parent`` (default: the current span); a new trace if there is none"""
+        if parent is None:
+            parent = _current_span.get()
+        if parent is None:
+            if not self._sample():
+                return NOOP_SPAN
+            return Span(self, name, os.urandom(16).hex(), None, attributes)
+        if not parent.sampled or self.exporter is None:
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    def activate(self, span: Union[Span, _NoopSpan]):
+        """Make ``span`` current; returns a token for ``deactivate``"""
+        token = _current_span.set(span)
+        if span.sampled and _langchain_handler.get() is None:
+            # Entering a sampled trace: let LangChain report chain and model runs into it
+            return token, _langchain_handler.set(langchain_tracer)
+        return token, None
+
+    def deactivate(self, tokens) -> None:
+        token, handler_token = tokens
+        if handler_token is not None:
+            _langchain_handler.reset(handler_token)
+        _current_span.reset(token)
+
+    @contextmanager
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+             parent: Optional[Union[Span, _NoopSpan, SpanContext]] = None):
+        span = self.start_span(name, attributes, parent)
+        if span is NOOP_SPAN and _current_span.get() is NOOP_SPAN:
+            # Inside an unsampled trace: nothing to record or activate
+            yield span
+            return
+        tokens = self.activate(span)
+        try:
+            yield span
+        except Exception as e:
+            span.record_error(e)
+            raise
+        finally:
+            self.deactivate(tokens)
+            span.end()
+
+    def traced(self, name: str, *arg_names: str):
+        """Decorator running each call (sync or async) in a span.
+
+        ``arg_names`` are parameters recorded as span attributes, e.g.
+        ``traced("firestore.get_user_profile", "session_id")``.
+        """
+        def decorator(func):
+            signature = inspect.signature(func)
+
+            def attributes(args, kwargs) -> Optional[Dict[str, Any]]:
+                if not arg_names:
+                    return None
+                try:
+                    bound = signature.bind_partial(*args, **kwargs).arguments
+                except TypeError:
+                    return None
+                return {arg: bound.get(arg) for arg in arg_names}
+
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if _current_span.get() is NOOP_SPAN:
+                        return await func(*args, **kwargs)
+                    with self.span(name, attributes(args, kwargs)):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if _current_span.get() is NOOP_SPAN:
+                    return func(*args, **kwargs)
+                with self.span(name, attributes(args, kwargs)):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _export(self, span: Span) -> None:
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        return self.exporter.flush(timeout) if self.exporter is not None else True
+
+    def stats(self) -> Dict[str, Any]:
+        if self.exporter is None:
+            return {"enabled": False}
+        with self._lock:
+            started, sampled = self.started, self.sampled
+        return {
+            "enabled": True,
+            "sample_rate": self.sample_rate,
+            "traces_started": started,
+            "traces_sampled": sampled,
+            **self.exporter.stats()
+        }
+
+class LangChainTraceHandler(BaseCallbackHandler):
+    """Turns LangChain chain and chat model runs into spans.
+
+    Only active inside sampled traces (see ``Tracer.activate``). LangGraph's
+    own runs (the graph, its nodes and hidden plumbing) are skipped because the
+    orchestrator already spans every node; runs below them attach to the
+    current span, which is the node being executed.
+    """
+
+    # Cheap and thread-safe, so async runs call it inline instead of in an executor
+    run_inline = True
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+        # Shared by every run in the trace, including parallel branches on other threads
+        self._spans: Dict[UUID, Span] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, run_id: UUID) -> Optional[Span]:
+        with self._lock:
+            return self._spans.get(run_id)
+
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], name: str, attributes: Dict[str, Any]) -> None:
+        parent = self._get(parent_run_id) if parent_run_id else None
+        span = self.tracer.start_span(name, attributes, parent)
+        if span.sampled:
+            with self._lock:
+                self._spans[run_id] = span
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None) -> Optional[Span]:
+        with self._lock:
+            span = self._spans.pop(run_id, None)
+        if span is not None:
+            if error is not None:
+                span.record_error(error)
+            span.end()
+        return span
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                       tags: Optional[List[str]] = None, metadata: Optional[Dict[str, Any]] = None,
+                       **kwargs: Any) -> None:
+        metadata = metadata or {}
+        name = kwargs.get("name") or (serialized or {}).get("name") or "chain"
+        if (LANGGRAPH_HIDDEN_TAG in (tags or []) or name == "LangGraph"
+                or name == metadata.get("langgraph_node")):
+            return
+        self._start(run_id, parent_run_id, f"chain.{name}", {"node": metadata.get("langgraph_node")})
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                            metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        metadata = metadata or {}
+        params = kwargs.get("invocation_params") or {}
+        agent = metadata.get("agent") or metadata.get("langgraph_node")
+        self._start(run_id, parent_run_id, f"llm.{agent or 'chat'}", {
+            "agent": agent,
+            "model": params.get("model") or params.get("model_name")
+        })
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        span = self._get(run_id)
+        if span is not None:
+            # Imported here: llm_gateway -> llm_cache -> tracing would otherwise be circular
+            from app.services.llm_gateway import token_usage
+            prompt, completion = token_usage(response)
+            span.set_attribute("prompt_tokens", prompt)
+            span.set_attribute("completion_tokens", completion)
+        self._end(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+def _create_exporter() -> Optional[SpanExporter]:
+    if not settings.tracing_enabled:
+        return None
+    if settings.trace_exporter == "otlp":
+        sink = OtlpHttpSink(settings.trace_collector_url, settings.app_title)
+    else:
+        sink = JsonlSink(settings.trace_file_path)
+    return SpanExporter(sink, settings.trace_queue_size, interval=settings.trace_export_interval)
+
+# Create a singleton instance
+tracer = Tracer(_create_exporter(), settings.trace_sample_rate)
+langchain_tracer = LangChainTraceHandler(tracer)
+
+# LangChain adds the handler in this variable to every run started while it is set
+_langchain_handler: ContextVar[Optional[LangChainTraceHandler]] = ContextVar("trace_langchain_handler", default=None)
+register_configure_hook(_langchain_handler, inheritable=True)
@@ -0,0 +1,170 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from google.api_core import exceptions as google_exceptions
+
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_WRITES = 500
+
+# (apply(batch), on_commit or None)
+WriteOp = Tuple[Callable[[Any], None], Optional[Callable[[], None]]]
+
+# Errors that fail the same way on every attempt - a missing document, a bad
+# value, a rule violation - plus errors raised while building the batch
+PERMANENT_ERRORS = (
+    google_exceptions.NotFound,
+    google_exceptions.InvalidArgument,
+    google_exceptions.FailedPrecondition,
+    google_exceptions.PermissionDenied,
+    google_exceptions.AlreadyExists,
+    google_exceptions.Unauthenticated,
+    ValueError,
+    TypeError
+)
+
+class WriteBehindQueue:
+    """Buffers Firestore writes and commits them in batches off the request path.
+
+    Writes are queued as ``apply(batch)`` callables and committed by one
+    background thread as ``WriteBatch`` es of up to ``batch_size`` writes,
+    collected for at most ``flush_interval`` seconds. A failed commit is retried
+    with exponential backoff unless the error is permanent; a batch that still
+    fails is committed one write at a time, so one bad write only drops itself.
+    When the buffer is full the write is committed synchronously by the caller
+    instead, so back-pressure never drops data. ``flush`` drains the buffer on
+    shutdown.
+    """
+
+    def __init__(self, create_batch: Callable[[], Any], max_pending: int, batch_size: int,
+                 flush_interval: float, max_retries: int):
+        self._create_batch = create_batch
+        self._queue: "queue.Queue[WriteOp]" = queue.Queue(maxsize=max(1, max_pending))
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_WRITES))
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._stopped = False
+
+        self.enqueued = 0
+        self.committed = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed = 0
+        self.synchronous = 0
+
+        self._worker = threading.Thread(target=self._run, name="firestore-write-behind", daemon=True)
+        self._worker.start()
+
+    def submit(self, apply: Callable[[Any], None], on_commit: Optional[Callable[[], None]] = None) -> None:
+        """Queue a write; commits it inline if the buffer is full or the queue is stopped"""
+        with self._lock:
+            stopped = self._stopped
+            if not stopped:
+                self._in_flight += 1
+        if not stopped:
+            try:
+                self._queue.put_nowait((apply, on_commit))
+                self._count("enqueued")
+                return
+            except queue.Full:
+                self._done(1)
+
+        self._count("synchronous")
+        self._commit([(apply, on_commit)])
+
+    def _run(self) -> None:
+        while True:
+            ops = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(ops) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    ops.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._commit(ops)
+            finally:
+                self._done(len(ops))
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _commit(self, ops: List[WriteOp]) -> None:
+        error = self._commit_batch(ops, self.max_retries)
+        if error is None:
+            return
+        if len(ops) == 1:
+            self._count("failed")
+            print(f"Write-behind: dropping write: {error}")
+            return
+
+        print(f"Write-behind: batch of {len(ops)} writes failed ({error}), committing them one by one")
+        for op in ops:
+            error = self._commit_batch([op], 0)
+            if error is not None:
+                self._count("failed")
+                print(f"Write-behind: dropping write: {error}")
+
+    def _commit_batch(self, ops: List[WriteOp], max_retries: int) -> Optional[Exception]:
+        """Commit ``ops`` as one batch; returns the last error if it never succeeded"""
+        for attempt in range(max_retries + 1):
+            try:
+                batch = self._create_batch()
+                for apply, _ in ops:
+                    apply(batch)
+                batch.commit()
+                break
+            except Exception as e:
+                if attempt == max_retries or isinstance(e, PERMANENT_ERRORS):
+                    return e
+                self._count("retries")
+                delay = min(0.5 * (2 ** attempt), 10.0)
+                print(f"Write-behind commit failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+        with self._lock:
+            self.batches += 1
+            self.committed += len(ops)
+        for _, on_commit in ops:
+            if on_commit:
+                try:
+                    on_commit()
+                except Exception as e:
+                    print(f"Write-behind commit callback error: {e}")
+        return None
+
+    def _done(self, count: int) -> None:
+        with self._lock:
+            self._in_flight -= count
+            if self._in_flight <= 0:
+                self._idle.notify_all()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Stop accepting queued writes and wait until buffered ones are committed"""
+        with self._lock:
+            self._stopped = True
+            flushed = self._idle.wait_for(lambda: self._in_flight <= 0, timeout=timeout)
+        if not flushed:
+            print(f"Write-behind: {self._queue.qsize()} writes still pending after {timeout}s")
+        return flushed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "enqueued": self.enqueued,
+                "committed": self.committed,
+                "batches": self.batches,
+                "retries": self.retries,
+                "failed": self.failed,
+                "synchronous": self.synchronous
+            }
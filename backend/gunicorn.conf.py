@@ -0,0 +1,27 @@
+"""
+Gunicorn configuration for running the backend with several Uvicorn workers.
+
+    cd backend && gunicorn app.main:app -c gunicorn.conf.py
+
+Interrupted conversations are resumed from the LangGraph checkpointer, so with
+more than one worker CHECKPOINTER_BACKEND must be a store every worker can see:
+``firestore`` (any number of instances) or ``sqlite`` (workers on one host).
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# LLM turns and SSE streams can run for tens of seconds
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog = "-"
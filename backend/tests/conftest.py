@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import the backend as ``app``, the way run.py does
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Agent modules build their chat models at import; no request is ever sent
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
@@ -0,0 +1,105 @@
+import firebase_admin
+from firebase_admin import credentials
+from google.auth.credentials import AnonymousCredentials
+
+from app.config import settings
+from app.services.write_behind import WriteBehindQueue
+
+class OfflineCredential(credentials.Base):
+    def get_credential(self):
+        return AnonymousCredentials()
+
+# Importing the service creates its singleton client; keep it offline
+if not firebase_admin._apps:
+    firebase_admin.initialize_app(OfflineCredential(), {"projectId": "test"})
+
+from app.services.firebase_service import FirebaseService
+
+class FakeDocument:
+    def __init__(self, db, path):
+        self.db = db
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def collection(self, name):
+        return FakeCollection(self.db, f"{self.path}/{name}")
+
+    def set(self, data):
+        self.db.inline_writes.append(self.path)
+        self.db.documents[self.path] = data
+
+class FakeCollection:
+    def __init__(self, db, path):
+        self.db = db
+        self.path = path
+
+    def document(self, doc_id=None):
+        if doc_id is None:
+            self.db.next_id += 1
+            doc_id = f"turn-{self.db.next_id}"
+        return FakeDocument(self.db, f"{self.path}/{doc_id}")
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.ops = []
+
+    def set(self, doc_ref, data):
+        self.ops.append((doc_ref.path, data))
+
+    def commit(self):
+        self.db.documents.update(self.ops)
+
+class FakeFirestore:
+    def __init__(self):
+        self.documents = {}
+        self.inline_writes = []
+        self.next_id = 0
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+def make_service(db, write_behind):
+    service = FirebaseService.__new__(FirebaseService)
+    service.db = db
+    service.write_behind = WriteBehindQueue(db.batch, max_pending=10, batch_size=10,
+                                            flush_interval=0.05, max_retries=0) if write_behind else None
+    service.windows = []
+    service._append_to_window = lambda session_id, history_ref, doc_ref, chat_data: \
+        service.windows.append((session_id, doc_ref.id))
+    return service
+
+def test_archive_goes_through_write_behind(monkeypatch):
+    monkeypatch.setattr(settings, "chat_window_size", 20)
+    db = FakeFirestore()
+    service = make_service(db, write_behind=True)
+
+    assert service.add_chat_history("s1", "hi", "hello", "career_path")
+    assert service.windows == [("s1", "turn-1")]
+    assert db.inline_writes == []
+
+    assert service.write_behind.flush(timeout=5)
+    assert db.documents["users/s1/chat_history/turn-1"]["response"] == "hello"
+    assert service.write_behind.stats()["committed"] == 1
+
+def test_archive_is_written_inline_without_the_queue(monkeypatch):
+    monkeypatch.setattr(settings, "chat_window_size", 20)
+    db = FakeFirestore()
+    service = make_service(db, write_behind=False)
+
+    assert service.add_chat_history("s1", "hi", "hello", "career_path")
+    assert service.windows == [("s1", "turn-1")]
+    assert db.inline_writes == ["users/s1/chat_history/turn-1"]
+
+def test_archive_is_written_inline_without_the_window(monkeypatch):
+    monkeypatch.setattr(settings, "chat_window_size", 0)
+    db = FakeFirestore()
+    service = make_service(db, write_behind=True)
+
+    assert service.add_chat_history("s1", "hi", "hello", "career_path")
+    assert service.windows == []
+    assert db.inline_writes == ["users/s1/chat_history/turn-1"]
+    assert service.write_behind.stats()["enqueued"] == 0
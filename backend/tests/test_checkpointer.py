@@ -0,0 +1,106 @@
+import time
+from types import SimpleNamespace
+
+from app.services.checkpointer import FirestoreThreadStore, MemoryThreadStore, SqliteThreadStore, TTLCheckpointSaver
+
+def make_saver(store, ttl_seconds=3600, max_checkpoints=2):
+    return TTLCheckpointSaver(store, ttl_seconds=ttl_seconds, max_checkpoints=max_checkpoints, cache_size=10)
+
+def put_checkpoints(saver, thread_id, count):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    for i in range(count):
+        checkpoint = {"id": f"checkpoint-{i:03d}", "channel_values": {"step": i}}
+        config = saver.put(config, checkpoint, {"step": i}, {})
+        saver.put_writes(config, [("messages", f"write-{i}")], task_id="task")
+    return config
+
+def thread_config(thread_id):
+    return {"configurable": {"thread_id": thread_id}}
+
+def test_keeps_only_the_newest_checkpoints():
+    saver = make_saver(MemoryThreadStore(max_threads=10), max_checkpoints=2)
+    put_checkpoints(saver, "t", 5)
+
+    ids = [item.checkpoint["id"] for item in saver.list(thread_config("t"))]
+    assert ids == ["checkpoint-004", "checkpoint-003"]
+
+    latest = saver.get_tuple(thread_config("t"))
+    assert latest.checkpoint["channel_values"] == {"step": 4}
+    assert latest.pending_writes == [("task", "messages", "write-4")]
+    assert latest.parent_config["configurable"]["checkpoint_id"] == "checkpoint-003"
+
+def test_idle_thread_expires_after_ttl():
+    store = MemoryThreadStore(max_threads=10)
+    saver = make_saver(store, ttl_seconds=60)
+    put_checkpoints(saver, "t", 1)
+    assert saver.get_tuple(thread_config("t")) is not None
+
+    store.load("t")["last_seen"] -= 120
+    assert saver.get_tuple(thread_config("t")) is None
+    assert store.load("t") is None
+
+def test_memory_store_evicts_least_recently_used_thread():
+    store = MemoryThreadStore(max_threads=2)
+    saver = make_saver(store)
+    put_checkpoints(saver, "a", 1)
+    put_checkpoints(saver, "b", 1)
+    store.load("a")
+    put_checkpoints(saver, "c", 1)
+
+    assert store.load("a") is not None
+    assert store.load("b") is None
+    assert store.load("c") is not None
+
+def test_evict_idle_drops_old_threads(tmp_path):
+    for store in (MemoryThreadStore(max_threads=10), SqliteThreadStore(str(tmp_path / "checkpoints.sqlite"))):
+        saver = make_saver(store)
+        put_checkpoints(saver, "t", 1)
+        assert store.evict_idle(time.time() - 60) == 0
+        assert store.evict_idle(time.time() + 60) == 1
+        assert store.load("t") is None
+
+def test_sqlite_store_survives_a_new_saver(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    put_checkpoints(make_saver(SqliteThreadStore(path)), "t", 3)
+
+    saver = make_saver(SqliteThreadStore(path))
+    latest = saver.get_tuple(thread_config("t"))
+    assert latest.checkpoint["id"] == "checkpoint-002"
+    assert latest.pending_writes == [("task", "messages", "write-2")]
+    assert len(list(saver.list(thread_config("t")))) == 2
+    assert SqliteThreadStore(path).stats()["checkpoints"] == 2
+
+def test_regular_writes_are_not_overwritten():
+    saver = make_saver(MemoryThreadStore(max_threads=10))
+    config = put_checkpoints(saver, "t", 1)
+    saver.put_writes(config, [("messages", "replacement")], task_id="task")
+    assert saver.get_tuple(thread_config("t")).pending_writes == [("task", "messages", "write-0")]
+
+class FakeIdleQuery:
+    def __init__(self, thread_ids):
+        self.thread_ids = thread_ids
+        self.calls = []
+
+    def where(self, field, op, value):
+        self.calls.append((field, op))
+        return self
+
+    def limit(self, count):
+        self.calls.append(("limit", count))
+        return self
+
+    def stream(self):
+        for thread_id in self.thread_ids:
+            user = SimpleNamespace(id=thread_id)
+            yield SimpleNamespace(reference=SimpleNamespace(parent=SimpleNamespace(parent=user)))
+
+def test_firestore_store_evicts_threads_idle_since_cutoff():
+    query = FakeIdleQuery(["a", "b"])
+    store = FirestoreThreadStore.__new__(FirestoreThreadStore)
+    store.db = SimpleNamespace(collection_group=lambda name: query)
+    deleted = []
+    store.delete = deleted.append
+
+    assert store.evict_idle(time.time() - 60) == 2
+    assert deleted == ["a", "b"]
+    assert query.calls == [("last_seen", "<"), ("limit", FirestoreThreadStore.EVICT_BATCH)]
@@ -0,0 +1,55 @@
+import pytest
+
+from app.agents.fast_router import FastRouter
+
+JOB_POSTING = (
+    "We are looking for a backend engineer to join our platform team. "
+    "Responsibilities: design and run Python services, review code and mentor "
+    "two junior developers, own the deployment pipeline and on-call rotation. "
+    "Requirements: five years of Python, Django and PostgreSQL, solid Docker "
+    "and Kubernetes experience, and clear written communication. "
+    "Qualifications: a degree in computer science or equivalent practical "
+    "experience building and operating production systems at scale."
+)
+
+@pytest.fixture
+def router():
+    return FastRouter(min_confidence=0.85)
+
+def test_profile_update_statement(router):
+    decision = router.route("I just learned Python")
+    assert decision["agent"] == "profile_updater"
+
+def test_profile_update_with_followup_defers_to_llm(router):
+    assert router.route("I just learned Python, what jobs should I apply for?") is None
+    assert router.classify("I just learned Python, what jobs should I apply for?")["agent"] == "profile_updater"
+
+def test_content_enhancement_request(router):
+    decision = router.route("Can you improve my LinkedIn headline?")
+    assert decision["agent"] == "content_enhancement"
+
+def test_career_path_question(router):
+    decision = router.route("How do I transition into data science")
+    assert decision["agent"] == "career_path"
+
+def test_job_posting(router):
+    decision = router.route(JOB_POSTING)
+    assert decision["agent"] == "job_fit_analyst"
+    assert decision["confidence"] >= 0.9
+
+def test_job_posting_with_personal_request_defers_to_llm(router):
+    assert router.route(JOB_POSTING + " Also rewrite my headline for this role.") is None
+
+def test_unrecognized_query_defers_to_llm(router):
+    assert router.route("hello there") is None
+    assert router.route("   ") is None
+
+def test_stats_count_hits_and_fallbacks(router):
+    router.route("I just learned Python")
+    router.route("hello there")
+    stats = router.stats()
+    assert stats["total"] == 2
+    assert stats["rule_hits"] == 1
+    assert stats["llm_fallbacks"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["hits_by_agent"] == {"profile_updater": 1}
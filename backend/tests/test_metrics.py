@@ -0,0 +1,73 @@
+import pytest
+
+from app.services.metrics import CONTENT_TYPE, MetricsRegistry
+
+def test_counter_and_gauge():
+    registry = MetricsRegistry(prefix="test_")
+    requests = registry.counter("requests_total", "Requests", ["route"])
+    requests.labels("/chat").inc()
+    requests.labels("/chat").inc(2)
+    in_flight = registry.gauge("in_flight", "In flight")
+    in_flight.inc()
+    in_flight.dec(0.5)
+
+    lines = registry.render().splitlines()
+    assert lines[:3] == [
+        "# HELP test_requests_total Requests",
+        "# TYPE test_requests_total counter",
+        'test_requests_total{route="/chat"} 3'
+    ]
+    assert "test_in_flight 0.5" in lines
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ["agent"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.labels("router").observe(value)
+
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'latency_seconds_bucket{agent="router",le="0.1"} 1',
+        'latency_seconds_bucket{agent="router",le="1"} 2',
+        'latency_seconds_bucket{agent="router",le="+Inf"} 3',
+        'latency_seconds_sum{agent="router"} 5.55',
+        'latency_seconds_count{agent="router"} 3'
+    ]
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors", ["message"]).labels('say "hi"\\\n').inc()
+    assert 'errors_total{message="say \\"hi\\"\\\\\\n"} 1' in registry.render().splitlines()
+
+def test_wrong_label_count_is_rejected():
+    counter = MetricsRegistry().counter("requests_total", "Requests", ["route", "status"])
+    with pytest.raises(ValueError):
+        counter.labels("/chat")
+
+def test_reregistering_with_other_labels_is_rejected():
+    registry = MetricsRegistry()
+    assert registry.counter("requests_total", "Requests") is registry.counter("requests_total", "Requests")
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Requests", ["route"])
+
+def test_collectors_are_read_at_render_time():
+    registry = MetricsRegistry(prefix="test_")
+    hits = {"value": 1}
+    registry.register_collector(lambda: [
+        ("cache_hits_total", "counter", "Cache hits", [({"cache": "llm"}, hits["value"]), ({"cache": "off"}, None)])
+    ])
+
+    def broken():
+        raise RuntimeError("unavailable")
+    registry.register_collector(broken)
+
+    hits["value"] = 7
+    lines = registry.render().splitlines()
+    assert lines == [
+        "# HELP test_cache_hits_total Cache hits",
+        "# TYPE test_cache_hits_total counter",
+        'test_cache_hits_total{cache="llm"} 7'
+    ]
+
+def test_content_type():
+    assert CONTENT_TYPE.startswith("text/plain; version=0.0.4")
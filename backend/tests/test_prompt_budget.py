@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import prompt_budget
+from app.services.prompt_budget import PromptBudget, TokenCounter, add_chat_history, compact_profile
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    # ~4 characters per token, so the tests don't depend on tiktoken's BPE files
+    counter = TokenCounter("test-model")
+    counter._loaded = True
+    monkeypatch.setattr(prompt_budget, "token_counter", counter)
+    return counter
+
+def test_everything_fits():
+    budget = PromptBudget("test", variables=["profile", "query"], max_tokens=100)
+    budget.add("query", "What should I learn next?", priority=100)
+    assert budget.render() == {"profile": "", "query": "What should I learn next?"}
+
+def test_low_priority_sections_are_dropped_first():
+    budget = PromptBudget("test", variables=["profile", "query"], max_tokens=30)
+    budget.add("profile", "x" * 400, priority=10, truncatable=False)
+    budget.add("query", "What should I learn next?", priority=100)
+    assert budget.render() == {"profile": "", "query": "What should I learn next?"}
+
+def test_section_is_truncated_to_the_remaining_budget(estimated_tokens):
+    budget = PromptBudget("test", max_tokens=40)
+    budget.add("query", "q" * 40, priority=100)
+    budget.add("profile", "p" * 400, priority=10)
+    rendered = budget.render()
+    assert rendered["query"] == "q" * 40
+    assert rendered["profile"].endswith("...")
+    assert estimated_tokens.count(rendered["profile"]) <= 30
+
+def test_sections_keep_the_order_they_were_added():
+    budget = PromptBudget("test", max_tokens=100)
+    budget.add("history", "first", priority=1)
+    budget.add("history", "second", priority=50)
+    assert budget.render()["history"] == "first\nsecond"
+
+def test_oldest_chat_history_is_dropped_first():
+    messages = [SimpleNamespace(type="human", content=f"message {i} " + "x" * 40) for i in range(4)]
+    budget = PromptBudget("test", max_tokens=30)
+    add_chat_history(budget, messages, priority=50)
+    history = budget.render()["chat_history"]
+    assert "message 3" in history
+    assert "message 0" not in history
+
+def test_compact_profile_keeps_listed_non_empty_fields():
+    profile = {"headline": "Engineer", "about": "", "skills": ["Python"], "updated_at": "yesterday"}
+    assert compact_profile(profile, ["headline", "about", "skills"]) == {"headline": "Engineer", "skills": ["Python"]}
@@ -0,0 +1,30 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.agents.router_agent import RouterAgent
+from app.services.semantic_cache import SemanticCache
+
+PRIOR_TURNS = [
+    HumanMessage(content="I just learned Docker"),
+    AIMessage(content="Great, I added Docker to your skills.")
+]
+
+def router_state(query):
+    return {"current_user_query": query, "chat_history": PRIOR_TURNS + [HumanMessage(content=query)]}
+
+def test_paraphrased_queries_share_a_cache_entry():
+    router = RouterAgent.__new__(RouterAgent)
+    first = router_state("Can you tell me what jobs I am qualified for right now?")
+    second = router_state("Could you tell me what jobs I am qualified for right now?")
+
+    namespace = router._history_namespace(first)
+    assert router._history_namespace(second) == namespace
+
+    cache = SemanticCache("router", threshold=0.9, max_entries=10, ttl_seconds=60)
+    cache.set(first["current_user_query"], ("job_fit_analyst", False, ()), namespace)
+    assert cache.get(second["current_user_query"], namespace) == ("job_fit_analyst", False, ())
+
+def test_different_prior_turns_use_different_namespaces():
+    router = RouterAgent.__new__(RouterAgent)
+    state = router_state("Can you tell me what jobs I am qualified for right now?")
+    fresh = {**state, "chat_history": state["chat_history"][-1:]}
+    assert router._history_namespace(fresh) != router._history_namespace(state)
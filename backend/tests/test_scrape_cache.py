@@ -0,0 +1,21 @@
+from app.services.scrape_cache import canonical_profile_url
+
+def test_variants_of_one_profile_share_a_key():
+    key = canonical_profile_url("linkedin.com/in/jane-doe")
+    assert key == "linkedin.com/in/jane-doe"
+    assert canonical_profile_url("https://www.linkedin.com/in/jane-doe/") == key
+    assert canonical_profile_url("https://DE.linkedin.com/in/Jane-Doe/?trk=x#top") == key
+    assert canonical_profile_url("  http://linkedin.com/in/jane%2Ddoe  ") == key
+
+def test_profile_sub_pages_map_to_the_profile():
+    assert canonical_profile_url("https://www.linkedin.com/in/jane-doe/details/skills/") == "linkedin.com/in/jane-doe"
+
+def test_legacy_pub_urls_keep_their_full_path():
+    first = canonical_profile_url("https://www.linkedin.com/pub/jane-doe/1/2a/3b")
+    second = canonical_profile_url("https://www.linkedin.com/pub/jane-doe/4/5c/6d/")
+    assert first == "linkedin.com/pub/jane-doe/1/2a/3b"
+    assert second == "linkedin.com/pub/jane-doe/4/5c/6d"
+    assert first != second
+
+def test_other_hosts_are_kept_apart():
+    assert canonical_profile_url("https://example.com/in/jane-doe") == "example.com/in/jane-doe"
@@ -0,0 +1,61 @@
+from app.services.skill_matcher import SkillMatcher, skill_matcher
+from app.services.skill_taxonomy import SKILL_TAXONOMY, UNMATCHED_CANONICALS
+
+JOB_DESCRIPTION = """Requirements:
+Python
+Django
+PostgreSQL
+Docker
+Nice to have:
+Kubernetes
+"""
+
+PROFILE = {
+    "skills": ["Python", "Excel", "Django"],
+    "experience": [{"title": "Engineer", "description": "Built services on PostgreSQL"}]
+}
+
+def test_ordinary_prose_is_not_a_skill():
+    assert skill_matcher.extract("You will excel at monitoring containers and analytics") == []
+    assert skill_matcher.extract("We go to market fast; job security and guard rails") == []
+
+def test_explicit_mentions_still_match():
+    assert skill_matcher.extract("Microsoft Excel and MS Excel") == ["Excel"]
+    assert skill_matcher.extract("Python, Golang, AWS Lambda") == ["Python", "Go", "AWS"]
+    assert skill_matcher.extract("Ruby on Rails") == ["Ruby on Rails"]
+
+def test_longest_match_and_symbols():
+    assert skill_matcher.extract("React Native and React") == ["React Native", "React"]
+    assert skill_matcher.extract("Node.js, C++ and C#") == ["Node.js", "C++", "C#"]
+
+def test_every_unmatched_canonical_exists():
+    assert UNMATCHED_CANONICALS <= set(SKILL_TAXONOMY)
+
+def test_profile_skill_named_exactly_counts():
+    listed, evidenced = skill_matcher.profile_skills(PROFILE)
+    assert listed == {"Python", "Excel", "Django"}
+    assert evidenced == {"PostgreSQL"}
+
+def test_job_skill_weights_follow_sections():
+    assert skill_matcher.extract_job_skills(JOB_DESCRIPTION) == {
+        "Python": 1.0, "Django": 1.0, "PostgreSQL": 1.0, "Docker": 1.0, "Kubernetes": 0.5
+    }
+
+def test_score():
+    result = skill_matcher.score(JOB_DESCRIPTION, PROFILE)
+    # (1 + 1 + 0.6 experience credit) / 4.5 total weight
+    assert result["score"] == 58
+    assert result["matched_skills"] == ["Python", "Django"]
+    assert result["experience_only_skills"] == ["PostgreSQL"]
+    assert result["missing_skills"] == ["Docker", "Kubernetes"]
+    assert result["required_missing"] == ["Docker"]
+
+def test_score_many_matches_score_and_skips_thin_postings():
+    results = skill_matcher.score_many([JOB_DESCRIPTION, "Python only"], PROFILE)
+    single = skill_matcher.score(JOB_DESCRIPTION, PROFILE)
+    single.pop("elapsed_ms")
+    assert results == [single, None]
+
+def test_custom_taxonomy():
+    matcher = SkillMatcher({"Terraform": ["tf", "terraform cloud"]})
+    assert matcher.extract("Terraform Cloud and TF modules") == ["Terraform"]
@@ -0,0 +1,85 @@
+import threading
+
+from google.api_core import exceptions as google_exceptions
+
+from app.services.write_behind import WriteBehindQueue
+
+class FakeBatch:
+    def __init__(self, store, fail_with=None):
+        self.store = store
+        self.fail_with = fail_with
+        self.ops = []
+
+    def set(self, key, value):
+        self.ops.append((key, value))
+
+    def commit(self):
+        if self.fail_with is not None:
+            raise self.fail_with
+        for key, value in self.ops:
+            if value == "bad":
+                raise google_exceptions.InvalidArgument("bad value")
+        self.store.batches.append(list(self.ops))
+
+class FakeFirestore:
+    def __init__(self, failures=()):
+        self.batches = []
+        self.failures = list(failures)
+        self.lock = threading.Lock()
+
+    def batch(self):
+        with self.lock:
+            fail_with = self.failures.pop(0) if self.failures else None
+        return FakeBatch(self, fail_with)
+
+def make_queue(db, batch_size=3, flush_interval=0.2, max_retries=2):
+    return WriteBehindQueue(db.batch, max_pending=100, batch_size=batch_size,
+                            flush_interval=flush_interval, max_retries=max_retries)
+
+def write(key, value="ok"):
+    return lambda batch: batch.set(key, value)
+
+def test_writes_are_committed_in_batches():
+    db = FakeFirestore()
+    queue = make_queue(db, batch_size=3)
+    committed = []
+    for i in range(5):
+        queue.submit(write(i), on_commit=lambda i=i: committed.append(i))
+    assert queue.flush(timeout=5)
+
+    assert [len(batch) for batch in db.batches] == [3, 2]
+    assert sorted(committed) == [0, 1, 2, 3, 4]
+    stats = queue.stats()
+    assert stats["enqueued"] == 5
+    assert stats["committed"] == 5
+    assert stats["batches"] == 2
+    assert stats["failed"] == 0
+
+def test_transient_errors_are_retried():
+    db = FakeFirestore(failures=[google_exceptions.ServiceUnavailable("down")])
+    queue = make_queue(db, max_retries=2)
+    queue.submit(write("a"))
+    assert queue.flush(timeout=5)
+    assert db.batches == [[("a", "ok")]]
+    assert queue.stats()["retries"] == 1
+
+def test_bad_write_only_drops_itself():
+    db = FakeFirestore()
+    queue = make_queue(db, batch_size=3)
+    for key, value in (("a", "ok"), ("b", "bad"), ("c", "ok")):
+        queue.submit(write(key, value))
+    assert queue.flush(timeout=5)
+
+    assert sorted(op for batch in db.batches for op in batch) == [("a", "ok"), ("c", "ok")]
+    stats = queue.stats()
+    assert stats["retries"] == 0
+    assert stats["failed"] == 1
+    assert stats["committed"] == 2
+
+def test_writes_after_flush_are_committed_inline():
+    db = FakeFirestore()
+    queue = make_queue(db)
+    assert queue.flush(timeout=5)
+    queue.submit(write("late"))
+    assert db.batches == [[("late", "ok")]]
+    assert queue.stats()["synchronous"] == 1
@@ -54,6 +54,8 @@ if "messages" not in st.session_state:
     st.session_state.messages = []
 if "profile_data" not in st.session_state:
     st.session_state.profile_data = None
+if "profile_status" not in st.session_state:
+    st.session_state.profile_status = None
 
 def make_api_request(endpoint: str, method: str = "GET", data: Optional[Dict] = None) -> Dict[str, Any]:
     """Make API request to backend"""
@@ -81,6 +83,7 @@ def start_new_session(linkedin_url: str):
         if result:
             st.session_state.session_id = result.get("session_id")
             st.session_state.profile_data = result.get("profile_data")
+            st.session_state.profile_status = result.get("profile_status", "ready")
             # Add welcome message to chat
             st.session_state.messages.append({
                 "role": "assistant",
@@ -128,6 +131,22 @@ def send_message(message: str):
             if result.get("profile_updated"):
                 load_profile()
 
+def check_profile_status():
+    """Check whether the background LinkedIn scrape has finished"""
+    result = make_api_request(f"/session/{st.session_state.session_id}/status")
+    if not result or result.get("profile_status") == "pending":
+        return
+
+    st.session_state.profile_status = result.get("profile_status")
+    if result.get("profile_data"):
+        load_profile()
+    if result.get("message"):
+        st.session_state.messages.append({
+            "role": "assistant",
+            "content": result["message"],
+            "timestamp": datetime.now().isoformat()
+        })
+
 def load_profile():
     """Load user profile from backend"""
     if st.session_state.session_id:
@@ -210,6 +229,14 @@ else:
     st.sidebar.success(f"Session Active")
     st.sidebar.caption(f"Session ID: {st.session_state.session_id[:8]}...")
     
+    # Pick up the profile once the background scrape completes
+    if st.session_state.profile_status == "pending":
+        check_profile_status()
+    if st.session_state.profile_status == "pending":
+        st.sidebar.info("⏳ Analyzing your LinkedIn profile...")
+        if st.sidebar.button("Check Profile Status", use_container_width=True):
+            st.rerun()
+
     # Display profile summary
     display_profile_summary()
     
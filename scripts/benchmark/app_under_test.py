@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Boot the backend against local stand-ins, for benchmarks.
+
+- Firestore: replaced by ``memory_firestore`` (in-process, optional per-call latency).
+- LinkedIn: the Apify actor run is replaced by fixture profiles
+  (``fixtures/linkedin_profiles.json``), with log-normal latency per run.
+- LLM: point ``LLM_BASE_URL`` at ``fake_llm_server.py``.
+
+Everything else (agents, caches, executors, the LangGraph orchestrator) is the
+real application code. ``GET /__benchmark__/stats`` reports stand-in counters.
+
+Usage:
+    LLM_BASE_URL=http://127.0.0.1:8900/v1 python scripts/benchmark/app_under_test.py --port 8901
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from typing import Dict, Any, List
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(BENCHMARK_DIR, "..", "..", "backend"))
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import memory_firestore
+
+FIXTURES_PATH = os.path.join(BENCHMARK_DIR, "fixtures", "linkedin_profiles.json")
+
+class FixtureScraper:
+    """Stands in for ``LinkedInScraper._run_actor``: one fixture item per requested URL"""
+
+    def __init__(self, fixtures: List[Dict[str, Any]], latency_ms: float, sigma: float, seed: int):
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.random = random.Random(seed)
+        self.runs = 0
+        self.profiles = 0
+
+    def run_actor(self, linkedin_urls: List[str]) -> List[Dict[str, Any]]:
+        self.runs += 1
+        self.profiles += len(linkedin_urls)
+        if self.latency_ms > 0:
+            time.sleep(self.random.lognormvariate(0, self.sigma) * self.latency_ms / 1000)
+        items = []
+        for url in linkedin_urls:
+            # The same URL always maps to the same fixture
+            item = copy.deepcopy(self.fixtures[zlib.crc32(url.encode()) % len(self.fixtures)])
+            item["linkedinUrl"] = url
+            items.append(item)
+        return items
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend against local stand-ins")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--firestore-latency-ms", type=float, default=0, help="Added to every Firestore call")
+    parser.add_argument("--scrape-latency-ms", type=float, default=3000, help="Median fixture actor run time")
+    parser.add_argument("--scrape-sigma", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # Must happen before anything imports the app
+    memory_firestore.install()
+    memory_firestore.set_latency(args.firestore_latency_ms / 1000)
+    os.chdir(BACKEND_DIR)
+
+    import uvicorn
+    from app.services.linkedin_scraper import linkedin_scraper
+    from app.main import app
+
+    with open(FIXTURES_PATH) as f:
+        scraper = FixtureScraper(json.load(f), args.scrape_latency_ms, args.scrape_sigma, args.seed)
+    linkedin_scraper._run_actor = scraper.run_actor
+    if linkedin_scraper.coordinator:
+        # The coordinator holds the bound method it was created with
+        linkedin_scraper.coordinator._run_actor = scraper.run_actor
+
+    @app.get("/__benchmark__/stats", include_in_schema=False)
+    async def benchmark_stats():
+        return {
+            "pid": os.getpid(),
+            "firestore": memory_firestore.stats(),
+            "scraper": {"actor_runs": scraper.runs, "profiles": scraper.profiles}
+        }
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
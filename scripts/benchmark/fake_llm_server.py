@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible fake LLM server for benchmarks.
+
+Serves ``POST /v1/chat/completions``, both streaming and non-streaming, with
+configurable latency:
+- time to first token is drawn from a log-normal distribution (median
+  ``--ttft-ms``, shape ``--ttft-sigma``);
+- the completion is then produced at ``--tokens-per-second``.
+
+Replies are shaped for the agent that asked. The system prompt identifies
+the agent:
+- the router gets a routing decision;
+- the profile updater and the job-fit analyst get JSON their parsers accept;
+- everything else gets ``--completion-tokens`` words of prose.
+
+Usage:
+    python scripts/benchmark/fake_llm_server.py --port 8900 --ttft-ms 400 --tokens-per-second 60
+    LLM_BASE_URL=http://127.0.0.1:8900/v1 ...
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import Dict, Any, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = (
+    "focus on measurable impact in your next role and highlight the projects where you owned delivery "
+    "end to end strengthen your profile with concrete results mentor others and build depth in one area "
+    "before broadening your scope consider certifications only where hiring managers ask for them"
+).split()
+
+# Streamed content is flushed in chunks of this many seconds of tokens
+STREAM_FLUSH_SECONDS = 0.02
+
+class FakeLLM:
+    def __init__(self, ttft_ms: float, ttft_sigma: float, tokens_per_second: float,
+                 completion_tokens: int, error_rate: float, seed: int):
+        self.ttft_ms = ttft_ms
+        self.ttft_sigma = ttft_sigma
+        self.tokens_per_second = max(1.0, tokens_per_second)
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.by_agent: Dict[str, int] = {}
+
+    def ttft(self) -> float:
+        if self.ttft_ms <= 0:
+            return 0.0
+        return self.random.lognormvariate(0, self.ttft_sigma) * self.ttft_ms / 1000
+
+    def reply(self, messages: List[Dict[str, Any]]) -> tuple:
+        """``(agent, content)`` for a chat request"""
+        system = " ".join(m.get("content") or "" for m in messages if m.get("role") == "system")
+        user = " ".join(m.get("content") or "" for m in messages if m.get("role") == "user")
+
+        if "brain of a career coaching AI" in system:
+            return "router", json.dumps(self._route(user))
+        if "profile update detector" in system:
+            skills = re.findall(r"(?:learned|know|learning)\s+([A-Z][\w+#.]*)", user)
+            return "profile_updater", json.dumps({
+                "updates": {"skills": skills} if skills else {},
+                "has_updates": bool(skills)
+            })
+        if "JobFit-GPT" in system:
+            return "job_fit_analyst", json.dumps({
+                "score": self.random.randint(40, 90),
+                "summary": self._prose(30),
+                "missing_skills": ["Kubernetes", "Terraform"],
+                "enhancements": [self._prose(12), self._prose(12)]
+            })
+        return "prose", self._prose(self.completion_tokens)
+
+    def _route(self, user: str) -> Dict[str, Any]:
+        if "First routing" not in user:
+            return {"agent": "end", "reasoning": "Query handled", "needs_followup": False}
+        match = re.search(r"Current user query:(.*?)Chat history context:", user, re.S)
+        query = (match.group(1) if match else user).lower()
+        if "job" in query and ("description" in query or "fit" in query):
+            agent = "job_fit_analyst"
+        elif "learned" in query or "i know" in query:
+            agent = "profile_updater"
+        elif "headline" in query or "rewrite" in query or "linkedin" in query:
+            agent = "content_enhancement"
+        else:
+            agent = "career_path"
+        return {"agent": agent, "reasoning": "Benchmark routing", "needs_followup": False}
+
+    def _prose(self, tokens: int) -> str:
+        return " ".join(self.random.choice(WORDS) for _ in range(max(1, tokens)))
+
+def create_app(llm: FakeLLM) -> FastAPI:
+    app = FastAPI(title="Fake LLM")
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": llm.requests, "errors": llm.errors, "by_agent": llm.by_agent}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        llm.requests += 1
+        agent, content = llm.reply(body.get("messages") or [])
+        llm.by_agent[agent] = llm.by_agent.get(agent, 0) + 1
+
+        if llm.error_rate and llm.random.random() < llm.error_rate:
+            llm.errors += 1
+            await asyncio.sleep(llm.ttft())
+            return JSONResponse(status_code=503, content={"error": {"message": "Injected failure", "type": "server_error"}})
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = body.get("model") or "fake-model"
+        # Whitespace-delimited words stand in for tokens
+        pieces = re.findall(r"\S+\s*", content) or [content]
+        usage = {
+            "prompt_tokens": sum(len((m.get("content") or "")) // 4 for m in body.get("messages") or []),
+            "completion_tokens": len(pieces)
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if not body.get("stream"):
+            await asyncio.sleep(llm.ttft() + len(pieces) / llm.tokens_per_second)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            }
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def event(choices: List[Dict[str, Any]], **extra) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+                **extra
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        def chunk(delta: Dict[str, Any], finish_reason=None) -> str:
+            return event([{"index": 0, "delta": delta, "finish_reason": finish_reason}])
+
+        async def events():
+            await asyncio.sleep(llm.ttft())
+            yield chunk({"role": "assistant", "content": ""})
+            per_flush = max(1, int(llm.tokens_per_second * STREAM_FLUSH_SECONDS))
+            for start in range(0, len(pieces), per_flush):
+                group = pieces[start:start + per_flush]
+                yield chunk({"content": "".join(group)})
+                await asyncio.sleep(len(group) / llm.tokens_per_second)
+            yield chunk({}, finish_reason="stop")
+            if include_usage:
+                yield event([], usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible fake LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--ttft-ms", type=float, default=300, help="Median time to first token")
+    parser.add_argument("--ttft-sigma", type=float, default=0.4, help="Log-normal shape of time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--completion-tokens", type=int, default=150, help="Length of prose replies")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 503")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    llm = FakeLLM(args.ttft_ms, args.ttft_sigma, args.tokens_per_second,
+                  args.completion_tokens, args.error_rate, args.seed)
+    uvicorn.run(create_app(llm), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
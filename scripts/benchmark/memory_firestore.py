@@ -0,0 +1,419 @@
+"""
+In-memory stand-in for the parts of firebase_admin the backend uses.
+
+``install()`` registers fake ``firebase_admin``, ``firebase_admin.credentials``,
+``firebase_admin.firestore`` and ``firebase_admin.firestore_async`` modules
+in ``sys.modules``. Call it before anything imports ``app``. Both clients
+share one process-wide document store. The fakes cover what the app does:
+- documents and subcollections, auto-ids and ``add``;
+- ``order_by`` (including ``FieldPath.document_id()``), ``where``,
+  ``start_after``, ``limit``, ``select`` and ``collection_group``;
+- write batches, and transactions via ``firestore.transactional``.
+
+``on_snapshot`` listeners never fire. An optional per-call latency mimics
+network round trips.
+"""
+
+import copy
+import sys
+import threading
+import time
+import types
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple
+
+DOCUMENT_ID = "__name__"
+
+class _Store:
+    def __init__(self):
+        self.docs: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self.lock = threading.RLock()
+        self.latency = 0.0
+        self.reads = 0
+        self.writes = 0
+
+    def pause(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+_store = _Store()
+
+def set_latency(seconds: float) -> None:
+    """Simulated round-trip time added to every read and write"""
+    _store.latency = max(0.0, seconds)
+
+def stats() -> Dict[str, int]:
+    return {"documents": len(_store.docs), "reads": _store.reads, "writes": _store.writes}
+
+class Query:
+    ASCENDING = "ASCENDING"
+    DESCENDING = "DESCENDING"
+
+    def __init__(self, parent_path: Tuple[str, ...], group: bool = False, orders=None, filters=None,
+                 cursor=None, limit_count=None, fields=None):
+        self._parent_path = parent_path
+        self._group = group
+        self._orders = orders or []
+        self._filters = filters or []
+        self._cursor = cursor
+        self._limit = limit_count
+        self._fields = fields
+
+    def _copy(self, **changes) -> "Query":
+        values = {
+            "orders": list(self._orders), "filters": list(self._filters), "cursor": self._cursor,
+            "limit_count": self._limit, "fields": self._fields
+        }
+        values.update(changes)
+        return Query(self._parent_path, self._group, **values)
+
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> "Query":
+        return self._copy(orders=self._orders + [(field_path, direction)])
+
+    def where(self, field_path: str, op_string: str, value: Any) -> "Query":
+        return self._copy(filters=self._filters + [(field_path, op_string, value)])
+
+    def limit(self, count: int) -> "Query":
+        return self._copy(limit_count=count)
+
+    def select(self, field_paths: List[str]) -> "Query":
+        return self._copy(fields=list(field_paths))
+
+    def start_after(self, document_fields) -> "Query":
+        return self._copy(cursor=document_fields)
+
+    def _matches_parent(self, path: Tuple[str, ...]) -> bool:
+        if self._group:
+            return len(path) >= 2 and path[-2] == self._parent_path[-1]
+        return path[:-1] == self._parent_path
+
+    def _sort_key(self, path: Tuple[str, ...], data: Dict[str, Any]):
+        return [path[-1] if field == DOCUMENT_ID else _get_field(data, field) for field, _ in self._orders]
+
+    def _run(self) -> List["DocumentSnapshot"]:
+        _store.pause()
+        with _store.lock:
+            rows = [(path, data) for path, data in _store.docs.items() if self._matches_parent(path)]
+            rows = [row for row in rows if all(_compare(_get_field(row[1], f), op, v) for f, op, v in self._filters)]
+            # Apply orders from the last to the first (stable sort)
+            for index in range(len(self._orders) - 1, -1, -1):
+                field, direction = self._orders[index]
+                rows.sort(
+                    key=lambda row: _sortable(row[0][-1] if field == DOCUMENT_ID else _get_field(row[1], field)),
+                    reverse=direction == Query.DESCENDING
+                )
+            if self._cursor is not None:
+                rows = rows[self._cursor_position(rows):]
+            if self._limit is not None:
+                rows = rows[:self._limit]
+            _store.reads += max(1, len(rows))
+            return [
+                DocumentSnapshot(DocumentReference(path), _project(data, self._fields))
+                for path, data in rows
+            ]
+
+    def _cursor_position(self, rows) -> int:
+        if isinstance(self._cursor, DocumentSnapshot):
+            cursor_values = self._sort_key(self._cursor.reference._path, self._cursor._data or {})
+        else:
+            cursor_values = []
+            for field, _ in self._orders:
+                value = self._cursor.get(field)
+                cursor_values.append(value.id if isinstance(value, DocumentReference) else value)
+        for position, (path, data) in enumerate(rows):
+            if self._after_cursor(self._sort_key(path, data), cursor_values):
+                return position
+        return len(rows)
+
+    def _after_cursor(self, values, cursor_values) -> bool:
+        for (field, direction), value, cursor in zip(self._orders, values, cursor_values):
+            if _sortable(value) == _sortable(cursor):
+                continue
+            greater = _sortable(value) > _sortable(cursor)
+            return greater if direction == Query.ASCENDING else not greater
+        return False
+
+    def stream(self, transaction=None):
+        return iter(self._run())
+
+    def get(self, transaction=None):
+        return self._run()
+
+    def on_snapshot(self, callback):
+        return _Watch()
+
+class _Watch:
+    def unsubscribe(self):
+        pass
+
+class CollectionReference(Query):
+    def __init__(self, path: Tuple[str, ...]):
+        super().__init__(path)
+        self._path = path
+        self.id = path[-1]
+
+    @property
+    def parent(self) -> Optional["DocumentReference"]:
+        return DocumentReference(self._path[:-1]) if len(self._path) > 1 else None
+
+    def document(self, document_id: Optional[str] = None) -> "DocumentReference":
+        return DocumentReference(self._path + (document_id or uuid.uuid4().hex[:20],))
+
+    def add(self, document_data: Dict[str, Any]):
+        ref = self.document()
+        ref.set(document_data)
+        return datetime.utcnow(), ref
+
+class DocumentReference:
+    def __init__(self, path: Tuple[str, ...]):
+        self._path = path
+        self.id = path[-1]
+
+    @property
+    def path(self) -> str:
+        return "/".join(self._path)
+
+    @property
+    def parent(self) -> CollectionReference:
+        return CollectionReference(self._path[:-1])
+
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference(self._path + (name,))
+
+    def get(self, field_paths=None, transaction=None) -> "DocumentSnapshot":
+        _store.pause()
+        with _store.lock:
+            _store.reads += 1
+            data = _store.docs.get(self._path)
+            return DocumentSnapshot(self, _project(data, field_paths) if data is not None else None)
+
+    def set(self, document_data: Dict[str, Any], merge: bool = False) -> None:
+        _store.pause()
+        _apply_set(self._path, document_data, merge)
+
+    def create(self, document_data: Dict[str, Any]) -> None:
+        self.set(document_data)
+
+    def update(self, field_updates: Dict[str, Any]) -> None:
+        _store.pause()
+        _apply_update(self._path, field_updates)
+
+    def delete(self) -> None:
+        _store.pause()
+        _apply_delete(self._path)
+
+class DocumentSnapshot:
+    def __init__(self, reference: DocumentReference, data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path: str) -> Any:
+        return copy.deepcopy(_get_field(self._data or {}, field_path))
+
+def _get_field(data: Dict[str, Any], field_path: str) -> Any:
+    value: Any = data
+    for part in field_path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+def _sortable(value: Any):
+    # None sorts first, like Firestore's null; naive and aware datetimes compare as UTC
+    if value is None:
+        return (0, 0)
+    if isinstance(value, datetime):
+        return (1, (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp())
+    if isinstance(value, (int, float)):
+        return (1, value)
+    return (2, str(value))
+
+def _compare(value: Any, op: str, other: Any) -> bool:
+    left, right = _sortable(value), _sortable(other)
+    return {
+        "==": left == right, "!=": left != right, "<": left < right,
+        "<=": left <= right, ">": left > right, ">=": left >= right
+    }.get(op, False)
+
+def _project(data: Optional[Dict[str, Any]], field_paths) -> Optional[Dict[str, Any]]:
+    if data is None or not field_paths:
+        return data
+    return {field: data[field] for field in field_paths if field in data}
+
+def _apply_set(path, document_data, merge) -> None:
+    with _store.lock:
+        _store.writes += 1
+        data = copy.deepcopy(document_data)
+        if merge and path in _store.docs:
+            _store.docs[path].update(data)
+        else:
+            _store.docs[path] = data
+
+def _apply_update(path, field_updates) -> None:
+    with _store.lock:
+        if path not in _store.docs:
+            raise KeyError(f"No document to update: {'/'.join(path)}")
+        _store.writes += 1
+        document = _store.docs[path]
+        for field_path, value in field_updates.items():
+            parts = field_path.split(".")
+            target = document
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = copy.deepcopy(value)
+
+def _apply_delete(path) -> None:
+    with _store.lock:
+        _store.writes += 1
+        _store.docs.pop(path, None)
+
+class WriteBatch:
+    def __init__(self):
+        self._writes = []
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(lambda: _apply_set(reference._path, document_data, merge))
+
+    def create(self, reference, document_data):
+        self.set(reference, document_data)
+
+    def update(self, reference, field_updates):
+        self._writes.append(lambda: _apply_update(reference._path, field_updates))
+
+    def delete(self, reference):
+        self._writes.append(lambda: _apply_delete(reference._path))
+
+    def commit(self):
+        _store.pause()
+        with _store.lock:
+            for write in self._writes:
+                write()
+        self._writes = []
+
+class Transaction(WriteBatch):
+    """Writes are buffered and applied under the store lock when the transaction commits"""
+
+def transactional(func):
+    def run(transaction: Transaction, *args, **kwargs):
+        # Holding the store lock for the whole function makes it serializable
+        with _store.lock:
+            result = func(transaction, *args, **kwargs)
+            transaction.commit()
+        return result
+    return run
+
+class Client:
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference((name,))
+
+    def collection_group(self, collection_id: str) -> Query:
+        return Query((collection_id,), group=True)
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch()
+
+    def transaction(self) -> Transaction:
+        return Transaction()
+
+class FieldPath:
+    @staticmethod
+    def document_id() -> str:
+        return DOCUMENT_ID
+
+# --- async client ---
+
+class AsyncQuery:
+    def __init__(self, query: Query):
+        self._query = query
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if name in ("order_by", "where", "limit", "select", "start_after"):
+            return lambda *args, **kwargs: AsyncQuery(attr(*args, **kwargs))
+        return attr
+
+    async def stream(self, transaction=None):
+        for snapshot in self._query._run():
+            yield snapshot
+
+    async def get(self, transaction=None):
+        return self._query._run()
+
+class AsyncCollectionReference(AsyncQuery):
+    def __init__(self, collection: CollectionReference):
+        super().__init__(collection)
+        self.id = collection.id
+
+    def document(self, document_id: Optional[str] = None) -> "AsyncDocumentReference":
+        return AsyncDocumentReference(self._query.document(document_id))
+
+    async def add(self, document_data: Dict[str, Any]):
+        timestamp, ref = self._query.add(document_data)
+        return timestamp, AsyncDocumentReference(ref)
+
+class AsyncDocumentReference(DocumentReference):
+    def __init__(self, reference: DocumentReference):
+        super().__init__(reference._path)
+
+    def collection(self, name: str) -> AsyncCollectionReference:
+        return AsyncCollectionReference(CollectionReference(self._path + (name,)))
+
+    async def get(self, field_paths=None, transaction=None):
+        return DocumentReference.get(self, field_paths)
+
+    async def set(self, document_data, merge=False):
+        DocumentReference.set(self, document_data, merge)
+
+    async def update(self, field_updates):
+        DocumentReference.update(self, field_updates)
+
+    async def delete(self):
+        DocumentReference.delete(self)
+
+class AsyncClient:
+    def collection(self, name: str) -> AsyncCollectionReference:
+        return AsyncCollectionReference(CollectionReference((name,)))
+
+    def collection_group(self, collection_id: str) -> AsyncQuery:
+        return AsyncQuery(Query((collection_id,), group=True))
+
+def install() -> None:
+    """Replace firebase_admin in sys.modules with the in-memory stand-ins"""
+    firebase_admin = types.ModuleType("firebase_admin")
+    firebase_admin._apps = {}
+    firebase_admin.initialize_app = lambda *args, **kwargs: firebase_admin._apps.setdefault("[DEFAULT]", object())
+
+    credentials = types.ModuleType("firebase_admin.credentials")
+    credentials.Certificate = lambda *args, **kwargs: None
+    credentials.ApplicationDefault = lambda *args, **kwargs: None
+
+    firestore = types.ModuleType("firebase_admin.firestore")
+    sync_client = Client()
+    firestore.client = lambda *args, **kwargs: sync_client
+    firestore.transactional = transactional
+    firestore.Query = Query
+    firestore.FieldPath = FieldPath
+    firestore.SERVER_TIMESTAMP = object()
+
+    firestore_async = types.ModuleType("firebase_admin.firestore_async")
+    async_client = AsyncClient()
+    firestore_async.client = lambda *args, **kwargs: async_client
+
+    firebase_admin.credentials = credentials
+    firebase_admin.firestore = firestore
+    firebase_admin.firestore_async = firestore_async
+    sys.modules.update({
+        "firebase_admin": firebase_admin,
+        "firebase_admin.credentials": credentials,
+        "firebase_admin.firestore": firestore,
+        "firebase_admin.firestore_async": firestore_async
+    })
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency and throughput benchmark for the backend.
+
+Starts the fake LLM server and the app under test (the real backend on an
+in-memory Firestore and a fixture scraper), then sweeps concurrency levels
+per endpoint. For each (endpoint, concurrency) it reports:
+- p50/p95/p99/mean/max latency;
+- time to first event for streaming endpoints;
+- throughput and errors;
+- the app's resident memory (start, peak, end).
+
+Results are written as JSON. With ``--baseline`` the run is compared against
+an earlier result, and the exit status is 1 when p95 latency or throughput
+regress by more than ``--max-regression``.
+
+Endpoints:
+    start_session    POST /start_session (returns once the scrape is queued)
+    session_ready    POST /start_session, then poll until the profile is ready
+    chat             POST /chat, messages rotating across all agents
+    chat_stream      POST /chat/stream, read to the final event
+    match_sessions   POST /match/sessions
+
+Usage:
+    python scripts/benchmark/run_benchmark.py --concurrency 1,8,32 --requests 100 --output bench.json
+    python scripts/benchmark/run_benchmark.py --endpoints chat --ttft-ms 800 --baseline bench.json
+    python scripts/benchmark/run_benchmark.py --base-url http://localhost:8000 --endpoints chat   # existing server
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import signal
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.abspath(os.path.join(BENCHMARK_DIR, "..", ".."))
+
+ENDPOINTS = ["start_session", "session_ready", "chat", "chat_stream", "match_sessions"]
+
+# One message per agent, so a sweep exercises every path through the graph
+CHAT_MESSAGES = [
+    "What career path should I take to move into a staff engineer role in two years?",
+    "Can you rewrite my LinkedIn headline so recruiters notice me?",
+    "I just learned Terraform and want to add it to my profile",
+    "How well do I fit this job description? We are hiring a Senior Python Engineer. "
+    "Requirements: Python, Django, PostgreSQL, AWS, Docker, Kubernetes. Nice to have: Kafka, Terraform.",
+]
+
+MATCH_JOB_DESCRIPTION = (
+    "Senior Backend Engineer. Requirements: Python, Go, PostgreSQL, Docker, Kubernetes, AWS. "
+    "Nice to have: Kafka, gRPC, Terraform."
+)
+
+# Settings for the app under test: measure the pipeline, not cache hits
+APP_ENV = {
+    "OPENROUTER_API_KEY": "benchmark",
+    "CHECKPOINTER_BACKEND": "memory",
+    "LLM_CACHE_ENABLED": "False",
+    "SEMANTIC_CACHE_ENABLED": "False",
+    "SCRAPE_CACHE_ENABLED": "False",
+    "SCRAPE_ARCHIVE_ENABLED": "False",
+    "PROFILE_CACHE_INVALIDATION": "none",
+    "WEB_CONCURRENCY": "1",
+    "PROFILE_INDEX_ENABLED": "True",
+    "ADMIN_API_KEY": "benchmark",
+}
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "p50": round(percentile(ordered, 50), 2),
+        "p95": round(percentile(ordered, 95), 2),
+        "p99": round(percentile(ordered, 99), 2),
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "max": round(ordered[-1], 2)
+    }
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process, from /proc or psutil when available"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import psutil
+        return round(psutil.Process(pid).memory_info().rss / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+class RSSSampler:
+    """Samples a process's RSS in the background while a level runs"""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[float] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if self.pid:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = read_rss_mb(self.pid)
+            if rss is not None:
+                self.samples.append(rss)
+            self._stop.wait(self.interval)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def summary(self) -> Optional[Dict[str, float]]:
+        if not self.samples:
+            return None
+        return {"start": self.samples[0], "peak": max(self.samples), "end": self.samples[-1]}
+
+class Benchmark:
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.sessions: List[str] = []
+        self._url_counter = 0
+
+    def _next_linkedin_url(self) -> str:
+        self._url_counter += 1
+        return f"https://www.linkedin.com/in/bench-user-{os.getpid()}-{self._url_counter}"
+
+    async def _wait_ready(self, client: httpx.AsyncClient, session_id: str, poll: float = 0.025) -> str:
+        deadline = time.perf_counter() + self.timeout
+        while time.perf_counter() < deadline:
+            response = await client.get(f"/session/{session_id}/status")
+            response.raise_for_status()
+            status = response.json().get("profile_status")
+            if status != "pending":
+                return status
+            await asyncio.sleep(poll)
+        raise TimeoutError(f"Session {session_id} not ready after {self.timeout}s")
+
+    async def prepare_sessions(self, client: httpx.AsyncClient, count: int) -> None:
+        """Sessions with scraped profiles for the chat endpoints, one per concurrent worker"""
+        async def create():
+            response = await client.post("/start_session", json={"linkedin_url": self._next_linkedin_url()})
+            response.raise_for_status()
+            session_id = response.json()["session_id"]
+            await self._wait_ready(client, session_id)
+            return session_id
+
+        missing = count - len(self.sessions)
+        if missing > 0:
+            self.sessions.extend(await asyncio.gather(*(create() for _ in range(missing))))
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, worker: int, index: int) -> Dict[str, Any]:
+        """One request; returns latency, first-event time and whether it succeeded"""
+        started = time.perf_counter()
+        first_event = None
+
+        if endpoint in ("start_session", "session_ready"):
+            response = await client.post("/start_session", json={"linkedin_url": self._next_linkedin_url()})
+            response.raise_for_status()
+            if endpoint == "session_ready":
+                status = await self._wait_ready(client, response.json()["session_id"])
+                if status != "ready":
+                    raise RuntimeError(f"profile_status {status}")
+
+        elif endpoint == "chat":
+            response = await client.post("/chat", json={
+                "session_id": self.sessions[worker],
+                "message": CHAT_MESSAGES[index % len(CHAT_MESSAGES)]
+            })
+            response.raise_for_status()
+
+        elif endpoint == "chat_stream":
+            payload = {"session_id": self.sessions[worker], "message": CHAT_MESSAGES[index % len(CHAT_MESSAGES)]}
+            async with client.stream("POST", "/chat/stream", json=payload) as response:
+                response.raise_for_status()
+                final = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        if first_event is None:
+                            first_event = time.perf_counter() - started
+                        final = line.split(":", 1)[1].strip()
+                if final not in ("done", "interrupt"):
+                    raise RuntimeError(f"stream ended with {final!r}")
+
+        elif endpoint == "match_sessions":
+            # Against an existing server, export its ADMIN_API_KEY
+            response = await client.post(
+                "/match/sessions",
+                json={"job_description": MATCH_JOB_DESCRIPTION, "top_k": 10},
+                headers={"X-Admin-Key": os.getenv("ADMIN_API_KEY", APP_ENV["ADMIN_API_KEY"])}
+            )
+            response.raise_for_status()
+
+        return {"latency": time.perf_counter() - started, "first_event": first_event}
+
+    async def run_level(self, endpoint: str, concurrency: int, requests: int, warmup: int,
+                        pid: Optional[int]) -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            if endpoint in ("chat", "chat_stream"):
+                await self.prepare_sessions(client, concurrency)
+
+            for index in range(warmup):
+                try:
+                    await self.request(client, endpoint, index % concurrency, index)
+                except Exception:
+                    pass
+
+            latencies, first_events, errors = [], [], []
+            counter = iter(range(requests))
+
+            async def worker(worker_id: int):
+                for index in counter:
+                    try:
+                        result = await self.request(client, endpoint, worker_id, index)
+                        latencies.append(result["latency"] * 1000)
+                        if result["first_event"] is not None:
+                            first_events.append(result["first_event"] * 1000)
+                    except Exception as e:
+                        errors.append(f"{type(e).__name__}: {e}")
+
+            with RSSSampler(pid) as rss:
+                started = time.perf_counter()
+                await asyncio.gather(*(worker(i) for i in range(concurrency)))
+                elapsed = time.perf_counter() - started
+
+        result = {
+            "endpoint": endpoint,
+            "concurrency": concurrency,
+            "requests": requests,
+            "errors": len(errors),
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0,
+            "latency_ms": summarize(latencies),
+            "rss_mb": rss.summary()
+        }
+        if first_events:
+            result["first_event_ms"] = summarize(first_events)
+        if errors:
+            result["sample_errors"] = sorted(set(errors))[:3]
+        return result
+
+def start_process(args: List[str], env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    log = open(log_path, "w")
+    return subprocess.Popen([sys.executable] + args, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT,
+                            cwd=REPO_DIR, start_new_session=True)
+
+def wait_for(url: str, process: subprocess.Popen, timeout: float, log_path: str) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"Process exited during startup, see {log_path}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    sys.exit(f"{url} not up after {timeout}s, see {log_path}")
+
+def stop_process(process: Optional[subprocess.Popen]) -> None:
+    if process and process.poll() is None:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, text=True).strip()
+    except Exception:
+        return None
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, max_regression: float) -> bool:
+    """Print deltas against a baseline run; False when something regressed past the threshold"""
+    with open(baseline_path) as f:
+        baseline = {(r["endpoint"], r["concurrency"]): r for r in json.load(f)["results"]}
+
+    ok = True
+    print(f"\nAgainst {baseline_path} (regression threshold {max_regression:.0%}):")
+    for result in results:
+        before = baseline.get((result["endpoint"], result["concurrency"]))
+        if not before or not before.get("latency_ms") or not result.get("latency_ms"):
+            continue
+        p95_change = result["latency_ms"]["p95"] / before["latency_ms"]["p95"] - 1
+        rps_change = result["throughput_rps"] / before["throughput_rps"] - 1 if before["throughput_rps"] else 0
+        regressed = p95_change > max_regression or rps_change < -max_regression
+        ok = ok and not regressed
+        print(f"  {result['endpoint']:<15} c={result['concurrency']:<4} p95 {p95_change:+7.1%}  "
+              f"throughput {rps_change:+7.1%}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    print(f"\n{'endpoint':<15} {'conc':>4} {'ok':>5} {'err':>4} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'rss peak':>9}")
+    for r in results:
+        latency = r["latency_ms"] or {}
+        rss = r["rss_mb"] or {}
+        print(f"{r['endpoint']:<15} {r['concurrency']:>4} {r['requests'] - r['errors']:>5} {r['errors']:>4} "
+              f"{r['throughput_rps']:>8} {latency.get('p50', '-'):>9} {latency.get('p95', '-'):>9} "
+              f"{latency.get('p99', '-'):>9} {rss.get('peak', '-'):>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--endpoints", default="start_session,chat,chat_stream,match_sessions",
+                        help=f"Comma-separated, from: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint and level")
+    parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests before each level")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95/throughput change vs baseline")
+    # Stand-ins
+    parser.add_argument("--base-url", help="Benchmark an already running server instead of booting one")
+    parser.add_argument("--app-pid", type=int, help="PID to sample RSS from with --base-url")
+    parser.add_argument("--app-port", type=int, default=8901)
+    parser.add_argument("--llm-port", type=int, default=8900)
+    parser.add_argument("--ttft-ms", type=float, default=300)
+    parser.add_argument("--ttft-sigma", type=float, default=0.4)
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--completion-tokens", type=int, default=150)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--firestore-latency-ms", type=float, default=5)
+    parser.add_argument("--scrape-latency-ms", type=float, default=3000)
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra setting for the app under test (repeatable)")
+    args = parser.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        sys.exit(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    llm_process = app_process = None
+    pid = args.app_pid
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "baseline")}
+    try:
+        if args.base_url:
+            base_url = args.base_url
+        else:
+            llm_log = os.path.join(BENCHMARK_DIR, "fake_llm.log")
+            llm_process = start_process([
+                os.path.join(BENCHMARK_DIR, "fake_llm_server.py"), "--port", str(args.llm_port),
+                "--ttft-ms", str(args.ttft_ms), "--ttft-sigma", str(args.ttft_sigma),
+                "--tokens-per-second", str(args.tokens_per_second),
+                "--completion-tokens", str(args.completion_tokens), "--error-rate", str(args.llm_error_rate)
+            ], {}, llm_log)
+            wait_for(f"http://127.0.0.1:{args.llm_port}/stats", llm_process, 30, llm_log)
+
+            env = {**APP_ENV, "LLM_BASE_URL": f"http://127.0.0.1:{args.llm_port}/v1"}
+            env.update(dict(item.split("=", 1) for item in args.app_env))
+            config["app_env"] = env
+            app_log = os.path.join(BENCHMARK_DIR, "app_under_test.log")
+            app_process = start_process([
+                os.path.join(BENCHMARK_DIR, "app_under_test.py"), "--port", str(args.app_port),
+                "--firestore-latency-ms", str(args.firestore_latency_ms),
+                "--scrape-latency-ms", str(args.scrape_latency_ms)
+            ], env, app_log)
+            base_url = f"http://127.0.0.1:{args.app_port}"
+            wait_for(f"{base_url}/", app_process, 120, app_log)
+            pid = app_process.pid
+
+        benchmark = Benchmark(base_url, args.timeout)
+        results = []
+        for endpoint in endpoints:
+            for concurrency in levels:
+                print(f"{endpoint} @ concurrency {concurrency} ...", flush=True)
+                results.append(asyncio.run(
+                    benchmark.run_level(endpoint, concurrency, args.requests, args.warmup, pid)
+                ))
+
+        stand_ins = None
+        if app_process:
+            stand_ins = httpx.get(f"{base_url}/__benchmark__/stats", timeout=5).json()
+            stand_ins["llm"] = httpx.get(f"http://127.0.0.1:{args.llm_port}/stats", timeout=5).json()
+    finally:
+        stop_process(app_process)
+        stop_process(llm_process)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": config
+        },
+        "stand_ins": stand_ins,
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_table(results)
+    print(f"\nWrote {args.output}")
+    if args.baseline and not compare(results, args.baseline, args.max_regression):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Multi-worker resume load test.
+
+Drives many concurrent sessions through an interrupt -> resume cycle against a
+backend running several workers (gunicorn.conf.py) and checks that turns which
+land on a different worker than the interrupted one still resume correctly.
+Every request opens a fresh connection so the workers share the load, and the
+X-Worker-Id response header tells which worker served each turn.
+
+Usage:
+    cd backend && WEB_CONCURRENCY=4 CHECKPOINTER_BACKEND=firestore gunicorn app.main:app -c gunicorn.conf.py
+    python scripts/load_test_multiworker.py --base-url http://localhost:8000 --sessions 40 --concurrency 8
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+
+import requests
+
+# Sequential multi-agent request: the router runs profile_updater then
+# job_fit_analyst, and router confirmation pauses for a human review
+INTERRUPT_MESSAGE = "I just learned Python and Docker and want to know what jobs I qualify for now"
+RESUME_MESSAGE = "That's sufficient, thanks"
+
+def post(base_url: str, path: str, payload: Dict[str, Any], timeout: float):
+    # No shared session: a new connection per request lets any worker pick it up
+    response = requests.post(f"{base_url}{path}", json=payload, timeout=timeout,
+                             headers={"Connection": "close"})
+    response.raise_for_status()
+    return response.json(), response.headers.get("X-Worker-Id", "unknown")
+
+def run_session(base_url: str, linkedin_url: str, timeout: float) -> Dict[str, Any]:
+    """Start a session, trigger an interrupt and resume it"""
+    result = {"status": "error", "workers": []}
+    try:
+        session, worker = post(base_url, "/start_session", {"linkedin_url": linkedin_url}, timeout)
+        session_id = session["session_id"]
+        result["workers"].append(worker)
+
+        first, worker = post(base_url, "/chat", {
+            "session_id": session_id,
+            "message": INTERRUPT_MESSAGE
+        }, timeout)
+        interrupted_on = worker
+        result["workers"].append(worker)
+
+        if not first.get("requires_input"):
+            result["status"] = "no_interrupt"
+            return result
+
+        started = time.perf_counter()
+        second, worker = post(base_url, "/chat", {
+            "session_id": session_id,
+            "message": RESUME_MESSAGE,
+            "resume_from_interrupt": True
+        }, timeout)
+        result["resume_latency"] = time.perf_counter() - started
+        result["workers"].append(worker)
+        result["cross_worker"] = worker != interrupted_on
+
+        # A missing checkpoint makes the backend start a fresh turn, which must not count
+        resumed = second.get("resumed") is True and not second.get("requires_input") \
+            and second.get("workflow_stage") not in ("error", None) and second.get("agent_type") != "error"
+        result["status"] = "resumed" if resumed else "resume_failed"
+        result["response_stage"] = second.get("workflow_stage")
+
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--linkedin-url", default="https://linkedin.com/in/manual-entry")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(f"🧪 Multi-worker resume test: {args.sessions} sessions, concurrency {args.concurrency}")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(
+            lambda _: run_session(args.base_url.rstrip("/"), args.linkedin_url, args.timeout),
+            range(args.sessions)
+        ))
+    elapsed = time.perf_counter() - started
+
+    statuses = Counter(r["status"] for r in results)
+    workers = Counter(w for r in results for w in r["workers"])
+    resumed = [r for r in results if "cross_worker" in r]
+    cross = [r for r in resumed if r["cross_worker"]]
+    cross_failed = [r for r in cross if r["status"] != "resumed"]
+
+    print(f"\nFinished in {elapsed:.1f}s")
+    print(f"Workers seen: {len(workers)}")
+    for worker, count in workers.most_common():
+        print(f"  {worker}: {count} requests")
+    print("Session outcomes:")
+    for status, count in statuses.most_common():
+        print(f"  {status}: {count}")
+    print(f"Resumes on a different worker: {len(cross)} ({len(cross) - len(cross_failed)} succeeded)")
+    if resumed:
+        latencies = sorted(r["resume_latency"] for r in resumed)
+        print(f"Resume latency p50: {latencies[len(latencies) // 2]:.2f}s, max: {latencies[-1]:.2f}s")
+    for r in results:
+        if r.get("error"):
+            print(f"  ❌ {r['error']}")
+
+    if len(workers) < 2:
+        print("\n❌ Only one worker served requests - start the backend with WEB_CONCURRENCY > 1")
+        return 2
+    if not cross:
+        print("\n❌ No resume landed on a different worker - increase --sessions")
+        return 2
+    if cross_failed or statuses.get("resume_failed"):
+        print("\n❌ Some interrupted turns did not resume - is CHECKPOINTER_BACKEND shared?")
+        return 1
+
+    print("\n✅ Interrupted turns resume correctly on any worker")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Re-run the LinkedIn profile mapping over the raw scrape archive.
+
+Every archived profile's newest raw Apify item (see SCRAPE_ARCHIVE_PATH) goes
+through LinkedInScraper's current mapping, in parallel across CPU cores. The
+sessions created for that LinkedIn URL then get the mapped fields that differ
+written in Firestore batches. After a change to _extract_skills or
+_extract_experience, this refreshes existing profiles without paying for new
+actor runs.
+
+Mapped fields overwrite what is on the profile, including edits made in
+conversation by the profile updater, so --fields must name the fields to
+rewrite (e.g. --fields skills) and nothing is written without --apply; a run
+without it only reports the sessions that would change. Running API workers
+see the changes after
+PROFILE_CACHE_TTL_SECONDS, or straight away with
+PROFILE_CACHE_INVALIDATION=firestore. The /match/sessions index picks them up
+on its next rebuild.
+
+Usage:
+    cd backend && python ../scripts/reprocess_scrapes.py --fields skills
+    cd backend && python ../scripts/reprocess_scrapes.py --fields skills,experience --workers 8 --apply
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, os.path.abspath(BACKEND_DIR))
+
+# Firestore allows up to 500 writes per batch
+BATCH_WRITES = 500
+
+def map_payload(path: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Worker: load one archived payload and run the current mapping over it"""
+    from app.services.scrape_archive import ScrapeArchive
+    from app.services.linkedin_scraper import linkedin_scraper
+
+    try:
+        payload = ScrapeArchive.load(path)
+        # The mapping logs every item's keys; keep worker output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            profile = linkedin_scraper.process_raw_profile(payload["item"])
+        return payload["canonical_url"], profile
+    except Exception as e:
+        return path, {"__error__": str(e)}
+
+def map_archive(workers: int, chunksize: int) -> Dict[str, Dict[str, Any]]:
+    from app.services.scrape_archive import scrape_archive
+
+    if scrape_archive is None:
+        sys.exit("The scrape archive is disabled (SCRAPE_ARCHIVE_ENABLED=False)")
+
+    paths = list(scrape_archive.iter_latest_paths())
+    print(f"Mapping {len(paths)} archived profile(s) on {workers} process(es)")
+    mapped = {}
+    errors = 0
+    # Spawned workers import the scraper themselves instead of inheriting the
+    # parent's Firebase/gRPC clients through fork
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for key, profile in pool.map(map_payload, paths, chunksize=chunksize):
+            if profile and "__error__" in profile:
+                errors += 1
+                print(f"  failed to map {key}: {profile['__error__']}")
+            elif profile:
+                mapped[key] = profile
+    print(f"Mapped {len(mapped)} profile(s), {errors} error(s)")
+    return mapped
+
+def update_profiles(mapped: Dict[str, Dict[str, Any]], fields: list, dry_run: bool) -> Dict[str, int]:
+    from datetime import datetime
+
+    from app.config import settings
+    from app.services.firebase_service import firebase_service, invalidation_document
+    from app.services.scrape_cache import canonical_profile_url
+
+    db = firebase_service.db
+    publish = settings.profile_cache_enabled and settings.profile_cache_invalidation == "firestore"
+    counts = {"sessions": 0, "matched": 0, "updated": 0, "batches": 0}
+    batch, writes = db.batch(), 0
+
+    for session_id, profile in firebase_service.iter_user_profiles(["linkedin_url"] + fields):
+        counts["sessions"] += 1
+        mapped_profile = mapped.get(canonical_profile_url(profile.get("linkedin_url") or ""))
+        if mapped_profile is None:
+            continue
+        counts["matched"] += 1
+
+        changes = {field: mapped_profile[field] for field in fields
+                   if field in mapped_profile and profile.get(field) != mapped_profile[field]}
+        if not changes:
+            continue
+        counts["updated"] += 1
+        if dry_run:
+            print(f"  {session_id}: {', '.join(sorted(changes))}")
+            continue
+
+        changes["updated_at"] = datetime.utcnow()
+        ref = db.collection("users").document(session_id).collection("profile").document("data")
+        batch.update(ref, changes)
+        writes += 1
+        if publish:
+            batch.set(db.collection("cache_invalidations").document(), invalidation_document(session_id))
+            writes += 1
+        if writes >= BATCH_WRITES - 1:
+            batch.commit()
+            counts["batches"] += 1
+            batch, writes = db.batch(), 0
+
+    if writes:
+        batch.commit()
+        counts["batches"] += 1
+    return counts
+
+def main():
+    from app.services.linkedin_scraper import linkedin_scraper
+
+    # Field names come from the mapping itself, so new fields are picked up automatically
+    with contextlib.redirect_stdout(io.StringIO()):
+        all_fields = list(linkedin_scraper.process_raw_profile({}).keys())
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fields", required=True,
+                        help=f"Comma-separated profile fields to rewrite, from: {','.join(all_fields)}")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Mapping processes")
+    parser.add_argument("--chunksize", type=int, default=64, help="Payloads per worker task")
+    parser.add_argument("--apply", action="store_true",
+                        help="Write the changes (default: only report sessions that would change)")
+    args = parser.parse_args()
+    dry_run = not args.apply
+
+    fields = [field.strip() for field in args.fields.split(",") if field.strip()]
+    unknown = set(fields) - set(all_fields)
+    if unknown:
+        sys.exit(f"Unknown profile fields: {', '.join(sorted(unknown))}")
+
+    started = time.perf_counter()
+    mapped = map_archive(max(1, args.workers), max(1, args.chunksize))
+    mapped_at = time.perf_counter()
+    counts = update_profiles(mapped, fields, dry_run)
+
+    action = "would update" if dry_run else "updated"
+    print(f"Scanned {counts['sessions']} session(s), {counts['matched']} with an archived scrape, "
+          f"{action} {counts['updated']} in {counts['batches']} batch(es)")
+    print(f"Mapping {mapped_at - started:.1f}s, Firestore {time.perf_counter() - mapped_at:.1f}s")
+    if dry_run:
+        print("Dry run - nothing was written; pass --apply to write the changes")
+
+if __name__ == "__main__":
+    main()